@@ -0,0 +1,176 @@
+"""Backends accélérés pour le second membre du pendule et son jacobien analytique.
+
+Les constantes physiques sont réduites une seule fois par simulation en quatre coefficients
+
+    domega/dt = -a sin(theta) - b omega - c tanh(alpha omega) - d |omega| omega
+
+puis le second membre est fourni soit en Python pur (module math), soit compilé avec Numba
+lorsqu'il est installé (import et compilation différés au premier usage, pour ne pas
+ralentir le démarrage des workers). Le jacobien analytique permet d'utiliser les solveurs implicites
+(Radau, BDF, LSODA) dans le régime raide du frottement sec régularisé par tanh.
+"""
+import functools
+import importlib.util
+import math
+
+import numpy as np
+
+from integrateur import integrate_batch, solve_until_settled
+
+BACKENDS = ('numpy', 'python', 'numba', 'auto')
+IMPLICIT_METHODS = ('Radau', 'BDF', 'LSODA')
+STIFFNESS_RATIO = 50.0  # Rapport raideur frottement sec / pulsation au-delà duquel 'auto' passe en LSODA
+
+
+def pendulum_coefficients(I, m, L, S, Cd, rho_fluid, V_object, Tc, g, b_pivot):
+    """Calcule (a, b, c, d) une fois pour toute la simulation."""
+    buoyancy_force = rho_fluid * V_object * g
+    a = (m * g - buoyancy_force) * L / I
+    b = b_pivot / I
+    c = Tc / I
+    d = 0.5 * rho_fluid * S * Cd * L**3 / I
+    return a, b, c, d
+
+
+# --- PYTHON PUR ---
+def _python_system(a, b, c, d, alpha_tanh):
+    sin, cos, tanh = math.sin, math.cos, math.tanh
+
+    def fun(t, y):
+        theta, omega = y
+        return [omega, -a * sin(theta) - b * omega - c * tanh(alpha_tanh * omega) - d * abs(omega) * omega]
+
+    def jac(t, y):
+        theta, omega = y
+        sech2 = 1.0 - tanh(alpha_tanh * omega)**2
+        return [[0.0, 1.0],
+                [-a * cos(theta), -b - c * alpha_tanh * sech2 - 2.0 * d * abs(omega)]]
+
+    return fun, jac
+
+
+# --- NUMBA ---
+def numba_available():
+    """Numba est optionnel : repli sur le Python pur s'il n'est pas installé."""
+    return importlib.util.find_spec('numba') is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_kernels():
+    import numba
+
+    @numba.njit(cache=True)
+    def rhs(y, a, b, c, d, alpha_tanh):
+        theta, omega = y[0], y[1]
+        out = np.empty(2)
+        out[0] = omega
+        out[1] = -a * np.sin(theta) - b * omega - c * np.tanh(alpha_tanh * omega) - d * abs(omega) * omega
+        return out
+
+    @numba.njit(cache=True)
+    def jac(y, a, b, c, d, alpha_tanh):
+        theta, omega = y[0], y[1]
+        out = np.empty((2, 2))
+        out[0, 0] = 0.0
+        out[0, 1] = 1.0
+        out[1, 0] = -a * np.cos(theta)
+        out[1, 1] = -b - c * alpha_tanh * (1.0 - np.tanh(alpha_tanh * omega)**2) - 2.0 * d * abs(omega)
+        return out
+
+    return rhs, jac
+
+
+def _numba_system(a, b, c, d, alpha_tanh):
+    _numba_rhs, _numba_jac = _numba_kernels()
+
+    def fun(t, y):
+        return _numba_rhs(y, a, b, c, d, alpha_tanh)
+
+    def jac(t, y):
+        return _numba_jac(y, a, b, c, d, alpha_tanh)
+
+    return fun, jac
+
+
+def resolve_backend(backend):
+    """Traduit 'auto' et replie 'numba' sur 'python' si Numba n'est pas installé."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend ODE '{backend}' non reconnu.")
+    if backend in ('auto', 'numba'):
+        return 'numba' if numba_available() else 'python'
+    return backend
+
+
+def resolve_method(method, coeffs, alpha_tanh):
+    """Traduit la méthode 'auto' : LSODA si le frottement sec rend le système raide, sinon RK45."""
+    if method != 'auto':
+        return method
+    a, b, c, d = coeffs
+    stiffness = c * alpha_tanh + b
+    if stiffness > STIFFNESS_RATIO * math.sqrt(abs(a) + 1e-12):
+        return 'LSODA'
+    return 'RK45'
+
+
+def make_pendulum_system(I, m, L, S, Cd, rho_fluid, V_object, Tc, *, g, b_pivot, alpha_tanh,
+                         backend='auto', method='RK45', reference_ode=None):
+    """Construit le second membre et les options de solveur pour une simulation.
+
+    backend : 'numpy' (reference_ode, la fonction pendulum_ode d'origine avec ses arguments),
+    'python', 'numba' ou 'auto'. method : nom d'un solveur scipy ou 'auto'.
+
+    Retourne (fun, args, method, options) prêts pour solve_until_settled.
+    """
+    coeffs = pendulum_coefficients(I, m, L, S, Cd, rho_fluid, V_object, Tc, g, b_pivot)
+    method = resolve_method(method, coeffs, alpha_tanh)
+    backend = resolve_backend(backend)
+
+    if backend == 'numpy':
+        if reference_ode is None:
+            raise ValueError("Le backend 'numpy' nécessite la fonction pendulum_ode de référence.")
+        fun, args = reference_ode, (I, m, L, S, Cd, rho_fluid, V_object, Tc, alpha_tanh)
+        _, jac = _python_system(*coeffs, alpha_tanh)
+    else:
+        system = _numba_system if backend == 'numba' else _python_system
+        fun, jac = system(*coeffs, alpha_tanh)
+        args = ()
+
+    options = {'jac': jac} if method in IMPLICIT_METHODS else {}
+    return fun, args, method, options
+
+
+def integrate_batch_auto(I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0, *, g, b_pivot, alpha_tanh,
+                         epsilon, t_max, sample_dt=None):
+    """integrate_batch avec le choix de method='auto' fait ligne par ligne.
+
+    Les lignes raides (frottement sec dominant) bloqueraient tout le lot explicite : elles sont
+    intégrées une à une avec LSODA (solve_until_settled, pics sur la grille k * sample_dt comme
+    dans integrate_batch). Même retour que integrate_batch : (t_stop, theta_eq), NaN sans arrêt.
+    """
+    I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0 = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0))
+    )
+    a, b, c, d = pendulum_coefficients(I, m, L, S, Cd, rho_fluid, V_object, Tc, g, b_pivot)
+    theta_eq = np.where(a < 0, np.pi, 0.0)
+    stiff = np.array([resolve_method('auto', row, alpha_tanh) != 'RK45' for row in zip(a, b, c, d)], dtype=bool)
+    t_stop = np.full(theta0.shape[0], np.nan)
+
+    t_eval = None
+    if sample_dt is not None:
+        t_eval = np.arange(int(round(t_max / sample_dt)) + 1) * sample_dt
+        t_eval = t_eval[t_eval <= t_max]
+    for i in np.flatnonzero(stiff):
+        fun, args, method, options = make_pendulum_system(
+            I[i], m[i], L[i], S[i], Cd[i], rho_fluid[i], V_object[i], Tc[i],
+            g=g, b_pivot=b_pivot, alpha_tanh=alpha_tanh, method='auto')
+        result = solve_until_settled(fun, [theta0[i], 0.0], args, theta_eq[i], epsilon, t_max,
+                                     t_eval=t_eval, method=method, **options)
+        if result.t_stop is not None:
+            t_stop[i] = result.t_stop
+
+    rest = ~stiff
+    if rest.any():
+        t_stop[rest], _ = integrate_batch(
+            I[rest], m[rest], L[rest], S[rest], Cd[rest], rho_fluid[rest], V_object[rest], Tc[rest], theta0[rest],
+            g=g, b_pivot=b_pivot, alpha_tanh=alpha_tanh, epsilon=epsilon, t_max=t_max, sample_dt=sample_dt)
+    return t_stop, theta_eq
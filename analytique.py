@@ -0,0 +1,161 @@
+"""Estimateur semi-analytique du temps de stabilisation, par bilan d'énergie demi-période par demi-période.
+
+Avec les coefficients réduits de l'intégrateur (integrateur.batch_coefficients),
+
+    domega/dt = -a sin(theta) - b omega - c tanh(alpha omega) - d |omega| omega,
+
+où a est la gravité corrigée de la poussée d'Archimède (a < 0 : équilibre en pi), on suit
+l'amplitude A (écart à l'équilibre) d'un pic au suivant :
+  - traînée quadratique : application exacte de l'oscillateur harmonique à amortissement
+    quadratique, (1 - x1) exp(x1) = (1 + x0) exp(-x0) avec x = 2 d A, résolue en forme close
+    par la fonction W de Lambert ; elle est appliquée à la coordonnée 2 sin(A/2), dont le carré
+    est proportionnel à l'énergie du pendule ;
+  - frottement sec (2 c A) et visqueux (b * 8 sqrt|a| (E(k^2) - (1 - k^2) K(k^2)), k = sin(A/2))
+    : énergie perdue le long de la trajectoire conservative, retranchée de |a| (1 - cos A) ;
+  - durée d'une demi-période : 2 K(k^2) / sqrt|a| (intégrales elliptiques complètes).
+
+Les demi-périodes sont itérées une par une tant que l'amplitude décroît vite (moins de
+MAX_CYCLES fois) : c'est là que le pendule peut rester bloqué par le frottement sec. Quand la
+décroissance devient lente, le nombre de demi-périodes est traité comme continu et le temps
+restant jusqu'à epsilon est une quadrature de Gauss-Legendre de demi-période * dn/dA, avec
+dn/dA = |a| sin A / perte(A).
+
+Le critère est celui de find_stop_time : premier pic de |theta - theta_eq| inférieur à epsilon.
+NaN pour les configurations qui ne se stabilisent pas avant t_max.
+"""
+import functools
+
+import numpy as np
+
+from integrateur import batch_coefficients
+
+ANALYTIC_VERSION = 1      # À incrémenter quand l'estimation change (clé du cache des prédictions)
+MAX_CYCLES = 40
+SLOW_DECAY = 0.2          # Décroissance relative par demi-période en dessous de laquelle on passe au continu
+QUADRATURE_NODES = 24
+_NODES, _WEIGHTS = np.polynomial.legendre.leggauss(QUADRATURE_NODES)
+
+
+@functools.lru_cache(maxsize=None)
+def _drag_time_table(n_points=241, n_nodes=128):
+    """Durée d'une demi-oscillation sous traînée quadratique, rapportée à celle sans traînée.
+
+    En variables réduites X = 2 d q, tau = sqrt(a) t, le demi-aller de -X0 à X1 vérifie
+    (dX/dtau)^2 = 2 (1 - X) - 2 (1 + X0) exp(-X0 - X) : la durée ne dépend que de X0.
+    Quadrature de Gauss-Tchebychev (zéros simples aux deux extrémités), tabulée en log X0.
+    Calculée au premier appel seulement, pour ne pas charger scipy à l'import du serveur.
+    """
+    from scipy.special import lambertw
+
+    log_x0 = np.linspace(-3.0, 8.0, n_points)
+    x0 = 10.0 ** log_x0[:, None]
+    x1 = 1 + lambertw(-(1 + x0) * np.exp(-x0 - 1)).real
+    s = np.cos((2 * np.arange(1, n_nodes + 1) - 1) * np.pi / (2 * n_nodes))
+    half_width = (x1 + x0) / 2
+    X = (x1 - x0) / 2 + half_width * s
+    U = 2 * (1 - X) - 2 * (1 + x0) * np.exp(-x0 - X)
+    tau = half_width[:, 0] * np.pi / n_nodes * np.sum(np.sqrt((1 - s ** 2) / np.maximum(U, 1e-300)), axis=1)
+    return log_x0, tau / np.pi
+
+
+def half_period(A, a):
+    """Demi-période d'oscillation d'amplitude A (a = |coefficient de gravité|)."""
+    from scipy.special import ellipk
+
+    return 2 * ellipk(np.sin(A / 2) ** 2) / np.sqrt(a)
+
+
+def energy_loss(A, a, b, c, d):
+    """Énergie (par unité d'inertie) dissipée sur une demi-période d'amplitude A, trajectoire conservative."""
+    from scipy.special import ellipe, ellipk
+
+    k2 = np.sin(A / 2) ** 2
+    viscous = 8 * np.sqrt(a) * (ellipe(k2) - (1 - k2) * ellipk(k2))
+    drag = 4 * a * (np.sin(A) - A * np.cos(A))
+    return 2 * c * A + b * viscous + d * drag
+
+
+def _next_amplitude(A, a, b, c, d):
+    """Amplitude au pic suivant (NaN si le pendule s'arrête avant l'équilibre) et durée de la
+    demi-oscillation.
+
+    Frottement sec et traînée en forme close (W de Lambert) sur la coordonnée q = 2 sin(A/2),
+    dont le frottement sec décale le centre de c/a ; frottement visqueux en perte d'énergie.
+    """
+    from scipy.special import ellipe, ellipk, lambertw
+
+    shift = c / a
+    q0 = 2 * np.sin(A / 2) - shift
+    x0 = 2 * d * q0
+    x1 = 1 + lambertw(-(1 + x0) * np.exp(-x0 - 1)).real
+    q1 = np.where(d > 0, x1 / np.where(d > 0, 2 * d, 1.0), q0) - shift
+    A_drag = 2 * np.arcsin(np.clip(q1 / 2, 0.0, 1.0))
+
+    # Perte visqueuse d'une demi-période d'amplitude A_drag : quand la traînée sature, c'est la
+    # fin de la demi-oscillation qui fixe l'amplitude atteinte
+    k2 = np.sin(A_drag / 2) ** 2
+    viscous = 8 * np.sqrt(a) * (ellipe(k2) - (1 - k2) * ellipk(k2))
+    cos_next = np.cos(A_drag) + b * viscous / a
+    A_next = np.where((q1 > 0) & (cos_next < 1.0), np.arccos(np.clip(cos_next, -1.0, 1.0)), np.nan)
+    ratio = np.interp(np.log10(np.maximum(x0, 1e-300)), *_drag_time_table())
+    return A_next, half_period((A + A_drag) / 2, a) * ratio
+
+
+def estimate_stop_times(I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0, *, g, b_pivot, epsilon, t_max):
+    """Temps de stabilisation estimés, même signature que integrate_batch (sans alpha_tanh).
+
+    Retourne (t_stop, theta_eq) ; t_stop vaut NaN si le pendule ne se stabilise pas avant t_max.
+    """
+    theta0 = np.atleast_1d(np.asarray(theta0, dtype=np.float64))
+    coeffs, theta_eq = batch_coefficients(*(np.atleast_1d(x) for x in (I, m, L, S, Cd, rho_fluid, V_object, Tc)),
+                                          g, b_pivot)
+    n = max(theta0.shape[0], coeffs.shape[0])
+    coeffs = np.broadcast_to(coeffs, (n, 4))
+    theta_eq = np.broadcast_to(theta_eq, (n,)).copy()
+    a, b, c, d = np.abs(coeffs[:, 0]), coeffs[:, 1], coeffs[:, 2], coeffs[:, 3]
+
+    # Amplitude initiale autour de l'équilibre, bornée loin de l'équilibre instable (K diverge)
+    deviation = np.abs(np.broadcast_to(theta0, (n,)) - theta_eq) % (2 * np.pi)
+    amplitude = np.minimum(np.minimum(deviation, 2 * np.pi - deviation), np.pi - 1e-6)
+    t_stop = np.full(n, np.nan)
+    t = np.zeros(n)
+
+    # Demi-périodes une par une ; les lignes dont l'amplitude décroît lentement passent au continu
+    rows = np.flatnonzero((a > 0) & (a * np.sin(amplitude) > c))
+    A = amplitude[rows]
+    slow_rows, slow_A = [], []
+    for cycle in range(MAX_CYCLES):
+        if rows.size == 0:
+            break
+        ra, rc = a[rows], c[rows]
+        A_next, duration = _next_amplitude(A, ra, b[rows], rc, d[rows])
+        t[rows] += duration
+        # Énergie épuisée avant l'équilibre : le pendule y arrive sans vitesse, le pic suivant est
+        # sous le seuil (la simulation le détecte presque toujours)
+        settled = np.isnan(A_next) | (A_next < epsilon)
+        # Rappel plus faible que le frottement sec au pic : le pendule reste bloqué hors du seuil
+        moving = ~settled & (ra * np.sin(A_next) > rc)
+        t_stop[rows[settled]] = t[rows[settled]]
+        slow = moving & (A_next > (1 - SLOW_DECAY) * A)
+        if cycle == MAX_CYCLES - 1:
+            slow = moving
+        slow_rows.append(rows[slow])
+        slow_A.append(A_next[slow])
+        keep = moving & ~slow
+        rows, A = rows[keep], A_next[keep]
+
+    rows = np.concatenate(slow_rows) if slow_rows else np.empty(0, dtype=np.intp)
+    if rows.size:
+        # Décroissance lente : nombre de demi-périodes continu, quadrature en log A
+        A = np.concatenate(slow_A)
+        ra, rb, rc, rd = a[rows, None], b[rows, None], c[rows, None], d[rows, None]
+        half_width = (np.log(A)[:, None] - np.log(epsilon)) / 2
+        nodes = np.exp(np.log(epsilon) + half_width * (_NODES + 1))
+        integrand = half_period(nodes, ra) * ra * np.sin(nodes) * nodes / energy_loss(nodes, ra, rb, rc, rd)
+        # Le premier pic sous epsilon arrive en moyenne une demi-demi-période après le passage à epsilon
+        t_slow = t[rows] + (half_width * integrand) @ _WEIGHTS + half_period(epsilon, a[rows]) / 2
+        # Frottement sec seul capable de bloquer le pendule au-dessus du seuil
+        t_stop[rows] = np.where(a[rows] * np.sin(epsilon) > c[rows], t_slow, np.nan)
+
+    t_stop[t_stop > t_max] = np.nan
+    return t_stop, theta_eq
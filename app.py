@@ -1,22 +1,36 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Blueprint, Flask, g, render_template, request, jsonify, Response, stream_with_context
 import numpy as np
-from scipy.integrate import solve_ivp
-from scipy.signal import find_peaks
-import joblib
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
 import json
+import logging
 import os
+import queue
+import threading
+import time
 
 # Import de la configuration
 from config import config
+from integrateur import iter_trajectory, solve_until_settled
+from acceleration import integrate_batch_auto, make_pendulum_system
+from predicteur import apply_scaler, build_feature_matrix, configuration_features, predict_stop_times
+from registre import ModelBundle, ModelRegistry, RegistryError, RegistryWatcher
+from cache import ResultCache, file_hash, physics_fingerprint
+from jobs import JobManager, QueueFull
+from trajectoire import ENCODINGS, MIMETYPE as TRAJECTORY_MIMETYPE, encode_trajectory
+from tabulation import LookupTable
+from analytique import ANALYTIC_VERSION, estimate_stop_times
+from physique import (SHAPE_REGISTRY, SHAPES, STOP_GRID_RATE, calculate_properties, calculate_properties_batch,
+                      equilibrium_angle, pendulum_ode, stop_grid, stop_grid_step)
+from balayage import (SweepError, correct_surface, grid_configurations, parse_axes, select_refinement,
+                      simulate_point, sobol_sensitivity)
+from metriques import CONTENT_TYPE as METRICS_CONTENT_TYPE, COUNT_BUCKETS, Registry
 
 # Configuration de l'environnement
 env = os.environ.get('FLASK_ENV', 'development')
 app_config = config[env]
 
-app = Flask(__name__)
-app.config.from_object(app_config)
+# Les routes sont déclarées sur un blueprint et enregistrées par create_app()
+bp = Blueprint('pendulum', __name__)
+logger = logging.getLogger('pendulum')
 
 # --- CONSTANTES PHYSIQUES ---
 G = app_config.G
@@ -25,220 +39,1314 @@ EPSILON = app_config.EPSILON
 TC_DRY_FRICTION = app_config.TC_DRY_FRICTION
 ALPHA_TANH = app_config.ALPHA_TANH
 T_MAX_SIMULATION = app_config.T_MAX_SIMULATION
+BATCH_MAX_SIZE = app_config.BATCH_MAX_SIZE
+EARLY_STOP = app_config.EARLY_STOP
+ANIMATION_WINDOW = app_config.ANIMATION_WINDOW
+ODE_BACKEND = app_config.ODE_BACKEND
+ODE_METHOD = app_config.ODE_METHOD
+# Pics du critère d'arrêt cherchés sur la grille des étiquettes d'entraînement (collecteur.py)
+STOP_GRID = stop_grid(T_MAX_SIMULATION)
 
 FLUID_PROPERTIES = app_config.FLUID_PROPERTIES
 
 # --- CHARGEMENT DU MODÈLE ET SCALER ---
 MODEL_PATH = app_config.MODEL_PATH
-SCALER_PATH = 'scaler_4_1.pkl'
-
-# Charger le modèle MLP et le scaler
-try:
-    model = joblib.load('mlp_model_4_1.pkl')
-    print("✅ Modèle MLP chargé depuis mlp_model_4_1.pkl")
-except Exception as e:
-    print(f"❌ Erreur chargement modèle MLP: {e}")
-    model = None
-
-try:
-    scaler = joblib.load('scaler_4_1.pkl')  # Utiliser le scaler corrigé
-    print("✅ StandardScaler chargé depuis scaler_4_1.pkl")
-except Exception as e:
-    print(f"❌ Erreur chargement StandardScaler: {e}")
-    scaler = None
+SCALER_PATH = app_config.SCALER_PATH
+MLP_WEIGHTS_PATH = app_config.MLP_WEIGHTS_PATH
 
-# --- FONCTIONS UTILITAIRES ---
-def calculate_properties(shape, dims, m, L):
-    """Calcule les propriétés physiques selon la forme - Version qui fonctionne"""
-    if shape == 'sphère':
-        R = dims[0]
-        S, V, I, Cd = np.pi * R**2, (4/3) * np.pi * R**3, (2/5) * m * R**2 + m * (L+R)**2, 0.47
-    elif shape == 'cylindre':
-        R, H = dims[0], dims[1]
-        S, V, I, Cd = np.pi * R**2, np.pi * R**2 * H, m * (R**2/4 + H**2/12) + m * (L+R)**2, 0.82
-    elif shape == 'pavé':
-        d1, d2, d3 = dims[0], dims[1], dims[2]
-        S, V, I, Cd = d3 * d2, d1 * d2 * d3, m * (d1**2 + d2**2) / 12 + m * (L+d3/2)**2, 1.05
-    else:
-        raise ValueError(f"Forme '{shape}' non reconnue.")
-    
-    # Debug: afficher les valeurs calculées
-    print(f"🔍 Debug calculate_properties - {shape}: S={S:.6f}, V={V:.6f}, I={I:.6f}")
-    
-    return I, S, Cd, V
+# Modèle servi (registre.ModelBundle). Une requête prend la référence une fois, via
+# current_bundle(), et la garde jusqu'au bout : une bascule de version n'interrompt pas les
+# requêtes en cours. previous_bundle garde la version remplacée, shadow_bundle la version
+# candidate évaluée en mode shadow.
+live_bundle = None
+previous_bundle = None
+shadow_bundle = None
+model_registry = ModelRegistry(app_config.MODEL_REGISTRY_DIR)
+registry_pointers = (None, None)
+registry_watcher = None
+registry_watcher_pid = None
+lookup_engine = None
+LOOKUP_HASH = None
+PREDICTION_BACKENDS = ('mlp', 'lookup', 'analytic')
 
-def pendulum_ode(t, y, I, m, L, S, Cd, rho_fluid, V_object, Tc, alpha_tanh):
-    """Équation différentielle complète avec poussée d'Archimède, traînée et frottement sec."""
-    theta, omega = y
-    
-    buoyancy_force = rho_fluid * V_object * G
-    torque_gravity = -(m * G - buoyancy_force) * L * np.sin(theta)
-    torque_pivot_friction = -B_PIVOT * omega
-    torque_dry_friction = -Tc * np.tanh(alpha_tanh * omega)
-    speed = L * omega
-    torque_fluid_drag = -0.5 * rho_fluid * S * Cd * abs(speed) * speed * L
-    
-    domega_dt = (torque_gravity + torque_pivot_friction + torque_dry_friction + torque_fluid_drag) / I
-    dtheta_dt = omega
-    return [dtheta_dt, domega_dt]
-
-def find_stop_time(t_array, theta_array, epsilon, theta_eq):
-    """Trouve le temps où l'amplitude des oscillations passe sous epsilon"""
-    deviation = np.abs(theta_array - theta_eq)
-    peaks_indices, _ = find_peaks(deviation)
-    if len(peaks_indices) == 0: 
+# État du chargement, exposé par /healthz. Avec gunicorn --preload, les modèles sont chargés
+# une seule fois dans le processus maître et partagés copy-on-write par les workers.
+model_state = {'status': 'pending', 'engine': None, 'version': None, 'candidate': None, 'lookup': False,
+               'load_seconds': None, 'loaded_by_pid': None, 'error': None}
+model_lock = threading.Lock()
+model_loader = None
+STARTED_AT = time.time()
+
+def load_config_bundle():
+    """Modèle désigné par la configuration, hors registre : moteur NumPy exporté ou, à défaut,
+    modèle et scaler scikit-learn"""
+    # L'empreinte garde le format d'avant le registre : les prédictions en cache restent valides
+    if os.path.exists(MLP_WEIGHTS_PATH):
+        try:
+            bundle = ModelBundle.from_files('config', weights_path=MLP_WEIGHTS_PATH,
+                                            digest=file_hash(MLP_WEIGHTS_PATH), source=MLP_WEIGHTS_PATH)
+            logger.info("Moteur MLP NumPy chargé depuis %s", MLP_WEIGHTS_PATH)
+            return bundle
+        except Exception as e:
+            logger.error("Erreur chargement moteur MLP NumPy: %s", e)
+            model_state['error'] = str(e)
+    try:
+        bundle = ModelBundle.from_files('config', model_path=MODEL_PATH, scaler_path=SCALER_PATH,
+                                        digest=file_hash(MODEL_PATH, SCALER_PATH), source=MODEL_PATH)
+        logger.info("Modèle MLP et StandardScaler chargés depuis %s et %s", MODEL_PATH, SCALER_PATH)
+        return bundle
+    except Exception as e:
+        logger.error("Erreur chargement modèle MLP ou StandardScaler: %s", e)
+        model_state['error'] = str(e)
+    return None
+
+def load_registry_bundles(active, candidate):
+    """Charge (et vérifie) les versions désignées par ACTIVE et CANDIDATE.
+
+    Sans ACTIVE, le modèle servi est celui de la configuration. La candidate n'est évaluée
+    que si elle diffère de la version servie.
+    """
+    bundle = model_registry.load(active) if active is not None else load_config_bundle()
+    if active is not None:
+        logger.info("Registre de modèles : version %s chargée", active)
+    shadow = model_registry.load(candidate) if candidate not in (None, active) else None
+    if shadow is not None:
+        logger.info("Registre de modèles : version candidate %s évaluée en mode shadow", candidate)
+    return bundle, shadow
+
+def load_models():
+    """Charge la version active du registre de modèles ou, sans registre, le modèle de la configuration"""
+    global live_bundle, shadow_bundle, registry_pointers, lookup_engine, LOOKUP_HASH
+    with model_lock:
+        if model_state['status'] in ('ready', 'degraded'):
+            return
+        model_state['status'] = 'loading'
+        start = time.perf_counter()
+
+        registry_pointers = model_registry.pointers()
+        try:
+            live_bundle, shadow_bundle = load_registry_bundles(*registry_pointers)
+        except Exception as e:
+            # Version du registre invalide : le modèle de la configuration reste disponible
+            logger.error("Registre de modèles : %s", e)
+            model_state['error'] = str(e)
+            live_bundle = load_config_bundle()
+
+        # Table précalculée (backend 'lookup'), ouverte en mmap si elle a été construite
+        lookup_index = os.path.join(app_config.LOOKUP_TABLE_DIR, 'index.json')
+        if os.path.exists(lookup_index):
+            try:
+                lookup_engine = LookupTable.load(app_config.LOOKUP_TABLE_DIR, app_config, app_config.LOOKUP_TOLERANCE)
+                LOOKUP_HASH = file_hash(lookup_index)
+                logger.info("Table de temps de stabilisation chargée depuis %s", app_config.LOOKUP_TABLE_DIR)
+            except Exception as e:
+                logger.error("Erreur chargement table de temps de stabilisation: %s", e)
+        update_model_state()
+        model_state.update({
+            'lookup': lookup_engine is not None,
+            'load_seconds': round(time.perf_counter() - start, 4),
+            'loaded_by_pid': os.getpid()
+        })
+
+def update_model_state():
+    """Reporte la version servie et la candidate dans model_state (/healthz)"""
+    model_state.update({
+        'status': 'ready' if live_bundle is not None else 'degraded',
+        'engine': live_bundle.engine_name if live_bundle is not None else None,
+        'version': live_bundle.version if live_bundle is not None else None,
+        'candidate': shadow_bundle.version if shadow_bundle is not None else None
+    })
+
+def swap_models(active, candidate):
+    """Bascule vers les versions désignées par le registre (appelé par le RegistryWatcher).
+
+    Le chargement et la vérification des sommes de contrôle se font dans le thread de
+    surveillance ; seul le remplacement des références est fait sous verrou. La version
+    remplacée reste dans previous_bundle pour les requêtes qui l'utilisent encore.
+    """
+    global live_bundle, previous_bundle, shadow_bundle, registry_pointers
+    try:
+        if active != registry_pointers[0]:
+            bundle, shadow = load_registry_bundles(active, candidate)
+            if bundle is None:
+                raise RegistryError('aucun modèle à servir')
+        else:
+            bundle = live_bundle
+            shadow = model_registry.load(candidate) if candidate not in (None, active) else None
+    except Exception:
+        MODEL_RELOADS.inc(status='error')
+        raise
+    with model_lock:
+        if bundle is not live_bundle:
+            previous_bundle, live_bundle = live_bundle, bundle
+        shadow_bundle = shadow
+        registry_pointers = (active, candidate)
+        update_model_state()
+    MODEL_RELOADS.inc(status='ok')
+    logger.info("Registre de modèles : version servie %s, candidate %s", bundle.version,
+                shadow.version if shadow is not None else None)
+
+def ensure_registry_watcher():
+    """Surveille le registre dans ce processus ; les threads ne survivent pas au fork des workers"""
+    global registry_watcher, registry_watcher_pid
+    if app_config.MODEL_WATCH_INTERVAL <= 0 or model_state['status'] not in ('ready', 'degraded'):
+        return
+    if registry_watcher_pid == os.getpid():
+        return
+    with model_lock:
+        if registry_watcher_pid == os.getpid():
+            return
+        registry_watcher = RegistryWatcher(model_registry, swap_models, app_config.MODEL_WATCH_INTERVAL,
+                                           current=registry_pointers)
+        registry_watcher.start()
+        registry_watcher_pid = os.getpid()
+
+def current_bundle():
+    """Modèle servi au moment de l'appel (None si aucun n'est chargé)"""
+    ensure_models_loaded()
+    return live_bundle
+
+def start_model_loading():
+    """Démarre le chargement en arrière-plan (WARM_START désactivé) ; sans effet s'il est lancé"""
+    global model_loader
+    with model_lock:
+        if model_loader is not None and model_loader.is_alive():
+            return
+        if model_state['status'] != 'pending':
+            return
+        model_loader = threading.Thread(target=load_models, name='model-loader', daemon=True)
+        model_loader.start()
+
+def ensure_models_loaded():
+    """Charge les modèles au premier usage s'ils ne l'ont pas encore été (appel bloquant)"""
+    if model_state['status'] not in ('ready', 'degraded'):
+        load_models()
+
+# --- CACHE DES RÉSULTATS ---
+SOLVER_SETTINGS = {
+    'backend': ODE_BACKEND,
+    'method': ODE_METHOD,
+    'early_stop': EARLY_STOP,
+    'animation_window': ANIMATION_WINDOW,
+    'stop_grid': STOP_GRID_RATE
+}
+result_cache = None
+if app_config.CACHE_ENABLED:
+    result_cache = ResultCache(
+        physics_fingerprint(app_config),
+        max_entries=app_config.CACHE_MAX_ENTRIES,
+        ttl=app_config.CACHE_TTL,
+        db_path=app_config.CACHE_DB_PATH
+    )
+
+def cached_response(cache_key):
+    """Renvoie la réponse JSON déjà calculée pour cette clé, ou None"""
+    if result_cache is None or cache_key is None:
         return None
-    peak_times = t_array[peaks_indices]
-    peak_amplitudes = deviation[peaks_indices]
-    sub_threshold_peaks = np.where(peak_amplitudes < epsilon)[0]
-    if len(sub_threshold_peaks) > 0:
-        return peak_times[sub_threshold_peaks[0]]
-    else:
+    body = result_cache.get(cache_key)
+    if body is None:
+        return None
+    response = Response(body, mimetype='application/json')
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+def cache_response(cache_key, payload):
+    """Sérialise la réponse une seule fois et la conserve dans le cache"""
+    with PHASE_DURATION.time(phase='serialization'):
+        response = jsonify(payload)
+    if result_cache is not None and cache_key is not None:
+        result_cache.set(cache_key, response.get_data(as_text=True))
+        response.headers['X-Cache'] = 'MISS'
+    return response
+
+# --- MÉTRIQUES ET PROFILAGE ---
+# La détection de l'arrêt est faite en ligne pendant l'intégration (integrateur.StopDetector) :
+# elle est comptée dans la phase 'solve'.
+metrics = Registry()
+REQUEST_DURATION = metrics.histogram(
+    'pendulum_request_duration_seconds', "Durée de traitement des requêtes HTTP", ('endpoint', 'method', 'status'))
+PHASE_DURATION = metrics.histogram(
+    'pendulum_phase_duration_seconds', "Durée des phases de calcul (features, scaler, predict, solve, ...)", ('phase',))
+SOLVER_RUNS = metrics.counter('pendulum_solver_runs_total', "Intégrations par méthode et statut", ('method', 'status'))
+SOLVER_NFEV = metrics.histogram(
+    'pendulum_solver_nfev', "Évaluations du second membre par intégration", ('method',), COUNT_BUCKETS)
+SOLVER_STEPS = metrics.histogram(
+    'pendulum_solver_steps', "Pas acceptés par intégration", ('method',), COUNT_BUCKETS)
+HYBRID_RUNS = metrics.counter('pendulum_hybrid_runs_total', "Simulations hybrides par issue", ('status',))
+HYBRID_SAVED = metrics.histogram(
+    'pendulum_hybrid_saved_fraction', "Part de l'horizon T_MAX_SIMULATION non intégrée en mode hybride", (),
+    (0.5, 0.75, 0.9, 0.95, 0.99, 0.999))
+LOOKUP_FALLBACKS = metrics.counter(
+    'pendulum_lookup_fallbacks_total', "Requêtes du backend lookup résolues par simulation", ())
+ANALYTIC_FALLBACKS = metrics.counter(
+    'pendulum_analytic_fallbacks_total', "Requêtes MLP servies par l'estimateur analytique (modèle non chargé)", ())
+SWEEP_POINTS = metrics.counter(
+    'pendulum_sweep_points_total', "Points de balayage par fidélité (mlp, simulation)", ('fidelity',))
+BATCH_SIZE = metrics.histogram(
+    'pendulum_batch_size', "Configurations par requête de lot", ('endpoint',), (1, 10, 100, 1000, 10000))
+MODEL_RELOADS = metrics.counter(
+    'pendulum_model_reloads_total', "Bascules de version du registre de modèles par statut", ('status',))
+SHADOW_PREDICTIONS = metrics.counter(
+    'pendulum_shadow_predictions_total', "Lots prédits par la version candidate (évalués ou ignorés)", ('status',))
+SHADOW_LATENCY = metrics.histogram(
+    'pendulum_shadow_predict_seconds', "Durée de prédiction des versions servie et candidate sur les mêmes lots",
+    ('role',))
+SHADOW_DELTA = metrics.histogram(
+    'pendulum_shadow_delta_log1p', "Écart |log1p(candidate) - log1p(servie)| par configuration", (),
+    (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0))
+
+def record_solver_stats(method, status, nfev, nsteps=None):
+    """Enregistre les statistiques d'une intégration (statut : 1 stabilisé, 0 t_max atteint, -1 échec)"""
+    SOLVER_RUNS.inc(method=method, status=status)
+    SOLVER_NFEV.observe(nfev, method=method)
+    if nsteps is not None:
+        SOLVER_STEPS.observe(nsteps, method=method)
+
+@metrics.collector
+def collect_state():
+    """Compteurs du cache, des travaux et du modèle, lus au moment du rendu de /metrics"""
+    samples = [('pendulum_model_ready', 'gauge', "1 si un moteur de prédiction est chargé",
+                1 if model_state['status'] == 'ready' else 0)]
+    if live_bundle is not None:
+        samples.append(('pendulum_model_info', 'gauge', "Versions du modèle chargées (servie ou candidate)",
+                        {(('version', bundle.version), ('role', role)): 1
+                         for role, bundle in (('active', live_bundle), ('candidate', shadow_bundle))
+                         if bundle is not None}))
+    if result_cache is not None:
+        info = result_cache.info()
+        samples.append(('pendulum_cache_lookups_total', 'counter', "Consultations du cache par résultat",
+                        {(('result', key),): info[key] for key in ('memory_hits', 'disk_hits', 'misses')}))
+        samples.append(('pendulum_cache_evictions_total', 'counter', "Entrées évincées du LRU", info['evictions']))
+        samples.append(('pendulum_cache_entries', 'gauge', "Entrées du LRU en mémoire", info['memory_entries']))
+    if job_manager is not None:
+        samples.append(('pendulum_jobs', 'gauge', "Travaux asynchrones par état",
+                        {(('status', status),): count for status, count in job_manager.stats()['jobs'].items()}))
+    return samples
+
+def start_profiler():
+    """Profilage à la demande (PROFILING_ENABLED + ?profile=1 ou en-tête X-Profile) ; None sinon"""
+    kind = request.args.get('profile') or request.headers.get('X-Profile')
+    if not app_config.PROFILING_ENABLED or not kind:
         return None
+    if kind == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("pyinstrument n'est pas installé, repli sur cProfile")
+        else:
+            profiler = Profiler()
+            profiler.start()
+            return kind, profiler
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return 'cprofile', profiler
+
+def stop_profiler(profile, response):
+    """Arrête le profileur et écrit le rapport dans PROFILE_DIR (.prof pour cProfile, .html pour pyinstrument)"""
+    kind, profiler = profile
+    os.makedirs(app_config.PROFILE_DIR, exist_ok=True)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint}-{os.getpid()}-{id(profiler):x}"
+    if kind == 'pyinstrument':
+        profiler.stop()
+        path = os.path.join(app_config.PROFILE_DIR, name + '.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    else:
+        profiler.disable()
+        path = os.path.join(app_config.PROFILE_DIR, name + '.prof')
+        profiler.dump_stats(path)
+    response.headers['X-Profile-File'] = path
+    logger.info("Profil de %s écrit dans %s", request.path, path)
 
+@bp.before_request
+def before_request():
+    g.request_start = time.perf_counter()
+    g.profile = start_profiler()
+    ensure_registry_watcher()
+
+@bp.after_request
+def after_request(response):
+    # Pour les réponses en flux, la mesure s'arrête à la création de la réponse
+    if g.get('profile') is not None:
+        stop_profiler(g.profile, response)
+    start = g.get('request_start')
+    if start is not None:
+        REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=request.endpoint,
+                                 method=request.method, status=response.status_code)
+    return response
+
+# --- FONCTIONS UTILITAIRES ---
 def prepare_features_for_mlp(params, scaler):
     """Prépare les features pour le modèle MLP en suivant le même format d'entraînement"""
-    shape = params['shape']
-    fluid = params['fluid']
-    dims = params['dims']
-    m = params['m']
-    L = params['L']
-    theta0_deg = params['theta0_deg']  # Utiliser theta0_deg au lieu de theta0_rad
-    theta0_rad = np.deg2rad(theta0_deg)  # Convertir en radians
-    Tc = params.get('Tc', 0.005)  # Valeur par défaut si Tc n'existe pas
+    return build_feature_matrix([params], FLUID_PROPERTIES, scaler)
+
+def mlp_available():
+    """Indique si un moteur de prédiction MLP est chargé"""
+    return current_bundle() is not None
+
+def predict_configurations(configurations, bundle=None):
+    """Prédit le temps de stabilisation d'un lot de configurations avec le modèle servi.
+
+    bundle fixe la version utilisée (une requête qui prédit en plusieurs fois la prend une fois
+    pour toutes). Si une version candidate est chargée, le lot lui est aussi soumis en arrière-plan.
+    """
+    with PHASE_DURATION.time(phase='features'):
+        features = build_feature_matrix(configurations, FLUID_PROPERTIES)
+    return predict_features(features, bundle)
+
+def predict_features(features, bundle=None):
+    """Prédiction à partir des features brutes (standardisées sur place si le modèle a un scaler)"""
+    bundle = bundle or current_bundle()
+    shadow = shadow_bundle
+    raw_features = features.copy() if shadow is not None else None
+    if bundle.scaler is not None:
+        with PHASE_DURATION.time(phase='scaler'):
+            apply_scaler(features, bundle.scaler)
+    start = time.perf_counter()
+    with PHASE_DURATION.time(phase='predict'):
+        predicted = predict_stop_times(bundle.engine, features)
+    if shadow is not None:
+        submit_shadow(shadow, raw_features, predicted, time.perf_counter() - start)
+    return predicted
+
+# --- MODE SHADOW ---
+# La version candidate prédit les mêmes lots que la version servie, dans un thread dédié et
+# sans effet sur les réponses. Au-delà de SHADOW_MAX_PENDING lots en attente, les lots sont
+# ignorés plutôt que de retarder les requêtes.
+shadow_executor = None
+shadow_executor_pid = None
+shadow_lock = threading.Lock()
+shadow_slots = threading.BoundedSemaphore(app_config.SHADOW_MAX_PENDING)
+shadow_stats = {}
+
+def get_shadow_executor():
+    """Crée le thread d'évaluation shadow de ce processus au premier lot"""
+    global shadow_executor, shadow_executor_pid
+    with shadow_lock:
+        if shadow_executor_pid != os.getpid():
+            from concurrent.futures import ThreadPoolExecutor
+            shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+            shadow_executor_pid = os.getpid()
+        return shadow_executor
+
+def submit_shadow(shadow, features, live_predicted, live_seconds):
+    if not shadow_slots.acquire(blocking=False):
+        SHADOW_PREDICTIONS.inc(status='dropped')
+        return
+    try:
+        get_shadow_executor().submit(run_shadow, shadow, features, live_predicted, live_seconds)
+    except RuntimeError:
+        shadow_slots.release()
+
+def run_shadow(shadow, features, live_predicted, live_seconds):
+    """Prédit le lot avec la version candidate et enregistre latence et écarts à la version servie"""
+    try:
+        start = time.perf_counter()
+        predicted = shadow.predict(features)
+        seconds = time.perf_counter() - start
+        delta = np.abs(np.log1p(predicted) - np.log1p(live_predicted)).ravel()
+        SHADOW_PREDICTIONS.inc(status='ok')
+        SHADOW_LATENCY.observe(live_seconds, role='active')
+        SHADOW_LATENCY.observe(seconds, role='candidate')
+        for value in delta:
+            SHADOW_DELTA.observe(float(value))
+        with shadow_lock:
+            stats = shadow_stats.setdefault(shadow.version, {
+                'batches': 0, 'predictions': 0, 'active_seconds': 0.0, 'candidate_seconds': 0.0,
+                'delta_log1p_sum': 0.0, 'delta_log1p_max': 0.0})
+            stats['batches'] += 1
+            stats['predictions'] += int(delta.size)
+            stats['active_seconds'] += live_seconds
+            stats['candidate_seconds'] += seconds
+            stats['delta_log1p_sum'] += float(delta.sum())
+            stats['delta_log1p_max'] = max(stats['delta_log1p_max'], float(delta.max(initial=0.0)))
+    except Exception as e:
+        SHADOW_PREDICTIONS.inc(status='error')
+        logger.error("Mode shadow : prédiction de la version %s impossible : %s", shadow.version, e)
+    finally:
+        shadow_slots.release()
+
+def shadow_summary():
+    """Statistiques shadow de ce processus, par version candidate"""
+    with shadow_lock:
+        return {version: dict(stats,
+                              delta_log1p_mean=stats['delta_log1p_sum'] / max(stats['predictions'], 1),
+                              active_mean_seconds=stats['active_seconds'] / stats['batches'],
+                              candidate_mean_seconds=stats['candidate_seconds'] / stats['batches'])
+                for version, stats in shadow_stats.items()}
+
+def configuration_arrays(configurations):
+    """Paramètres physiques d'un lot de configurations : (I, m, L, S, Cd, rho_fluid, V, Tc, theta0_rad)"""
+    n = len(configurations)
+    shape_codes = np.empty(n, dtype=np.intp)
+    dims = np.zeros((n, 3))
+    m = np.empty(n)
+    L = np.empty(n)
+    Tc = np.empty(n)
+    theta0_rad = np.empty(n)
+    rho_fluid = np.empty(n)
+    for i, params in enumerate(configurations):
+        if params['shape'] not in SHAPES:
+            raise ValueError(f"Forme '{params['shape']}' non reconnue.")
+        shape_codes[i] = SHAPES.index(params['shape'])
+        row_dims = [float(d) for d in params['dims'][:3]]
+        dims[i, :len(row_dims)] = row_dims
+        m[i] = float(params['m'])
+        L[i] = float(params['L'])
+        Tc[i] = float(params.get('Tc', TC_DRY_FRICTION))
+        theta0_rad[i] = np.deg2rad(float(params['theta0_deg']))
+        rho_fluid[i] = FLUID_PROPERTIES[params['fluid']]['rho']
+    I, S, Cd, V_object = calculate_properties_batch(shape_codes, dims, m, L)
+    return I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0_rad
+
+def simulate_stop_times(configurations):
+    """Temps de stabilisation d'un lot avec l'intégrateur vectorisé ; NaN si pas de stabilisation"""
+    arrays = configuration_arrays(configurations)
+    with PHASE_DURATION.time(phase='solve_batch'):
+        return integrate_batch_auto(
+            *arrays, g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH, epsilon=EPSILON, t_max=T_MAX_SIMULATION,
+            sample_dt=stop_grid_step(T_MAX_SIMULATION)
+        )
+
+def analytic_configurations(configurations):
+    """Backend 'analytic' : estimation par bilan d'énergie (analytique.py) ; NaN si pas de stabilisation"""
+    arrays = configuration_arrays(configurations)
+    with PHASE_DURATION.time(phase='analytic'):
+        t_epsilon, _ = estimate_stop_times(*arrays, g=G, b_pivot=B_PIVOT, epsilon=EPSILON, t_max=T_MAX_SIMULATION)
+    return t_epsilon
+
+def lookup_configurations(configurations):
+    """Backend 'lookup' : interpolation dans la table, repli sur la simulation hors couverture.
+
+    Retourne (temps, borne d'erreur relative, couvert) ; temps vaut NaN si le pendule ne se
+    stabilise pas, et la borne vaut 0 pour les configurations simulées.
+    """
+    with PHASE_DURATION.time(phase='lookup'):
+        t_epsilon, error_bound, covered = lookup_engine.predict(configurations)
+    fallback = np.flatnonzero(~covered)
+    if fallback.size:
+        LOOKUP_FALLBACKS.inc(int(fallback.size))
+        t_epsilon[fallback], _ = simulate_stop_times([configurations[i] for i in fallback])
+        error_bound[fallback] = 0.0
+    return t_epsilon, error_bound, covered
+
+def serving_backend(backend):
+    """Backend qui sert la requête : l'estimateur analytique remplace le MLP s'il n'est pas chargé"""
+    if backend == 'mlp' and app_config.ANALYTIC_FALLBACK and not mlp_available():
+        ANALYTIC_FALLBACKS.inc()
+        return 'analytic'
+    return backend
+
+def backend_available(backend):
+    """Indique si le backend de prédiction demandé est chargé"""
+    if backend == 'analytic':
+        return True
+    if backend == 'lookup':
+        ensure_models_loaded()
+        return lookup_engine is not None
+    return mlp_available()
+
+def backend_settings(backend, bundle=None):
+    """Réglages du backend qui entrent dans la clé de cache des prédictions (bundle : modèle servi)"""
+    if backend == 'analytic':
+        return {'analytic': ANALYTIC_VERSION}
+    if backend == 'lookup':
+        return {'lookup': LOOKUP_HASH, 'tolerance': app_config.LOOKUP_TOLERANCE, 'solver': SOLVER_SETTINGS}
+    return {'model': bundle.hash}
+
+def backend_info(backend):
+    if backend == 'analytic':
+        return {'name': "Bilan d'énergie semi-analytique", 'performance': 'erreur médiane ~4 %, sans modèle'}
+    if backend == 'lookup':
+        return {'name': 'Table interpolée', 'performance': f"borne d'erreur log1p ≤ {app_config.LOOKUP_TOLERANCE}, "
+                                                           "simulation hors couverture"}
+    return {'name': 'MLP Neural Network', 'performance': 'R² = 0.9915, RMSE = 40.34s'}
+
+def parse_configurations(req):
+    """Lit un lot de configurations : JSON {"configurations": [...]}, liste JSON ou NDJSON"""
+    if req.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        lines = req.get_data(as_text=True).splitlines()
+        return [json.loads(line) for line in lines if line.strip()]
+    data = req.get_json()
+    return data['configurations'] if isinstance(data, dict) else data
+
+def run_configuration(L, m, theta0_deg, shape, fluid, dims, step_callback=None):
+    """Simule une configuration ; retourne le résumé de la réponse et la trajectoire d'animation (t, theta en rad)"""
+    theta0_rad = np.deg2rad(theta0_deg)
+    rho_fluid = FLUID_PROPERTIES[fluid]['rho']
     
     # Calculer les propriétés physiques
     I, S, Cd, V_object = calculate_properties(shape, dims, m, L)
     
-    # Créer le DataFrame avec les mêmes colonnes que l'entraînement
-    #L	m	theta0_rad	Tc	fluid	dim1	dim2	dim3	surface	volume	inertie	shape_cylindre	shape_pavé	shape_sphère
-    data_dict = {
-        'L': [L],
-        'm': [m],
-        'theta0_rad': [theta0_rad],
-        'Tc': [Tc],
-        'fluid': [FLUID_PROPERTIES[fluid]['rho']],  # Convertir en densité numérique
-        'dim1': [dims[0]],
-        'dim2': [dims[1] if len(dims) > 1 else 0],
-        'dim3': [dims[2] if len(dims) > 2 else 0]
-    }
+    # Déterminer la position d'équilibre
+    theta_eq = equilibrium_angle(m, rho_fluid, V_object, G)
     
-    # Ajouter les colonnes calculées
-    data_dict['surface'] = [S]
-    data_dict['volume'] = [V_object]
-    data_dict['inertie'] = [I]
-    data_dict['shape_cylindre'] = [1 if shape == 'cylindre' else 0]
-    data_dict['shape_pavé'] = [1 if shape == 'pavé' else 0]
-    data_dict['shape_sphère'] = [1 if shape == 'sphère' else 0]
+    logger.debug("Propriétés %s : I=%.6g, S=%.6g, V=%.6g ; équilibre theta_eq=%s rad (rho_fluid=%s)",
+                 shape, I, S, V_object, theta_eq, rho_fluid)
     
-    # Créer le DataFrame
-    df = pd.DataFrame(data_dict)
-
+    # Lancer la simulation (arrêt dès la stabilisation, après la fenêtre d'animation)
+    y0 = [theta0_rad, 0.0]
+    fun, args, method, options = make_pendulum_system(
+        I, m, L, S, Cd, rho_fluid, V_object, TC_DRY_FRICTION,
+        g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH,
+        backend=ODE_BACKEND, method=ODE_METHOD, reference_ode=pendulum_ode
+    )
+    with PHASE_DURATION.time(phase='solve'):
+        solution = solve_until_settled(
+            fun, y0, args=args,
+            theta_eq=theta_eq, epsilon=EPSILON, t_max=T_MAX_SIMULATION,
+            t_min=ANIMATION_WINDOW if EARLY_STOP else T_MAX_SIMULATION,
+            t_eval=STOP_GRID, method=method, dense_output=True, step_callback=step_callback, **options
+        )
+    record_solver_stats(method, solution.status, solution.nfev, solution.nsteps)
     
+    # Analyser le résultat
+    t_sim = solution.t
+    theta_sim = solution.y[0]
+    t_stop = solution.t_stop
     
+    # Préparer les données pour l'animation
+    with PHASE_DURATION.time(phase='interpolation'):
+        t_anim = np.arange(0, min(t_sim[-1], ANIMATION_WINDOW), 0.1)  # Limiter à 100s pour l'animation
+        theta_anim = solution.sol(t_anim)[0]
     
-    # IMPORTANT: Réorganiser les colonnes dans l'ordre attendu par le scaler
-    # Le scaler attend 14 colonnes dans cet ordre exact
-    expected_order = [
-        'L', 'm', 'theta0_rad', 'Tc', 'fluid', 'dim1', 'dim2', 'dim3', 
-        'surface', 'volume', 'inertie', 'shape_cylindre', 'shape_pavé', 'shape_sphère'
-    ]
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Simulation: %d pas, t=[%.3f, %.3f] s, theta=[%.3f, %.3f]°, t_stop=%s, nfev=%d",
+                     solution.nsteps, t_sim[0], t_sim[-1], np.rad2deg(theta_sim[0]), np.rad2deg(theta_sim[-1]),
+                     t_stop, solution.nfev)
+        logger.debug("Animation: %d points, t=[%.3f, %.3f] s", len(t_anim), t_anim[0], t_anim[-1])
     
-    # Réorganiser et retourner
-    df_final = scaler.transform(df[expected_order])
+    # Préparer le résumé de la réponse
+    summary = {
+        'success': True,
+        'simulation_time': float(t_sim[-1]) if len(t_sim) > 0 else 0,
+        'stop_time': float(t_stop) if t_stop is not None else None,
+        'theta_eq_deg': float(np.rad2deg(theta_eq)),
+        'parameters': {
+            'L': L,
+            'm': m,
+            'shape': shape,
+            'fluid': fluid,
+            'dims': dims,
+            'I': float(I),
+            'S': float(S),
+            'Cd': float(Cd),
+            'V': float(V_object)
+        }
+    }
+    return summary, t_anim, theta_anim
+
+def simulate_configuration(L, m, theta0_deg, shape, fluid, dims, step_callback=None):
+    """Simule une configuration et construit la réponse JSON de /api/simulate"""
+    response, t_anim, theta_anim = run_configuration(L, m, theta0_deg, shape, fluid, dims, step_callback)
     
-    return df_final
+    with PHASE_DURATION.time(phase='serialization'):
+        response['animation_data'] = animation_payload(L, t_anim, theta_anim)
+    return response
+
+def animation_payload(L, t_anim, theta_anim):
+    """Données d'animation de la réponse JSON de /api/simulate"""
+    # Convertir en degrés pour l'affichage
+    theta_deg = np.rad2deg(theta_anim)
+    return {
+        'time': t_anim.tolist(),
+        'theta_deg': theta_deg.tolist(),
+        'x_pos': (L * np.sin(theta_anim)).tolist(),
+        'y_pos': (L * np.cos(theta_anim)).tolist()  # Supprimer le signe négatif
+    }
+
+def parse_simulation_params(data):
+    """Extrait et convertit les paramètres d'une requête de simulation"""
+    return {
+        'L': float(data['L']),
+        'm': float(data['m']),
+        'theta0_deg': float(data['theta0_deg']),
+        'shape': data['shape'],
+        'fluid': data['fluid'],
+        'dims': [float(d) for d in data['dims']]
+    }
+
+def validate_simulation_params(params):
+    """Vérifie une configuration contre Config.PARAM_LIMITS ; retourne les paramètres avec les
+    seules dimensions de la forme (ValueError sinon)"""
+    shape, fluid = params['shape'], params['fluid']
+    if shape not in SHAPE_REGISTRY:
+        raise ValueError(f"Forme '{shape}' non reconnue")
+    if fluid not in FLUID_PROPERTIES:
+        raise ValueError(f"Fluide '{fluid}' non reconnu")
+    limits = app_config.PARAM_LIMITS
+    for name in ('L', 'm', 'theta0_deg'):
+        low, high = limits[name]['min'], limits[name]['max']
+        if not low <= params[name] <= high:
+            raise ValueError(f"{name} doit être compris entre {low} et {high}")
+    n_dims = SHAPE_REGISTRY[shape].n_dims
+    if len(params['dims']) < n_dims:
+        raise ValueError(f"La forme {shape} attend {n_dims} dimension(s)")
+    low, high = limits['dimensions']['min'], limits['dimensions']['max']
+    for k, value in enumerate(params['dims'][:n_dims]):
+        if not low <= value <= high:
+            raise ValueError(f"dim{k + 1} doit être comprise entre {low} et {high}")
+    return dict(params, dims=params['dims'][:n_dims])
+
+def parse_stream_options(data):
+    """Échantillonnage d'une trajectoire diffusée (sample_dt, window, chunk_size), borné par
+    STREAM_MAX_SAMPLES et STREAM_MAX_CHUNK_SIZE (ValueError sinon)"""
+    sample_dt = float(data.get('sample_dt', app_config.STREAM_SAMPLE_DT))
+    window = min(float(data.get('window', ANIMATION_WINDOW)), T_MAX_SIMULATION)
+    chunk_size = int(data.get('chunk_size', app_config.STREAM_CHUNK_SIZE))
+    if not sample_dt > 0 or not window >= 0:
+        raise ValueError('sample_dt doit être positif et window positive ou nulle')
+    if window / sample_dt > app_config.STREAM_MAX_SAMPLES:
+        raise ValueError(f"window / sample_dt limité à {app_config.STREAM_MAX_SAMPLES} échantillons")
+    if not 0 < chunk_size <= app_config.STREAM_MAX_CHUNK_SIZE:
+        raise ValueError(f"chunk_size doit être compris entre 1 et {app_config.STREAM_MAX_CHUNK_SIZE}")
+    return sample_dt, window, chunk_size
+
+def simulation_cache_key(params):
+    """Clé de cache d'une simulation (paramètres + réglages du solveur)"""
+    if result_cache is None:
+        return None
+    return result_cache.key('simulate', dict(params, Tc=TC_DRY_FRICTION), SOLVER_SETTINGS)
+
+# --- MODE HYBRIDE : PRÉDICTION PUIS VÉRIFICATION ---
+MODEL_RMSE = app_config.MODEL_INFO['performance']['RMSE']
+
+def hybrid_margin(prediction_backend, predicted_time):
+    """Marge autour de la prédiction, selon l'erreur du backend qui l'a produite.
+
+    RMSE absolu pour le MLP ; l'erreur de l'estimation analytique est relative, la marge est
+    donc proportionnelle au temps prédit.
+    """
+    if predicted_time is None:
+        return None
+    if prediction_backend == 'analytic':
+        return app_config.HYBRID_MARGIN_SIGMAS * app_config.HYBRID_ANALYTIC_ERROR * predicted_time
+    return app_config.HYBRID_MARGIN_SIGMAS * MODEL_RMSE
+
+def hybrid_prediction_backend(bundle):
+    """Backend de prédiction du mode hybride (None : ni modèle ni estimation analytique)"""
+    prediction_backend = serving_backend('mlp')
+    if prediction_backend == 'mlp' and bundle is None:
+        return None
+    return prediction_backend
+
+def hybrid_horizons(predicted_time, margin):
+    """Horizons successifs : prédiction + marge, puis marge doublée à chaque prolongation (bornés par T_MAX)"""
+    if predicted_time is None:
+        return [float(T_MAX_SIMULATION)]
+    horizons = []
+    for i in range(app_config.HYBRID_MAX_EXTENSIONS + 1):
+        horizons.append(min(float(T_MAX_SIMULATION), predicted_time + margin * (2 ** (i + 1) - 1)))
+        if horizons[-1] >= T_MAX_SIMULATION:
+            break
+    return horizons
+
+def hybrid_configuration(L, m, theta0_deg, shape, fluid, dims, bundle=None, prediction_backend=None):
+    """Prédit le temps de stabilisation avec le MLP puis le vérifie par une simulation bornée.
+
+    L'intégration s'arrête dès la stabilisation ; tant qu'elle n'est pas détectée, l'horizon
+    passe à la prolongation suivante. Les prolongations sont enchaînées dans une seule
+    intégration, car le solveur continue là où il en était. Sans modèle chargé, l'horizon part
+    de l'estimation analytique (ou de T_MAX_SIMULATION si elle est désactivée). bundle et
+    prediction_backend (hybrid_prediction_backend) sont fixés par la requête avant la clé de cache.
+    """
+    predicted_time = None
+    params = {'L': L, 'm': m, 'theta0_deg': theta0_deg, 'shape': shape, 'fluid': fluid, 'dims': dims,
+              'Tc': TC_DRY_FRICTION}
+    if prediction_backend == 'analytic':
+        estimate = analytic_configurations([params])[0]
+        predicted_time = float(estimate) if not np.isnan(estimate) else None
+    elif prediction_backend == 'mlp':
+        predicted_time = float(predict_configurations([params], bundle)[0])
+    margin = hybrid_margin(prediction_backend, predicted_time)
+    horizons = hybrid_horizons(predicted_time, margin)
+
+    theta0_rad = np.deg2rad(theta0_deg)
+    rho_fluid = FLUID_PROPERTIES[fluid]['rho']
+    I, S, Cd, V_object = calculate_properties(shape, dims, m, L)
+    theta_eq = equilibrium_angle(m, rho_fluid, V_object, G)
+    fun, args, method, options = make_pendulum_system(
+        I, m, L, S, Cd, rho_fluid, V_object, TC_DRY_FRICTION,
+        g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH,
+        backend=ODE_BACKEND, method=ODE_METHOD, reference_ode=pendulum_ode
+    )
+    with PHASE_DURATION.time(phase='solve'):
+        solution = solve_until_settled(
+            fun, [theta0_rad, 0.0], args=args,
+            theta_eq=theta_eq, epsilon=EPSILON, t_max=horizons[-1], t_eval=STOP_GRID, method=method, **options
+        )
+    record_solver_stats(method, solution.status, solution.nfev, solution.nsteps)
+
+    simulation_time = float(solution.t[-1])
+    t_stop = float(solution.t_stop) if solution.t_stop is not None else None
+    extensions = min(int(np.searchsorted(horizons, simulation_time)), len(horizons) - 1)
+    if solution.status < 0:
+        status = 'failed'
+    elif t_stop is not None:
+        status = 'verified'
+    elif horizons[-1] >= T_MAX_SIMULATION:
+        status = 'not_settled'     # vérité terrain : pas de stabilisation avant T_MAX_SIMULATION
+    else:
+        status = 'unverified'      # prolongations épuisées sans stabilisation
+    saved_fraction = max(0.0, 1.0 - simulation_time / T_MAX_SIMULATION)
+    HYBRID_RUNS.inc(status=status)
+    HYBRID_SAVED.observe(saved_fraction)
+
+    error = t_stop - predicted_time if (t_stop is not None and predicted_time is not None) else None
+    return {
+        'success': status != 'failed',
+        'status': status,
+        'predicted_time': predicted_time,
+        'prediction_backend': prediction_backend,
+        'model_version': bundle.version if prediction_backend == 'mlp' else None,
+        'stop_time': t_stop,
+        'prediction_error': error,
+        'within_margin': bool(abs(error) <= margin) if error is not None else None,
+        'theta_eq_deg': float(np.rad2deg(theta_eq)),
+        'horizon': {
+            'initial': horizons[0],
+            'final': horizons[extensions],
+            'extensions': extensions,
+            'margin': margin
+        },
+        'compute': {
+            'simulation_time': simulation_time,
+            'reference_time': float(T_MAX_SIMULATION),
+            'saved_fraction': saved_fraction,
+            'nfev': int(solution.nfev),
+            'nsteps': int(solution.nsteps)
+        }
+    }
+
+# --- TRAVAUX ASYNCHRONES ---
+job_manager = None
+job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    """Crée le pool de simulation au premier travail soumis"""
+    global job_manager
+    with job_manager_lock:
+        if job_manager is None:
+            job_manager = JobManager(
+                simulate_configuration, T_MAX_SIMULATION,
+                max_workers=app_config.JOB_MAX_WORKERS,
+                max_pending=app_config.JOB_MAX_PENDING,
+                timeout=app_config.JOB_TIMEOUT,
+                result_ttl=app_config.JOB_RESULT_TTL
+            )
+        return job_manager
+
+# --- BALAYAGES DE PARAMÈTRES ---
+sweep_pool = None
+sweep_pool_lock = threading.Lock()
+
+def get_sweep_pool():
+    """Crée le pool des simulations de balayage au premier balayage"""
+    global sweep_pool
+    with sweep_pool_lock:
+        if sweep_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            sweep_pool = ProcessPoolExecutor(max_workers=app_config.SWEEP_MAX_WORKERS)
+        return sweep_pool
+
+def sweep_physics():
+    """Constantes transmises aux processus du pool de balayage"""
+    return {
+        'G': G, 'B_PIVOT': B_PIVOT, 'ALPHA_TANH': ALPHA_TANH, 'EPSILON': EPSILON, 'Tc': TC_DRY_FRICTION,
+        'T_MAX_SIMULATION': T_MAX_SIMULATION, 'ODE_BACKEND': ODE_BACKEND, 'ODE_METHOD': ODE_METHOD,
+        'fluids': {name: props['rho'] for name, props in FLUID_PROPERTIES.items()}
+    }
 
 # --- ROUTES FLASK ---
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/api/simulate', methods=['POST'])
+@bp.route('/api/simulate', methods=['POST'])
 def simulate_pendulum():
     """API pour la simulation du pendule"""
     try:
-        data = request.get_json()
-        
         # Extraire les paramètres
-        L = float(data['L'])
-        m = float(data['m'])
-        theta0_deg = float(data['theta0_deg'])
-        shape = data['shape']
-        fluid = data['fluid']
-        dims = [float(d) for d in data['dims']]
+        params = parse_simulation_params(request.get_json())
+        cache_key = simulation_cache_key(params)
         
-        theta0_rad = np.deg2rad(theta0_deg)
-        rho_fluid = FLUID_PROPERTIES[fluid]['rho']
+        # Réponse binaire compacte si le client la demande (Accept: application/octet-stream)
+        if request.accept_mimetypes.best_match(['application/json', TRAJECTORY_MIMETYPE]) == TRAJECTORY_MIMETYPE:
+            encoding = request.args.get('encoding', 'float32')
+            if encoding not in ENCODINGS:
+                return jsonify({'success': False, 'error': f"Encodage '{encoding}' non reconnu"}), 400
+            return simulate_binary(params, cache_key, encoding)
         
-        # Calculer les propriétés physiques
-        I, S, Cd, V_object = calculate_properties(shape, dims, m, L)
+        # Résultat déjà calculé pour ces paramètres ?
+        cached = cached_response(cache_key)
+        if cached is not None:
+            return cached
         
-        # Déterminer la position d'équilibre
-        effective_weight = m * G - rho_fluid * V_object * G
-        theta_eq = np.pi if effective_weight < 0 else 0
+        response = simulate_configuration(**params)
+        return cache_response(cache_key, response)
         
-        # Debug: afficher les valeurs pour comprendre
-        print(f"🔍 Debug équilibre: m={m}, rho_fluid={rho_fluid}, V={V_object}")
-        print(f"🔍 effective_weight={effective_weight}, theta_eq={theta_eq} rad = {np.rad2deg(theta_eq)}°")
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def simulate_binary(params, cache_key, encoding):
+    """Réponse de /api/simulate au format binaire (trajectoire.py) : temps et theta en tableaux compacts"""
+    cached = result_cache.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        summary = json.loads(cached)
+        animation_data = summary.pop('animation_data')
+        t_anim = animation_data['time']
+        theta_anim = np.deg2rad(animation_data['theta_deg'])
+    else:
+        summary, t_anim, theta_anim = run_configuration(**params)
+    with PHASE_DURATION.time(phase='serialization'):
+        body = encode_trajectory(summary, t_anim, theta_anim, encoding)
+        # Même entrée que /api/simulate en JSON : la réponse sert aux deux formats
+        if cached is None and cache_key is not None:
+            payload = dict(summary, animation_data=animation_payload(params['L'], t_anim, theta_anim))
+            result_cache.set(cache_key, json.dumps(payload))
+    response = Response(body, mimetype=TRAJECTORY_MIMETYPE)
+    response.headers['X-Cache'] = 'HIT' if cached is not None else 'MISS'
+    return response
+
+@bp.route('/api/simulate/stream', methods=['POST'])
+def simulate_stream():
+    """API de simulation en flux : la trajectoire est envoyée par morceaux (NDJSON ou SSE)"""
+    try:
+        data = request.get_json()
+        params = parse_simulation_params(data)
+        sample_dt, window, chunk_size = parse_stream_options(data)
+        use_sse = data.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    L, m, shape, fluid, dims = params['L'], params['m'], params['shape'], params['fluid'], params['dims']
+    theta0_rad = np.deg2rad(params['theta0_deg'])
+    rho_fluid = FLUID_PROPERTIES[fluid]['rho']
+
+    def encode(message):
+        text = json.dumps(message)
+        return f"event: {message['type']}\ndata: {text}\n\n" if use_sse else text + '\n'
+
+    def generate():
+        try:
+            I, S, Cd, V_object = calculate_properties(shape, dims, m, L)
+            theta_eq = equilibrium_angle(m, rho_fluid, V_object, G)
+            yield encode({
+                'type': 'meta',
+                'theta_eq_deg': float(np.rad2deg(theta_eq)),
+                'sample_dt': sample_dt,
+                'window': window,
+                'parameters': {
+                    'L': L, 'm': m, 'shape': shape, 'fluid': fluid, 'dims': dims,
+                    'I': float(I), 'S': float(S), 'Cd': float(Cd), 'V': float(V_object)
+                }
+            })
+            
+            fun, args, method, options = make_pendulum_system(
+                I, m, L, S, Cd, rho_fluid, V_object, TC_DRY_FRICTION,
+                g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH,
+                backend=ODE_BACKEND, method=ODE_METHOD, reference_ode=pendulum_ode
+            )
+            trajectory = iter_trajectory(
+                fun, [theta0_rad, 0.0], args, theta_eq, EPSILON, T_MAX_SIMULATION,
+                sample_dt=sample_dt, window=window, chunk_size=chunk_size,
+                early_stop=EARLY_STOP, method=method, t_eval=STOP_GRID, **options
+            )
+            solve_time = 0.0
+            while True:
+                start = time.perf_counter()
+                try:
+                    t_chunk, theta_chunk = next(trajectory)
+                except StopIteration as stop:
+                    summary = stop.value
+                    break
+                finally:
+                    solve_time += time.perf_counter() - start
+                yield encode({
+                    'type': 'chunk',
+                    'time': t_chunk.tolist(),
+                    'theta_deg': np.rad2deg(theta_chunk).tolist(),
+                    'x_pos': (L * np.sin(theta_chunk)).tolist(),
+                    'y_pos': (L * np.cos(theta_chunk)).tolist()
+                })
+            
+            PHASE_DURATION.observe(solve_time, phase='solve')
+            record_solver_stats(method, summary['status'], summary['nfev'])
+            t_stop = summary['t_stop']
+            yield encode({
+                'type': 'done',
+                'success': summary['status'] >= 0,
+                'stop_time': float(t_stop) if t_stop is not None else None,
+                'simulation_time': float(summary['simulation_time'])
+            })
+        except Exception as e:
+            yield encode({'type': 'error', 'success': False, 'error': str(e)})
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# --- PRÉDICTION ET SIMULATION COMBINÉES (/api/run) ---
+run_pool = None
+run_pool_pid = None
+run_pool_lock = threading.Lock()
+
+class RunCancelled(Exception):
+    """Client de /api/run déconnecté : interrompt l'intégration au pas suivant"""
+
+def get_run_pool():
+    """Crée les threads d'intégration de /api/run de ce processus à la première requête"""
+    global run_pool, run_pool_pid
+    with run_pool_lock:
+        if run_pool_pid != os.getpid():
+            from concurrent.futures import ThreadPoolExecutor
+            run_pool = ThreadPoolExecutor(max_workers=app_config.RUN_MAX_WORKERS, thread_name_prefix='run')
+            run_pool_pid = os.getpid()
+        return run_pool
+
+def run_prediction(params, I, S, Cd, V_object):
+    """Message 'prediction' de /api/run, à partir des propriétés physiques déjà calculées"""
+    start = time.perf_counter()
+    backend = serving_backend('mlp')
+    message = {'type': 'prediction', 'success': True, 'backend': backend}
+    if backend == 'analytic':
+        with PHASE_DURATION.time(phase='analytic'):
+            t_epsilon, _ = estimate_stop_times(
+                I, params['m'], params['L'], S, Cd, FLUID_PROPERTIES[params['fluid']]['rho'], V_object,
+                TC_DRY_FRICTION, np.deg2rad(params['theta0_deg']),
+                g=G, b_pivot=B_PIVOT, epsilon=EPSILON, t_max=T_MAX_SIMULATION)
+        message.update(predicted_time=float(t_epsilon[0]) if not np.isnan(t_epsilon[0]) else None, fallback=True)
+    else:
+        bundle = current_bundle()
+        if bundle is None:
+            return {'type': 'prediction', 'success': False, 'error': 'Modèle ou scaler non chargé'}
+        with PHASE_DURATION.time(phase='features'):
+            features = configuration_features(dict(params, Tc=TC_DRY_FRICTION), FLUID_PROPERTIES, I, V_object)
+        message.update(predicted_time=float(predict_features(features, bundle)[0]), model_version=bundle.version)
+    message.update(model_info=backend_info(backend), seconds=time.perf_counter() - start)
+    return message
+
+@bp.route('/api/run', methods=['POST'])
+def run_combined():
+    """API combinée : prédiction MLP et simulation d'une même configuration, en flux (NDJSON ou SSE).
+
+    Les paramètres sont validés une fois contre PARAM_LIMITS et les propriétés physiques
+    calculées une fois pour les deux. L'intégration part dans un thread du pool pendant que la
+    prédiction est calculée : le message prediction arrive en premier, puis meta, les morceaux
+    de trajectoire (chunk) au fil de l'intégration et done.
+    """
+    try:
+        data = request.get_json()
+        params = validate_simulation_params(parse_simulation_params(data))
+        sample_dt, window, chunk_size = parse_stream_options(data)
+        use_sse = data.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    L, m, shape, fluid, dims = params['L'], params['m'], params['shape'], params['fluid'], params['dims']
+    rho_fluid = FLUID_PROPERTIES[fluid]['rho']
+
+    def encode(message):
+        text = json.dumps(message)
+        return f"event: {message['type']}\ndata: {text}\n\n" if use_sse else text + '\n'
+
+    def generate():
+        messages = queue.Queue()
+        cancelled = threading.Event()
+
+        def check_cancelled(t):
+            if cancelled.is_set():
+                raise RunCancelled()
+
+        def integrate():
+            # Thread du pool : ('chunk', t, theta)..., puis ('done', résumé, durée) ou ('error', exception, durée)
+            solve_time = 0.0
+            try:
+                fun, args, method, options = make_pendulum_system(
+                    I, m, L, S, Cd, rho_fluid, V_object, TC_DRY_FRICTION,
+                    g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH,
+                    backend=ODE_BACKEND, method=ODE_METHOD, reference_ode=pendulum_ode
+                )
+                trajectory = iter_trajectory(
+                    fun, [np.deg2rad(params['theta0_deg']), 0.0], args, theta_eq, EPSILON, T_MAX_SIMULATION,
+                    sample_dt=sample_dt, window=window, chunk_size=chunk_size,
+                    early_stop=EARLY_STOP, method=method, step_callback=check_cancelled, t_eval=STOP_GRID, **options
+                )
+                while not cancelled.is_set():
+                    start = time.perf_counter()
+                    try:
+                        t_chunk, theta_chunk = next(trajectory)
+                    except StopIteration as stop:
+                        solve_time += time.perf_counter() - start
+                        record_solver_stats(method, stop.value['status'], stop.value['nfev'])
+                        messages.put(('done', stop.value, solve_time))
+                        return
+                    solve_time += time.perf_counter() - start
+                    messages.put(('chunk', t_chunk, theta_chunk))
+            except RunCancelled:
+                pass
+            except Exception as e:
+                messages.put(('error', e, solve_time))
+
+        try:
+            I, S, Cd, V_object = calculate_properties(shape, dims, m, L)
+            theta_eq = equilibrium_angle(m, rho_fluid, V_object, G)
+            get_run_pool().submit(integrate)
+
+            try:
+                yield encode(run_prediction(params, I, S, Cd, V_object))
+            except Exception as e:
+                yield encode({'type': 'prediction', 'success': False, 'error': str(e)})
+            yield encode({
+                'type': 'meta',
+                'theta_eq_deg': float(np.rad2deg(theta_eq)),
+                'sample_dt': sample_dt,
+                'window': window,
+                'parameters': {
+                    'L': L, 'm': m, 'shape': shape, 'fluid': fluid, 'dims': dims,
+                    'I': float(I), 'S': float(S), 'Cd': float(Cd), 'V': float(V_object)
+                }
+            })
+
+            while True:
+                kind, payload, extra = messages.get()
+                if kind == 'chunk':
+                    yield encode({
+                        'type': 'chunk',
+                        'time': payload.tolist(),
+                        'theta_deg': np.rad2deg(extra).tolist(),
+                        'x_pos': (L * np.sin(extra)).tolist(),
+                        'y_pos': (L * np.cos(extra)).tolist()
+                    })
+                    continue
+                PHASE_DURATION.observe(extra, phase='solve')
+                if kind == 'error':
+                    raise payload
+                t_stop = payload['t_stop']
+                yield encode({
+                    'type': 'done',
+                    'success': payload['status'] >= 0,
+                    'stop_time': float(t_stop) if t_stop is not None else None,
+                    'simulation_time': float(payload['simulation_time'])
+                })
+                break
+        except Exception as e:
+            yield encode({'type': 'error', 'success': False, 'error': str(e)})
+        finally:
+            # Client déconnecté : l'intégration s'arrête au pas suivant (check_cancelled)
+            cancelled.set()
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/simulate/jobs', methods=['POST'])
+def submit_simulation_job():
+    """API pour soumettre une simulation asynchrone ; retourne l'identifiant du travail"""
+    try:
+        data = request.get_json()
+        params = parse_simulation_params(data)
         
-        # Lancer la simulation
-        y0 = [theta0_rad, 0.0]
-        solution = solve_ivp(
-            fun=pendulum_ode, 
-            t_span=[0, T_MAX_SIMULATION], 
-            y0=y0,
-            method='RK45', 
-            dense_output=True,
-            args=(I, m, L, S, Cd, rho_fluid, V_object, TC_DRY_FRICTION, ALPHA_TANH)
-        )
+        # Résultat déjà en cache : pas besoin de passer par la file
+        cache_key = simulation_cache_key(params)
+        if cache_key is not None:
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return jsonify({'success': True, 'job_id': None, 'status': 'done', 'progress': 1.0,
+                                'result': json.loads(cached)})
         
-        # Analyser le résultat
-        t_sim = solution.t
-        theta_sim = solution.y[0]
-        t_stop = find_stop_time(t_sim, theta_sim, EPSILON, theta_eq)
+        timeout = float(data['timeout']) if 'timeout' in data else None
+        job_id = get_job_manager().submit(params, timeout=timeout)
         
-        # Debug: afficher les résultats de simulation
-        print(f"🔍 Debug simulation: t_sim={len(t_sim)} points, theta_sim={len(theta_sim)} points")
-        print(f"🔍 Debug simulation: t_sim[0]={t_sim[0]:.3f}s, t_sim[-1]={t_sim[-1]:.3f}s")
-        print(f"🔍 Debug simulation: theta_sim[0]={np.rad2deg(theta_sim[0]):.3f}°, theta_sim[-1]={np.rad2deg(theta_sim[-1]):.3f}°")
-        print(f"🔍 Debug simulation: t_stop={t_stop}")
+        response = {
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/simulate/jobs/{job_id}'
+        }
+        return jsonify(response), 202
         
-        # Préparer les données pour l'animation
-        t_anim = np.arange(0, min(t_sim[-1], 100), 0.1)  # Limiter à 100s pour l'animation
-        theta_anim = solution.sol(t_anim)[0]
+    except QueueFull:
+        response = jsonify({'success': False, 'error': 'File de simulation pleine, réessayez plus tard'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/simulate/jobs/<job_id>', methods=['GET'])
+def simulation_job_status(job_id):
+    """API pour suivre un travail : état, progression et résultat une fois terminé"""
+    status = get_job_manager().status(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': 'Travail inconnu'}), 404
+    return jsonify(dict(status, success=True))
+
+@bp.route('/api/simulate/jobs/<job_id>', methods=['DELETE'])
+def cancel_simulation_job(job_id):
+    """API pour annuler un travail en file ou en cours"""
+    if not get_job_manager().cancel(job_id):
+        return jsonify({'success': False, 'error': 'Travail inconnu'}), 404
+    return jsonify({'success': True, 'job_id': job_id, 'status': 'cancelling'})
+
+@bp.route('/api/simulate/hybrid', methods=['POST'])
+def simulate_hybrid():
+    """API hybride : prédiction MLP puis simulation de vérification bornée par la prédiction"""
+    try:
+        params = parse_simulation_params(request.get_json())
+        
+        bundle = current_bundle()
+        prediction_backend = hybrid_prediction_backend(bundle)
+        cache_key = None
+        if result_cache is not None:
+            cache_key = result_cache.key('hybrid', dict(params, Tc=TC_DRY_FRICTION), dict(
+                SOLVER_SETTINGS, prediction_backend=prediction_backend,
+                prediction=backend_settings(prediction_backend, bundle) if prediction_backend else None,
+                margin_sigmas=app_config.HYBRID_MARGIN_SIGMAS, analytic_error=app_config.HYBRID_ANALYTIC_ERROR,
+                max_extensions=app_config.HYBRID_MAX_EXTENSIONS))
+            cached = cached_response(cache_key)
+            if cached is not None:
+                return cached
+        
+        response = hybrid_configuration(**params, bundle=bundle, prediction_backend=prediction_backend)
+        return cache_response(cache_key, response)
         
-        # Debug: afficher les données d'animation
-        print(f"🔍 Debug animation: t_anim={len(t_anim)} points, theta_anim={len(theta_anim)} points")
-        print(f"🔍 Debug animation: t_anim[0]={t_anim[0]:.3f}s, t_anim[-1]={t_anim[-1]:.3f}s")
-        print(f"🔍 Debug animation: theta_anim[0]={np.rad2deg(theta_anim[0]):.3f}°, theta_anim[-1]={np.rad2deg(theta_anim[-1]):.3f}°")
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/sweep', methods=['POST'])
+def sweep():
+    """API de balayage d'un ou deux paramètres, envoyée en flux (NDJSON ou SSE).
+
+    Messages : meta (axes), grid (prédiction MLP de toute la grille), sensitivity (indices
+    de Sobol), point (un par simulation de raffinement, dans l'ordre d'achèvement), puis
+    done (grille corrigée par les simulations).
+    """
+    try:
+        data = request.get_json()
+        base = dict(parse_simulation_params(data), Tc=TC_DRY_FRICTION)
+        if base['fluid'] not in FLUID_PROPERTIES:
+            raise SweepError(f"Fluide '{base['fluid']}' non reconnu")
+        axes = parse_axes(data.get('parameters'), base['shape'], app_config.PARAM_LIMITS,
+                          app_config.SWEEP_DEFAULT_POINTS, app_config.SWEEP_MAX_POINTS)
+        n_refine = int(data.get('refine', app_config.SWEEP_REFINE_POINTS))
+        if not 0 <= n_refine <= app_config.SWEEP_MAX_REFINE:
+            raise SweepError(f"refine doit être compris entre 0 et {app_config.SWEEP_MAX_REFINE}")
+        with_sensitivity = bool(data.get('sensitivity', True))
+        use_sse = data.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    bundle = current_bundle()
+    if bundle is None:
+        return jsonify({'success': False, 'error': 'Modèle ou scaler non chargé'}), 500
+
+    grid_shape = tuple(len(values) for _, _, values in axes)
+
+    def encode(message):
+        text = json.dumps(message)
+        return f"event: {message['type']}\ndata: {text}\n\n" if use_sse else text + '\n'
+
+    def generate():
+        futures = {}
+        try:
+            yield encode({
+                'type': 'meta',
+                'parameters': [{'name': name, 'scale': scale, 'values': values.tolist()} for name, scale, values in axes],
+                'shape': list(grid_shape),
+                'base': base,
+                'refine': min(n_refine, int(np.prod(grid_shape))),
+                'model_version': bundle.version
+            })
+
+            # Basse fidélité : toute la grille en un seul passage du MLP
+            start = time.perf_counter()
+            configurations = grid_configurations(base, axes)
+            predicted = np.asarray(predict_configurations(configurations, bundle), dtype=np.float64).reshape(grid_shape)
+            SWEEP_POINTS.inc(predicted.size, fidelity='mlp')
+            yield encode({'type': 'grid', 'source': 'mlp', 'predicted': predicted.tolist(),
+                          'seconds': time.perf_counter() - start})
+
+            # Haute fidélité : simulations soumises au pool avant le calcul de sensibilité
+            refinement = select_refinement(predicted, n_refine)
+            if refinement:
+                pool = get_sweep_pool()
+                physics = sweep_physics()
+                flat = [int(np.ravel_multi_index(index, grid_shape)) for index in refinement]
+                futures = {pool.submit(simulate_point, configurations[i], physics): index
+                           for i, index in zip(flat, refinement)}
+
+            if with_sensitivity:
+                start = time.perf_counter()
+                with PHASE_DURATION.time(phase='sensitivity'):
+                    sensitivity = sobol_sensitivity(lambda batch: predict_configurations(batch, bundle), base, axes,
+                                                    app_config.PARAM_LIMITS, app_config.SWEEP_SOBOL_SAMPLES, seed=0)
+                yield encode(dict(sensitivity, type='sensitivity', source='mlp',
+                                  seconds=time.perf_counter() - start))
+
+            from concurrent.futures import as_completed
+            refined = {}
+            start = time.perf_counter()
+            for future in as_completed(futures):
+                index = futures[future]
+                result = future.result()
+                refined[index] = result['t_stop']
+                SWEEP_POINTS.inc(fidelity='simulation')
+                record_solver_stats(result['method'], result['status'], result['nfev'])
+                yield encode({
+                    'type': 'point',
+                    'index': list(index),
+                    'values': {name: float(values[i]) for (name, _, values), i in zip(axes, index)},
+                    'predicted': float(predicted[index]),
+                    'simulated': result['t_stop'],
+                    'completed': len(refined),
+                    'total': len(futures)
+                })
+            if futures:
+                PHASE_DURATION.observe(time.perf_counter() - start, phase='sweep_refine')
+
+            corrected = correct_surface(predicted, axes, refined)
+            yield encode({
+                'type': 'done',
+                'success': True,
+                'corrected': corrected.tolist(),
+                'simulated': len(refined),
+                'not_settled': sum(t is None for t in refined.values())
+            })
+        except Exception as e:
+            yield encode({'type': 'error', 'success': False, 'error': str(e)})
+        finally:
+            # Client déconnecté ou erreur : les simulations non démarrées sont abandonnées
+            for future in futures:
+                future.cancel()
+
+    mimetype = 'text/event-stream' if use_sse else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/simulate_batch', methods=['POST'])
+def simulate_batch():
+    """API pour simuler un lot de configurations avec l'intégrateur vectorisé"""
+    try:
+        data = request.get_json()
+        configurations = data['configurations']
+        if len(configurations) > BATCH_MAX_SIZE:
+            return jsonify({'success': False, 'error': f'Lot limité à {BATCH_MAX_SIZE} configurations'}), 400
         
-        # Convertir en degrés pour l'affichage
-        theta_deg = np.rad2deg(theta_anim)
+        n = len(configurations)
+        BATCH_SIZE.observe(n, endpoint='simulate_batch')
+        t_stop, theta_eq = simulate_stop_times(configurations)
         
-        # Préparer la réponse
         response = {
             'success': True,
-            'simulation_time': float(t_sim[-1]) if len(t_sim) > 0 else 0,
-            'stop_time': float(t_stop) if t_stop is not None else None,
-            'theta_eq_deg': float(np.rad2deg(theta_eq)),
-            'animation_data': {
-                'time': t_anim.tolist(),
-                'theta_deg': theta_deg.tolist(),
-                'x_pos': (L * np.sin(theta_anim)).tolist(),
-                'y_pos': (L * np.cos(theta_anim)).tolist()  # Supprimer le signe négatif
-            },
-            'parameters': {
-                'L': L,
-                'm': m,
-                'shape': shape,
-                'fluid': fluid,
-                'dims': dims,
-                'I': float(I),
-                'S': float(S),
-                'Cd': float(Cd),
-                'V': float(V_object)
-            }
+            'count': n,
+            'stop_times': [float(t) if not np.isnan(t) else None for t in t_stop],
+            'theta_eq_deg': np.rad2deg(theta_eq).tolist()
         }
         
         return jsonify(response)
@@ -246,47 +1354,186 @@ def simulate_pendulum():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/predict', methods=['POST'])
+@bp.route('/api/predict', methods=['POST'])
 def predict_stabilization():
-    """API pour la prédiction avec le modèle MLP"""
+    """API pour la prédiction avec le modèle MLP (table interpolée : backend='lookup', bilan d'énergie : 'analytic')"""
     try:
-        if model is None or scaler is None:
-            return jsonify({'success': False, 'error': 'Modèle ou scaler non chargé'}), 500
-            
         data = request.get_json()
+        requested = data.get('backend', 'mlp')
+        if requested not in PREDICTION_BACKENDS:
+            return jsonify({'success': False, 'error': f"Backend '{requested}' non reconnu"}), 400
+        backend = serving_backend(requested)
+        if not backend_available(backend):
+            error = 'Table de temps de stabilisation non construite' if backend == 'lookup' else 'Modèle ou scaler non chargé'
+            return jsonify({'success': False, 'error': error}), 500
+        bundle = current_bundle() if backend == 'mlp' else None
         
-        # Préparer les features
-        features = prepare_features_for_mlp(data, scaler)
+        # Prédiction déjà calculée pour ces paramètres et ce modèle ?
+        cache_key = None
+        if result_cache is not None:
+            cache_key = result_cache.key('predict', {
+                'L': float(data['L']), 'm': float(data['m']), 'theta0_deg': float(data['theta0_deg']),
+                'shape': data['shape'], 'fluid': data['fluid'], 'dims': [float(d) for d in data['dims']],
+                'Tc': float(data.get('Tc', TC_DRY_FRICTION))
+            }, dict(backend_settings(backend, bundle), requested=requested))
+            cached = cached_response(cache_key)
+            if cached is not None:
+                return cached
         
-        # Debug: afficher les features
-        print(f"🔍 Debug MLP - Features shape: {features.shape}")
-        print(f"🔍 Debug MLP - Features: {features}")
+        if backend == 'analytic':
+            t_epsilon = analytic_configurations([data])[0]
+            response = {
+                'success': True,
+                'backend': backend,
+                'predicted_time': float(t_epsilon) if not np.isnan(t_epsilon) else None,
+                'model_info': backend_info(backend)
+            }
+            if requested != backend:
+                response['fallback'] = True
+            return cache_response(cache_key, response)
         
-        # Faire la prédiction
-        prediction = model.predict(features)[0]
+        if backend == 'lookup':
+            t_epsilon, error_bound, covered = lookup_configurations([data])
+            response = {
+                'success': True,
+                'backend': backend,
+                'predicted_time': float(t_epsilon[0]) if not np.isnan(t_epsilon[0]) else None,
+                'source': 'table' if covered[0] else 'simulation',
+                'error_bound': float(error_bound[0]),
+                'model_info': backend_info(backend)
+            }
+            return cache_response(cache_key, response)
         
-        # Debug: afficher la prédiction
-        print(f"🔍 Debug MLP - Prédiction brute: {prediction}")
+        # Faire la prédiction (prédictions négatives repliées)
+        prediction = predict_configurations([data], bundle)[0]
         
-        # Gérer les prédictions négatives
-        if prediction < 0:
-            prediction = abs(prediction)
-            print(f"🔍 Debug MLP - Prédiction corrigée: {prediction}")
+        logger.debug("Prédiction MLP (%s): %s", bundle.version, prediction)
         
         response = {
             'success': True,
+            'backend': backend,
             'predicted_time': float(prediction),
-            'model_info': {
-                'name': 'MLP Neural Network',
-                'performance': 'R² = 0.9915, RMSE = 40.34s'
-            }
+            'model_version': bundle.version,
+            'model_info': backend_info(backend)
         }
         
+        return cache_response(cache_key, response)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/predict_batch', methods=['POST'])
+def predict_batch():
+    """API pour la prédiction d'un lot de configurations (JSON ou NDJSON), backend MLP, lookup ou analytic"""
+    try:
+        requested = request.args.get('backend', 'mlp')
+        if requested not in PREDICTION_BACKENDS:
+            return jsonify({'success': False, 'error': f"Backend '{requested}' non reconnu"}), 400
+        backend = serving_backend(requested)
+        if not backend_available(backend):
+            error = 'Table de temps de stabilisation non construite' if backend == 'lookup' else 'Modèle ou scaler non chargé'
+            return jsonify({'success': False, 'error': error}), 500
+        
+        configurations = parse_configurations(request)
+        if len(configurations) > BATCH_MAX_SIZE:
+            return jsonify({'success': False, 'error': f'Lot limité à {BATCH_MAX_SIZE} configurations'}), 400
+        
+        BATCH_SIZE.observe(len(configurations), endpoint='predict_batch')
+        response = {'success': True, 'count': len(configurations), 'backend': backend}
+        if requested != backend:
+            response['fallback'] = True
+        if backend == 'analytic':
+            t_epsilon = analytic_configurations(configurations)
+            response['predicted_times'] = [float(t) if not np.isnan(t) else None for t in t_epsilon]
+        elif backend == 'lookup':
+            t_epsilon, error_bound, covered = lookup_configurations(configurations)
+            response['predicted_times'] = [float(t) if not np.isnan(t) else None for t in t_epsilon]
+            response['error_bounds'] = error_bound.tolist()
+            response['simulated'] = int((~covered).sum())
+        else:
+            bundle = current_bundle()
+            response['predicted_times'] = predict_configurations(configurations, bundle).tolist()
+            response['model_version'] = bundle.version
+        response['model_info'] = backend_info(backend)
+        
         return jsonify(response)
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Sonde de disponibilité : 200 une fois les modèles chargés (ou absents), 503 pendant le chargement"""
+    if model_state['status'] == 'pending':
+        start_model_loading()
+    ready = model_state['status'] in ('ready', 'degraded')
+    response = {
+        'status': model_state['status'],
+        'models': dict(model_state, preloaded=model_state['loaded_by_pid'] not in (None, os.getpid())),
+        'pid': os.getpid(),
+        'uptime': round(time.time() - STARTED_AT, 3),
+        'cache': result_cache is not None,
+        'jobs': job_manager is not None
+    }
+    return jsonify(response), 200 if ready else 503
+
+@bp.route('/api/models', methods=['GET'])
+def models_status():
+    """API du registre de modèles : versions publiées, version servie, précédente et candidate, écarts shadow"""
+    ensure_models_loaded()
+    active, candidate = registry_pointers
+
+    def describe(bundle):
+        return bundle.describe() if bundle is not None else None
+
+    return jsonify({
+        'success': True,
+        'registry': model_registry.directory,
+        'versions': model_registry.versions(),
+        'pointers': {'active': active, 'candidate': candidate},
+        'watching': registry_watcher_pid == os.getpid(),
+        'active': describe(live_bundle),
+        'previous': describe(previous_bundle),
+        'candidate': describe(shadow_bundle),
+        'shadow': shadow_summary(),
+        'pid': os.getpid()
+    })
+
+@bp.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Métriques au format texte Prometheus (propres au processus worker)"""
+    if not app_config.METRICS_ENABLED:
+        return jsonify({'success': False, 'error': 'Métriques désactivées'}), 404
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
+
+@bp.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """API pour consulter les compteurs du cache de résultats"""
+    if result_cache is None:
+        return jsonify({'success': True, 'enabled': False})
+    return jsonify({'success': True, 'enabled': True, 'stats': result_cache.info()})
+
+# --- FABRIQUE D'APPLICATION ---
+def create_app(config_object=None):
+    """Crée l'application Flask.
+
+    Avec WARM_START, les modèles sont chargés immédiatement : sous gunicorn --preload
+    (gunicorn.conf.py), cela se produit une seule fois dans le maître avant le fork des
+    workers. Sinon, ils sont chargés en arrière-plan au premier appel de /healthz, ou au
+    premier usage.
+    """
+    config_object = config_object or app_config
+    logging.basicConfig(level=config_object.LOG_LEVEL,
+                        format='%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s')
+    flask_app = Flask(__name__)
+    flask_app.config.from_object(config_object)
+    flask_app.register_blueprint(bp)
+    if config_object.WARM_START:
+        load_models()
+    return flask_app
+
+app = create_app()
+
 if __name__ == '__main__':
     app.run(
         debug=app_config.DEBUG,
@@ -0,0 +1,229 @@
+"""Balayage de paramètres multi-fidélité et analyse de sensibilité (/api/sweep).
+
+Un balayage fait varier un ou deux paramètres (L, m, theta0_deg, dim1..dim3) autour d'une
+configuration de base, sur une grille régulière (linéaire ou logarithmique) :
+
+1. le MLP évalue toute la grille en un seul appel vectorisé (basse fidélité) ;
+2. les indices de Sobol (premier ordre et total) sont estimés avec scipy.stats.sobol_indices,
+   sur le MLP, pour tous les paramètres continus de la forme ;
+3. quelques points de la grille, répartis régulièrement et complétés là où la courbe
+   prédite varie le plus, sont simulés dans un pool de processus (haute fidélité) ;
+4. l'écart simulation - MLP (échelle log1p) aux points simulés est interpolé sur toute la
+   grille pour corriger la prédiction.
+
+Ce module ne dépend pas de Flask : app.py fournit la fonction de prédiction et le pool.
+"""
+import math
+
+import numpy as np
+
+from acceleration import make_pendulum_system
+from integrateur import solve_until_settled
+from physique import SHAPE_REGISTRY, calculate_properties, equilibrium_angle, stop_grid
+
+SCALAR_PARAMETERS = ('L', 'm', 'theta0_deg')
+SHAPE_DIMS = {name: shape.n_dims for name, shape in SHAPE_REGISTRY.items()}
+SCALES = ('linear', 'log')
+
+
+class SweepError(ValueError):
+    """Requête de balayage invalide (paramètre inconnu, bornes, taille de grille)."""
+
+
+def parameter_names(shape):
+    """Paramètres balayables pour une forme : L, m, theta0_deg puis dim1..dimN."""
+    if shape not in SHAPE_DIMS:
+        raise SweepError(f"Forme '{shape}' non reconnue")
+    return list(SCALAR_PARAMETERS) + [f'dim{k + 1}' for k in range(SHAPE_DIMS[shape])]
+
+
+def parameter_limits(name, param_limits):
+    """Bornes (min, max) d'un paramètre dans Config.PARAM_LIMITS."""
+    key = 'dimensions' if name.startswith('dim') else name
+    return float(param_limits[key]['min']), float(param_limits[key]['max'])
+
+
+def with_values(base, names, values):
+    """Copie de la configuration de base avec les paramètres names remplacés par values."""
+    params = dict(base, dims=list(base['dims']))
+    for name, value in zip(names, values):
+        if name.startswith('dim'):
+            params['dims'][int(name[3:]) - 1] = float(value)
+        else:
+            params[name] = float(value)
+    return params
+
+
+def parse_axes(specs, shape, param_limits, default_points, max_points):
+    """Valide les paramètres balayés ; retourne [(nom, échelle, valeurs), ...].
+
+    specs : liste de noms ou de dictionnaires {name, min, max, points, scale} ; les bornes
+    absentes sont celles de Config.PARAM_LIMITS, qu'elles ne peuvent pas dépasser.
+    """
+    if not specs or len(specs) > 2:
+        raise SweepError('Il faut un ou deux paramètres à balayer')
+    allowed = parameter_names(shape)
+    axes = []
+    for spec in specs:
+        spec = {'name': spec} if isinstance(spec, str) else dict(spec)
+        name = spec.get('name')
+        if name not in allowed:
+            raise SweepError(f"Paramètre '{name}' non balayable pour la forme {shape} ({', '.join(allowed)})")
+        if name in [axis[0] for axis in axes]:
+            raise SweepError(f"Paramètre '{name}' balayé deux fois")
+        low_limit, high_limit = parameter_limits(name, param_limits)
+        low = float(spec.get('min', low_limit))
+        high = float(spec.get('max', high_limit))
+        if not low_limit <= low < high <= high_limit:
+            raise SweepError(f"Bornes de '{name}' invalides : il faut {low_limit} <= min < max <= {high_limit}")
+        scale = spec.get('scale', 'linear')
+        if scale not in SCALES:
+            raise SweepError(f"Échelle '{scale}' non reconnue ({', '.join(SCALES)})")
+        points = int(spec.get('points', default_points[len(specs) - 1]))
+        if points < 2:
+            raise SweepError('Il faut au moins 2 points par paramètre')
+        values = np.geomspace(low, high, points) if scale == 'log' else np.linspace(low, high, points)
+        axes.append((name, scale, values))
+    size = math.prod(len(values) for _, _, values in axes)
+    if size > max_points:
+        raise SweepError(f'Grille de {size} points : maximum {max_points}')
+    return axes
+
+
+def grid_configurations(base, axes):
+    """Configurations de tous les points de la grille, dans l'ordre C (dernier axe le plus rapide)."""
+    names = [name for name, _, _ in axes]
+    mesh = np.meshgrid(*[values for _, _, values in axes], indexing='ij')
+    return [with_values(base, names, point) for point in zip(*(axis.ravel() for axis in mesh))]
+
+
+def select_refinement(predicted, n_points):
+    """Choisit n_points indices (multi-indices de la grille) à simuler.
+
+    La moitié est répartie régulièrement sur chaque axe (extrémités comprises), le reste va
+    aux points où log1p(prédiction) varie le plus entre voisins.
+    """
+    shape = predicted.shape
+    n_points = min(n_points, predicted.size)
+    if n_points <= 0:
+        return []
+    per_axis = max(2, int(math.floor((n_points / 2) ** (1 / len(shape)))))
+    axis_indices = [np.unique(np.round(np.linspace(0, size - 1, min(per_axis, size))).astype(int)) for size in shape]
+    chosen = [tuple(int(i) for i in index) for index in zip(*(a.ravel() for a in np.meshgrid(*axis_indices,
+                                                                                                   indexing='ij')))]
+    chosen = chosen[:n_points]
+
+    log_t = np.log1p(np.maximum(predicted, 0.0))
+    gradients = np.gradient(log_t) if len(shape) > 1 else [np.gradient(log_t)]
+    variation = np.sqrt(sum(g ** 2 for g in gradients))
+    taken = set(chosen)
+    for flat in np.argsort(variation, axis=None)[::-1]:
+        if len(chosen) >= n_points:
+            break
+        index = tuple(int(i) for i in np.unravel_index(flat, shape))
+        if index not in taken:
+            taken.add(index)
+            chosen.append(index)
+    return chosen
+
+
+def correct_surface(predicted, axes, refined):
+    """Corrige la prédiction MLP par l'écart observé aux points simulés.
+
+    refined : {multi-index: temps simulé ou None}. L'écart log1p(simulé) - log1p(prédit)
+    est interpolé linéairement dans l'espace des axes (log pour les axes logarithmiques),
+    puis au plus proche voisin hors de l'enveloppe des points simulés.
+    """
+    points = [index for index, t in refined.items() if t is not None]
+    if not points:
+        return predicted.copy()
+    coords = [np.log(values) if scale == 'log' else np.asarray(values) for _, scale, values in axes]
+    residual = np.array([np.log1p(refined[index]) - np.log1p(max(predicted[index], 0.0)) for index in points])
+    sample = np.array([[coords[k][i] for k, i in enumerate(index)] for index in points])
+
+    if len(axes) == 1:
+        order = np.argsort(sample[:, 0])
+        correction = np.interp(coords[0], sample[order, 0], residual[order])
+    else:
+        from scipy.interpolate import griddata
+
+        mesh = np.stack(np.meshgrid(*coords, indexing='ij'), axis=-1).reshape(-1, len(axes))
+        # Coordonnées ramenées dans [0, 1] : les deux axes pèsent autant dans l'interpolation
+        low, span = mesh.min(axis=0), np.ptp(mesh, axis=0)
+        mesh, sample = (mesh - low) / span, (sample - low) / span
+        correction = np.full(len(mesh), np.nan)
+        if len(points) >= 3:
+            try:
+                correction = griddata(sample, residual, mesh, method='linear')
+            except Exception:
+                pass  # points simulés alignés : voisin le plus proche seulement
+        missing = np.isnan(correction)
+        if missing.any():
+            correction[missing] = griddata(sample, residual, mesh[missing], method='nearest')
+        correction = correction.reshape(predicted.shape)
+    return np.expm1(np.log1p(np.maximum(predicted, 0.0)) + correction)
+
+
+def sobol_sensitivity(predict, base, axes, param_limits, n_samples, seed=None):
+    """Indices de Sobol du temps prédit par le MLP.
+
+    Tous les paramètres continus de la forme varient : les paramètres balayés sur leur plage
+    de balayage, les autres sur Config.PARAM_LIMITS (uniforme, ou log-uniforme pour un axe
+    logarithmique). predict(configurations) -> tableau des temps.
+    Retourne {'parameters', 'first_order', 'total_order', 'evaluations'}.
+    """
+    from scipy import stats
+
+    swept = {name: (scale, values) for name, scale, values in axes}
+    names = parameter_names(base['shape'])
+    dists = []
+    for name in names:
+        if name in swept:
+            scale, values = swept[name]
+            low, high = float(values[0]), float(values[-1])
+        else:
+            scale = 'linear'
+            low, high = parameter_limits(name, param_limits)
+        dists.append(stats.loguniform(low, high) if scale == 'log' else stats.uniform(low, high - low))
+
+    def func(x):
+        configurations = [with_values(base, names, column) for column in x.T]
+        return np.asarray(predict(configurations), dtype=np.float64)[np.newaxis, :]
+
+    n = 2 ** max(1, int(round(math.log2(n_samples))))
+    result = stats.sobol_indices(func=func, n=n, dists=dists, random_state=seed)
+    return {
+        'parameters': names,
+        'first_order': np.nan_to_num(np.ravel(result.first_order)).tolist(),
+        'total_order': np.nan_to_num(np.ravel(result.total_order)).tolist(),
+        'evaluations': n * (len(names) + 2)
+    }
+
+
+def simulate_point(params, physics):
+    """Worker du pool : temps de stabilisation d'une configuration (None sans stabilisation).
+
+    Même modèle physique que /api/simulate ; une méthode 'RK45' configurée devient 'auto',
+    afin que les points raides (frottement sec dominant) passent par LSODA au lieu de
+    bloquer un processus du pool.
+    """
+    m, L = float(params['m']), float(params['L'])
+    I, S, Cd, V_object = calculate_properties(params['shape'], params['dims'], m, L)
+    rho_fluid = physics['fluids'][params['fluid']]
+    Tc = float(params.get('Tc', physics['Tc']))
+    theta_eq = equilibrium_angle(m, rho_fluid, V_object, physics['G'])
+    method = 'auto' if physics['ODE_METHOD'] == 'RK45' else physics['ODE_METHOD']
+    fun, args, method, options = make_pendulum_system(
+        I, m, L, S, Cd, rho_fluid, V_object, Tc,
+        g=physics['G'], b_pivot=physics['B_PIVOT'], alpha_tanh=physics['ALPHA_TANH'],
+        backend='python' if physics['ODE_BACKEND'] == 'numpy' else physics['ODE_BACKEND'], method=method
+    )
+    solution = solve_until_settled(fun, [np.deg2rad(float(params['theta0_deg'])), 0.0], args, theta_eq,
+                                   physics['EPSILON'], physics['T_MAX_SIMULATION'],
+                                   t_eval=stop_grid(physics['T_MAX_SIMULATION']), method=method, **options)
+    return {
+        't_stop': float(solution.t_stop) if solution.t_stop is not None else None,
+        'status': int(solution.status),
+        'method': method,
+        'nfev': int(solution.nfev)
+    }
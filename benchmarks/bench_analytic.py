@@ -0,0 +1,131 @@
+"""Validation et latence de l'estimateur analytique (analytique.py).
+
+Tire des tâches avec le plan d'expériences du collecteur et compare l'estimation à deux
+références :
+  - run_simulation (collecteur.py), qui a produit les données d'entraînement : ses pics sont
+    cherchés sur la grille de 0.1 s (physique.stop_grid), celle de tous les temps servis,
+    trop grossière pour les pendules rapides ;
+  - l'intégrateur vectorisé sans grille (LSODA pour les lignes raides), qui détecte les pics
+    aux points de rebroussement interpolés.
+Le MLP est évalué sur les mêmes tâches pour comparaison.
+
+Usage : python benchmarks/bench_analytic.py [--samples 300] [--seed 7] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from acceleration import integrate_batch_auto  # noqa: E402
+from analytique import estimate_stop_times  # noqa: E402
+from collecteur import make_task, run_simulation, sample_chunk  # noqa: E402
+from config import Config  # noqa: E402
+from physique import calculate_properties  # noqa: E402
+from predicteur import MLPNumpy, build_feature_matrix, predict_stop_times  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000]
+
+
+def make_tasks(n, seed):
+    return [make_task(i, row) for i, row in enumerate(sample_chunk(0, n, n, seed))]
+
+
+def task_arrays(tasks):
+    """(I, m, L, S, Cd, rho_fluid, V, Tc, theta0_rad) des tâches."""
+    properties = np.array([calculate_properties(t['shape'], t['dims'], t['m'], t['L']) for t in tasks])
+
+    def column(key):
+        return np.array([t[key] for t in tasks], dtype=np.float64)
+
+    rho = np.array([Config.FLUID_PROPERTIES[t['fluid']]['rho'] for t in tasks])
+    return (properties[:, 0], column('m'), column('L'), properties[:, 1], properties[:, 2], rho,
+            properties[:, 3], column('Tc'), column('theta0_rad'))
+
+
+def estimate(arrays):
+    return estimate_stop_times(*arrays, g=Config.G, b_pivot=Config.B_PIVOT, epsilon=Config.EPSILON,
+                               t_max=Config.T_MAX_SIMULATION)[0]
+
+
+def collector_truth(tasks):
+    t_true = np.array([run_simulation(task)['t_epsilon'] for task in tasks], dtype=np.float64)
+    t_true[t_true < 0] = np.nan
+    return t_true
+
+
+def turning_point_truth(arrays):
+    """Pics aux points de rebroussement interpolés (integrate_batch_auto sans grille)."""
+    return integrate_batch_auto(*arrays, g=Config.G, b_pivot=Config.B_PIVOT, alpha_tanh=Config.ALPHA_TANH,
+                                epsilon=Config.EPSILON, t_max=Config.T_MAX_SIMULATION)[0]
+
+
+def serving_configurations(tasks):
+    return [{'shape': t['shape'], 'fluid': t['fluid'], 'dims': list(t['dims']), 'm': t['m'], 'L': t['L'],
+             'theta0_deg': float(np.rad2deg(t['theta0_rad'])), 'Tc': t['Tc']} for t in tasks]
+
+
+def error_summary(predicted, t_true):
+    """(accord stabilisé / non stabilisé %, erreur relative médiane %, p90 %, RMSE log1p)."""
+    agreement = np.mean(np.isnan(predicted) == np.isnan(t_true)) * 100
+    mask = np.isfinite(predicted) & np.isfinite(t_true)
+    rel = np.abs(predicted[mask] - t_true[mask]) / np.maximum(t_true[mask], 1e-9)
+    log_rmse = np.sqrt(np.mean((np.log1p(predicted[mask]) - np.log1p(t_true[mask])) ** 2))
+    return f"{agreement:.1f}", f"{np.median(rel) * 100:.1f}", f"{np.percentile(rel, 90) * 100:.1f}", f"{log_rmse:.3f}"
+
+
+def timeit(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.samples, args.seed)
+    arrays = task_arrays(tasks)
+    start = time.perf_counter()
+    references = {'run_simulation': collector_truth(tasks)}
+    t_collector = time.perf_counter() - start
+    references['rebroussement'] = turning_point_truth(arrays)
+    print(f"Références : {args.samples} tâches, run_simulation en {t_collector:.1f} s\n")
+
+    predictions = {'analytic': estimate(arrays)}
+    if os.path.exists(Config.MLP_WEIGHTS_PATH):
+        engine = MLPNumpy.load(Config.MLP_WEIGHTS_PATH)
+        predictions['mlp'] = predict_stop_times(engine, build_feature_matrix(serving_configurations(tasks),
+                                                                             Config.FLUID_PROPERTIES)).ravel()
+
+    header = (f"{'backend':>9} {'référence':>15} {'accord %':>9} {'err. méd. %':>12} {'err. p90 %':>11} "
+              f"{'RMSE log1p':>11}")
+    print(header)
+    print('-' * len(header))
+    for name, predicted in predictions.items():
+        for reference, t_true in references.items():
+            print(f"{name:>9} {reference:>15} " + ' '.join(f'{v:>{w}}' for v, w in zip(
+                error_summary(predicted, t_true), (9, 12, 11, 11))))
+
+    header = f"\n{'lot':>6} {'analytic (µs)':>14} {'par config. (µs)':>17} {'run_simulation (µs)':>20}"
+    print(header)
+    print('-' * (len(header) - 1))
+    per_simulation = t_collector / len(tasks)
+    for n in (n for n in BATCH_SIZES if n <= len(tasks)):
+        batch = tuple(x[:n] for x in arrays)
+        t_a = timeit(lambda: estimate(batch), max(3, args.repeat // max(1, n // 100)))
+        print(f"{n:>6} {t_a * 1e6:>14.1f} {t_a / n * 1e6:>17.2f} {per_simulation * n * 1e6:>20.0f}")
+
+
+if __name__ == '__main__':
+    main()
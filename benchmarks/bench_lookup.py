@@ -0,0 +1,123 @@
+"""Benchmark des backends de prédiction : MLP contre table interpolée (tabulation.py).
+
+Tire des configurations dans le domaine d'entraînement, calcule la vérité terrain par
+simulation, puis compare pour chaque backend la latence par lot, la couverture (table)
+et l'erreur sur les configurations qui se stabilisent.
+
+Usage : python benchmarks/bench_lookup.py [--table lookup_table] [--samples 300] [--repeat 50]
+(la table doit avoir été construite par python tabulation.py)
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from physique import SHAPES  # noqa: E402
+from predicteur import MLPNumpy, build_feature_matrix  # noqa: E402
+from tabulation import SHAPE_DIMS, LookupTable, _simulate_block, training_bounds  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000]
+
+
+def make_configurations(n, seed=0):
+    bounds = training_bounds()
+    rng = np.random.default_rng(seed)
+    fluids = list(Config.FLUID_PROPERTIES)
+
+    def log_uniform(key):
+        low, high = bounds[key]
+        return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+    return [{
+        'shape': SHAPES[i % 3], 'fluid': fluids[(i // 3) % 3],
+        'L': log_uniform('L'), 'm': log_uniform('m'),
+        'theta0_deg': float(rng.uniform(*bounds['theta0_deg'])), 'Tc': Config.TC_DRY_FRICTION,
+        'dims': [log_uniform('dim') for _ in range(SHAPE_DIMS[SHAPES[i % 3]])],
+    } for i in range(n)]
+
+
+def ground_truth(configurations):
+    """t_epsilon simulé (NaN si pas de stabilisation), groupé par (forme, fluide)."""
+    physics = {key: getattr(Config, key) for key in ('G', 'B_PIVOT', 'ALPHA_TANH', 'EPSILON', 'T_MAX_SIMULATION')}
+    physics['Tc'] = Config.TC_DRY_FRICTION
+    t_true = np.full(len(configurations), np.nan)
+    groups = {}
+    for i, params in enumerate(configurations):
+        groups.setdefault((params['shape'], params['fluid']), []).append(i)
+    for (shape, fluid), rows in groups.items():
+        points = np.array([[configurations[i]['L'], configurations[i]['m'], configurations[i]['theta0_deg']]
+                           + configurations[i]['dims'] for i in rows])
+        _, log_t = _simulate_block((0, shape, Config.FLUID_PROPERTIES[fluid]['rho'], points, physics))
+        t_true[rows] = np.expm1(log_t.astype(np.float64))
+    return t_true
+
+
+def timeit(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples)
+
+
+def error_summary(predicted, t_true, mask):
+    mask = mask & np.isfinite(t_true) & np.isfinite(predicted)
+    if not mask.any():
+        return '-', '-', '-'
+    diff = predicted[mask] - t_true[mask]
+    rel = np.abs(diff) / np.maximum(t_true[mask], 1e-9)
+    return f"{np.sqrt(np.mean(diff ** 2)):.2f}", f"{np.median(rel) * 100:.1f}", f"{np.max(rel) * 100:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--table', default=Config.LOOKUP_TABLE_DIR)
+    parser.add_argument('--samples', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = MLPNumpy.load(Config.MLP_WEIGHTS_PATH)
+    table = LookupTable.load(args.table, Config, Config.LOOKUP_TOLERANCE)
+
+    configurations = make_configurations(args.samples)
+    start = time.perf_counter()
+    t_true = ground_truth(configurations)
+    t_sim = time.perf_counter() - start
+    print(f"Vérité terrain : {args.samples} simulations en {t_sim:.1f} s "
+          f"({np.isfinite(t_true).sum()} stabilisées)\n")
+
+    t_mlp = engine.predict(build_feature_matrix(configurations, Config.FLUID_PROPERTIES)).ravel()
+    t_lookup, _, covered = table.predict(configurations)
+    everything = np.ones(len(configurations), dtype=bool)
+
+    header = f"{'backend':>8} {'couverture':>11} {'RMSE (s)':>9} {'err. méd. %':>12} {'err. max %':>11}"
+    print(header)
+    print('-' * len(header))
+    print(f"{'mlp':>8} {'100.0 %':>11} " + ' '.join(f'{v:>{w}}' for v, w in zip(
+        error_summary(t_mlp, t_true, everything), (9, 12, 11))))
+    print(f"{'lookup':>8} {covered.mean() * 100:>9.1f} % " + ' '.join(f'{v:>{w}}' for v, w in zip(
+        error_summary(t_lookup, t_true, covered), (9, 12, 11))))
+    print(f"{'mlp':>8} {'(idem)':>11} " + ' '.join(f'{v:>{w}}' for v, w in zip(
+        error_summary(t_mlp, t_true, covered), (9, 12, 11))) + '  <- sur les points couverts par la table')
+
+    header = f"\n{'lot':>6} {'mlp (µs)':>10} {'lookup (µs)':>12} {'simulation (µs)':>16}"
+    print(header)
+    print('-' * (len(header) - 1))
+    per_simulation = t_sim / len(configurations)
+    for n in (n for n in BATCH_SIZES if n <= len(configurations)):
+        batch = configurations[:n]
+        repeat = max(3, args.repeat // max(1, n // 100))
+        t_m = timeit(lambda: engine.predict(build_feature_matrix(batch, Config.FLUID_PROPERTIES)), repeat)
+        t_l = timeit(lambda: table.predict(batch), repeat)
+        print(f"{n:>6} {t_m * 1e6:>10.1f} {t_l * 1e6:>12.1f} {per_simulation * n * 1e6:>16.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark de latence de l'inférence MLP : scikit-learn contre le moteur NumPy exporté.
+
+Usage : python benchmarks/bench_mlp.py [--repeat 200]
+(le fichier de poids doit avoir été produit par export_mlp.py)
+"""
+import argparse
+import os
+import sys
+import time
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from predicteur import MLPNumpy, build_feature_matrix  # noqa: E402
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def make_configurations(n, seed=0):
+    rng = np.random.default_rng(seed)
+    shapes = ['sphère', 'cylindre', 'pavé']
+    fluids = list(Config.FLUID_PROPERTIES)
+    return [{
+        'shape': shapes[i % 3], 'fluid': fluids[(i // 3) % 3],
+        'L': rng.uniform(0.1, 5.0), 'm': rng.uniform(0.001, 10.0),
+        'theta0_deg': rng.uniform(10, 90), 'Tc': 0.005,
+        'dims': list(rng.uniform(0.01, 1.0, 3)),
+    } for i in range(n)]
+
+
+def timeit(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    model = joblib.load(Config.MODEL_PATH)
+    scaler = joblib.load(Config.SCALER_PATH)
+    engine = MLPNumpy.load(Config.MLP_WEIGHTS_PATH)
+
+    header = f"{'lot':>6} {'sklearn (µs)':>13} {'numpy (µs)':>11} {'gain':>6} {'features (µs)':>14} {'prédictions/s':>14}"
+    print(header)
+    print('-' * len(header))
+    for n in BATCH_SIZES:
+        configurations = make_configurations(n)
+        scaled = build_feature_matrix(configurations, Config.FLUID_PROPERTIES, scaler)
+        raw = build_feature_matrix(configurations, Config.FLUID_PROPERTIES)
+        repeat = max(3, args.repeat // max(1, n // 100))
+        t_sklearn = timeit(lambda: model.predict(scaled), repeat)
+        t_numpy = timeit(lambda: engine.predict(raw), repeat)
+        t_features = timeit(lambda: build_feature_matrix(configurations, Config.FLUID_PROPERTIES), repeat)
+        print(f"{n:>6} {t_sklearn * 1e6:>13.1f} {t_numpy * 1e6:>11.1f} {t_sklearn / t_numpy:>5.1f}x "
+              f"{t_features * 1e6:>14.1f} {n / (t_numpy + t_features):>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
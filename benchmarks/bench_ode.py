@@ -0,0 +1,77 @@
+"""Benchmark des backends du second membre (numpy / python / numba) et des solveurs.
+
+Usage : python benchmarks/bench_ode.py [--repeat 3]
+
+Pour chaque couple forme/fluide, mesure le coût d'une évaluation du second membre et le
+temps d'une simulation complète (arrêt anticipé) pour chaque backend et méthode, avec le
+gain par rapport à la référence numpy + RK45.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from physique import calculate_properties, pendulum_ode  # noqa: E402
+from acceleration import make_pendulum_system, resolve_backend  # noqa: E402
+from integrateur import solve_until_settled  # noqa: E402
+
+SHAPES = {'sphère': [0.1], 'cylindre': [0.1, 0.2], 'pavé': [0.1, 0.15, 0.2]}
+CASES = [('numpy', 'RK45'), ('python', 'RK45'), ('numba', 'RK45'),
+         ('numba', 'LSODA'), ('numba', 'Radau'), ('numba', 'auto')]
+L, M, THETA0_DEG = 1.0, 2.0, 45.0
+
+
+def best_of(func, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--n-eval', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"Backend numba effectif : {resolve_backend('numba')}")
+    header = f"{'forme':<9} {'fluide':<6} {'backend':<7} {'méthode':<6} {'rhs (µs)':>9} {'simu (ms)':>10} {'gain':>6} {'t_stop':>9}"
+    print(header)
+    print('-' * len(header))
+    y = np.array([np.deg2rad(THETA0_DEG), 0.3])
+    for shape, dims in SHAPES.items():
+        for fluid, props in Config.FLUID_PROPERTIES.items():
+            rho_fluid = props['rho']
+            I, S, Cd, V_object = calculate_properties(shape, dims, M, L)
+            theta_eq = np.pi if M - rho_fluid * V_object < 0 else 0.0
+            reference = None
+            for backend, method in CASES:
+                fun, fargs, solver_method, options = make_pendulum_system(
+                    I, M, L, S, Cd, rho_fluid, V_object, Config.TC_DRY_FRICTION,
+                    g=Config.G, b_pivot=Config.B_PIVOT, alpha_tanh=Config.ALPHA_TANH,
+                    backend=backend, method=method, reference_ode=pendulum_ode
+                )
+                fun(0.0, y, *fargs)  # compilation / préchauffage
+                rhs_time, _ = best_of(lambda: [fun(0.0, y, *fargs) for _ in range(args.n_eval)], args.repeat)
+                sim_time, solution = best_of(lambda: solve_until_settled(
+                    fun, [np.deg2rad(THETA0_DEG), 0.0], fargs, theta_eq, Config.EPSILON,
+                    Config.T_MAX_SIMULATION, method=solver_method, **options
+                ), args.repeat)
+                if reference is None:
+                    reference = sim_time
+                t_stop = f"{solution.t_stop:.2f}" if solution.t_stop is not None else '--'
+                print(f"{shape:<9} {fluid:<6} {backend:<7} {solver_method:<6} "
+                      f"{rhs_time / args.n_eval * 1e6:>9.2f} {sim_time * 1e3:>10.1f} "
+                      f"{reference / sim_time:>5.1f}x {t_stop:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Latence perçue de l'interface : deux requêtes successives contre /api/run.
+
+Avant /api/run, l'interface enchaînait /api/simulate/stream puis /api/predict : la prédiction
+n'arrivait qu'après la fin de la simulation. /api/run envoie la prédiction en premier message
+pendant que l'intégration tourne dans un thread du pool. Mesure, via le client de test Flask
+(sans réseau), le délai jusqu'à la prédiction, jusqu'au premier morceau de trajectoire et
+jusqu'à la fin, pour chaque forme × fluide.
+
+Usage : python benchmarks/bench_run.py [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONFIGURATIONS = [
+    {'shape': shape, 'fluid': fluid, 'dims': dims, 'L': 1.0, 'm': 1.0, 'theta0_deg': 30.0}
+    for shape, dims in (('sphère', [0.1]), ('cylindre', [0.05, 0.2]), ('pavé', [0.1, 0.1, 0.1]))
+    for fluid in ('air', 'eau', 'huile')
+]
+
+
+def stream_timings(client, path, payload, start):
+    """Instants (depuis start) de chaque type de message d'un flux NDJSON."""
+    seen = {}
+    response = client.post(path, json=payload, buffered=False)
+    for block in response.response:
+        for line in block.decode().splitlines():
+            if line.strip():
+                seen.setdefault(json.loads(line)['type'], time.perf_counter() - start)
+    response.close()
+    return seen
+
+
+def sequential(client, payload):
+    """Ancien enchaînement de l'interface : simulation en flux, puis prédiction."""
+    start = time.perf_counter()
+    seen = stream_timings(client, '/api/simulate/stream', payload, start)
+    client.post('/api/predict', json=payload)
+    done = time.perf_counter() - start
+    return done, seen['chunk'], done
+
+
+def combined(client, payload):
+    start = time.perf_counter()
+    seen = stream_timings(client, '/api/run', payload, start)
+    return seen['prediction'], seen['chunk'], seen['done']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    import app as app_module
+
+    client = app_module.app.test_client()
+    combined(client, CONFIGURATIONS[0])  # préchauffage (compilation du second membre)
+
+    header = (f"{'configuration':>16} {'mode':>11} {'prédiction (ms)':>16} {'1er morceau (ms)':>17} "
+              f"{'fin (ms)':>9}")
+    print(header)
+    print('-' * len(header))
+    totals = {'séquentiel': [], '/api/run': []}
+    for payload in CONFIGURATIONS:
+        for mode, func in (('séquentiel', sequential), ('/api/run', combined)):
+            # theta0 décalé à chaque répétition : aucune réponse servie par le cache
+            samples = np.array([func(client, dict(payload, theta0_deg=payload['theta0_deg'] + i * 1e-3))
+                                for i in range(args.repeat)])
+            median = np.median(samples, axis=0) * 1e3
+            totals[mode].append(median)
+            print(f"{payload['shape'] + '/' + payload['fluid']:>16} {mode:>11} {median[0]:>16.1f} "
+                  f"{median[1]:>17.1f} {median[2]:>9.1f}")
+    print()
+    for mode, rows in totals.items():
+        mean = np.mean(rows, axis=0)
+        print(f"{'moyenne':>16} {mode:>11} {mean[0]:>16.1f} {mean[1]:>17.1f} {mean[2]:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
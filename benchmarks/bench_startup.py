@@ -0,0 +1,101 @@
+"""Benchmark de démarrage des workers : temps jusqu'à la première requête et mémoire par worker.
+
+Reproduit les deux modes de gunicorn sans en dépendre (Linux, lecture de /proc) :
+  - preload    : app.py est importé une fois dans le maître, puis les workers sont forkés
+                 (gunicorn.conf.py, preload_app = True) ;
+  - no-preload : chaque worker démarre un interpréteur et importe app.py lui-même.
+
+Chaque worker envoie /healthz puis un premier /api/predict ; les workers restent vivants
+ensemble pendant la mesure pour que le PSS reflète les pages partagées.
+
+Usage : python benchmarks/bench_startup.py [--workers 4] [--mode preload|no-preload|both]
+(lancer aussi sur le commit précédent pour comparer avant / après)
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PREDICT_PARAMS = {'L': 1.0, 'm': 2.0, 'theta0_deg': 45, 'shape': 'sphère', 'fluid': 'air', 'dims': [0.1]}
+
+
+def memory_kb():
+    """RSS et PSS (part proportionnelle des pages partagées) du processus courant, en Ko."""
+    values = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss', 'Shared_Clean', 'Private_Dirty'):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def worker(started, barrier, results):
+    os.chdir(ROOT)
+    import app as app_module
+    client = app_module.app.test_client()
+    health = client.get('/healthz')
+    response = client.post('/api/predict', json=PREDICT_PARAMS)
+    elapsed = time.time() - started
+    results.put(dict(memory_kb(), pid=os.getpid(), first_request_s=elapsed,
+                     healthz=health.status_code, predict=response.status_code))
+    barrier.wait()  # tous les workers vivants pendant la mesure
+    barrier.wait()
+
+
+def run(mode, n_workers):
+    os.chdir(ROOT)
+    method = 'fork' if mode == 'preload' else 'spawn'
+    ctx = multiprocessing.get_context(method)
+    master_start = time.perf_counter()
+    if mode == 'preload':
+        import app  # noqa: F401  (chargé dans le maître, hérité par les workers)
+    master_s = time.perf_counter() - master_start
+    barrier = ctx.Barrier(n_workers + 1)
+    results = ctx.Queue()
+
+    start = time.time()
+    processes = [ctx.Process(target=worker, args=(start, barrier, results)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    all_ready_s = time.time() - start
+    rows = [results.get() for _ in processes]
+    barrier.wait()
+    for process in processes:
+        process.join()
+    return master_s, all_ready_s, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mode', choices=['preload', 'no-preload', 'both'], default='both')
+    args = parser.parse_args()
+
+    if args.mode == 'both':
+        # Chaque mode dans un interpréteur neuf pour que le maître ne soit pas déjà chaud
+        for mode in ('no-preload', 'preload'):
+            subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode,
+                            '--workers', str(args.workers)], check=True)
+        return
+
+    master_s, all_ready_s, rows = run(args.mode, args.workers)
+    print(f"\n== {args.mode} : {args.workers} workers ==")
+    print(f"import dans le maître : {master_s:.3f} s ; tous les workers prêts (1re requête servie) : "
+          f"{all_ready_s:.3f} s après le lancement")
+    header = f"{'pid':>8} {'1re req. (s)':>12} {'healthz':>8} {'predict':>8} {'RSS (Mo)':>9} {'PSS (Mo)':>9} {'privé (Mo)':>11}"
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        print(f"{row['pid']:>8} {row['first_request_s']:>12.3f} {row['healthz']:>8} {row['predict']:>8} "
+              f"{row['rss'] / 1024:>9.1f} {row['pss'] / 1024:>9.1f} {row['private_dirty'] / 1024:>11.1f}")
+    print(f"PSS total des workers : {sum(row['pss'] for row in rows) / 1024:.1f} Mo")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+"""Suite de benchmarks et de non-régression : solveur, prédicteur et endpoints HTTP.
+
+Usage :
+  python benchmarks/run_suite.py                  # mesure et compare à la référence
+  python benchmarks/run_suite.py --save           # mesure et remplace la référence
+  python benchmarks/run_suite.py --only http --tolerance 0.5
+
+Chaque benchmark est répété (--rounds) et résumé par sa médiane, son minimum et son débit.
+Les résultats sont comparés à la référence JSON de la machine courante
+(benchmarks/baselines/<machine>.json, non versionnée) : un minimum plus lent que la référence
+de plus de --tolerance (25 % par défaut) est une régression, et la commande sort avec le
+code 1. Les groupes en régression sont mesurés de nouveau (--retries) en gardant le meilleur
+minimum : un ralentissement passager de la machine (fréquence, voisins bruyants) ne fait pas
+échouer la suite, un ralentissement du code persiste. Les durées absolues ne se comparent
+que sur une même machine : la référence est enregistrée localement (ou en CI) avec --save,
+sous un nom dérivé de la machine et des versions, et une référence --baseline mesurée
+ailleurs est refusée (code 2).
+
+Couvre :
+  - ode.*        : une évaluation de pendulum_ode (physique.py) ;
+  - simulation.* : run_simulation complet pour chaque forme × fluide ;
+  - stop.*       : find_stop_time sur de longues trajectoires ;
+  - mlp.*        : prepare_features_for_mlp + model.predict (scikit-learn), 1 ligne et lot,
+                   et le moteur NumPy exporté s'il est chargé ;
+  - http.*       : /api/simulate et /api/predict via le client de test Flask, requêtes
+                   concurrentes (--concurrency threads), avec et sans cache.
+"""
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BASELINE_DIR = os.path.join(ROOT, 'benchmarks', 'baselines')
+SHAPE_DIMS = {'sphère': [0.1], 'cylindre': [0.1, 0.2], 'pavé': [0.1, 0.15, 0.2]}
+L, M, THETA0_DEG = 1.0, 2.0, 45.0
+MLP_BATCH = 1000
+HTTP_REQUESTS = 40
+
+
+# --- MESURE ---
+def measure(func, rounds, inner=1):
+    """Appelle func() rounds fois après un préchauffage ; durées par appel (secondes)."""
+    func()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) / inner)
+    return samples
+
+
+def summarize(samples, unit_ops=1):
+    samples = np.asarray(samples)
+    median = float(np.median(samples))
+    return {
+        'median': median, 'min': float(samples.min()), 'mean': float(samples.mean()),
+        'rounds': len(samples), 'ops_per_second': unit_ops / median if median > 0 else None
+    }
+
+
+# --- BENCHMARKS ---
+def bench_ode(rounds):
+    from physique import calculate_properties, pendulum_ode
+    from config import Config
+
+    n_eval = 2000
+    y = np.array([np.deg2rad(THETA0_DEG), 0.3])
+    I, S, Cd, V_object = calculate_properties('sphère', SHAPE_DIMS['sphère'], M, L)
+    args = (I, M, L, S, Cd, Config.FLUID_PROPERTIES['eau']['rho'], V_object, Config.TC_DRY_FRICTION,
+            Config.ALPHA_TANH)
+
+    def run():
+        for _ in range(n_eval):
+            pendulum_ode(0.0, y, *args)
+
+    yield 'ode.pendulum_ode', summarize(measure(run, rounds, n_eval))
+
+
+def bench_simulation(rounds):
+    from collecteur import run_simulation
+    from config import Config
+
+    for shape, dims in SHAPE_DIMS.items():
+        for fluid in Config.FLUID_PROPERTIES:
+            params = {'shape': shape, 'fluid': fluid, 'dims': dims, 'm': M, 'L': L,
+                      'theta0_rad': np.deg2rad(THETA0_DEG), 'Tc': Config.TC_DRY_FRICTION}
+            yield f'simulation.run_simulation[{shape}-{fluid}]', summarize(
+                measure(lambda: run_simulation(params), rounds))
+
+
+def damped_trajectory(duration, dt):
+    """Oscillation amortie qui passe sous epsilon vers 80 % de la durée."""
+    t = np.arange(0.0, duration, dt)
+    decay = np.log(np.deg2rad(THETA0_DEG) / 0.01) / (0.8 * duration)
+    return t, np.deg2rad(THETA0_DEG) * np.exp(-decay * t) * np.cos(2 * np.pi * t / 2.0)
+
+
+def bench_stop(rounds):
+    from physique import find_stop_time
+    from config import Config
+
+    for duration, dt in ((3600.0, 0.1), (3600.0, 0.01)):
+        t, theta = damped_trajectory(duration, dt)
+        yield f'stop.find_stop_time[{len(t)}]', summarize(
+            measure(lambda: find_stop_time(t, theta, Config.EPSILON, 0.0), rounds))
+
+
+def bench_mlp(rounds):
+    import joblib
+
+    import app as app_module
+    from predicteur import build_feature_matrix
+
+    if not (os.path.exists(app_module.MODEL_PATH) and os.path.exists(app_module.SCALER_PATH)):
+        print("   mlp.* ignorés : modèle ou scaler scikit-learn absent")
+        return
+    model = joblib.load(app_module.MODEL_PATH)
+    scaler = joblib.load(app_module.SCALER_PATH)
+    params = {'L': L, 'm': M, 'theta0_deg': THETA0_DEG, 'shape': 'sphère', 'fluid': 'air', 'dims': [0.1]}
+
+    rng = np.random.default_rng(0)
+    fluids = list(app_module.FLUID_PROPERTIES)
+    batch = [{'L': rng.uniform(0.1, 5.0), 'm': rng.uniform(0.1, 10.0), 'theta0_deg': rng.uniform(10, 90),
+              'shape': list(SHAPE_DIMS)[i % 3], 'fluid': fluids[(i // 3) % 3],
+              'dims': list(rng.uniform(0.01, 0.5, 3))} for i in range(MLP_BATCH)]
+
+    yield 'mlp.predict[1]', summarize(measure(
+        lambda: model.predict(app_module.prepare_features_for_mlp(params, scaler)), rounds * 10))
+    yield f'mlp.predict[{MLP_BATCH}]', summarize(measure(
+        lambda: model.predict(build_feature_matrix(batch, app_module.FLUID_PROPERTIES, scaler)), rounds), MLP_BATCH)
+
+    # Moteur NumPy exporté (export_mlp.py), utilisé en priorité par l'application
+    bundle = app_module.current_bundle()
+    engine = bundle.engine if bundle is not None and bundle.scaler is None else None
+    if engine is not None:
+        yield 'mlp.numpy_engine[1]', summarize(measure(
+            lambda: engine.predict(build_feature_matrix([params], app_module.FLUID_PROPERTIES)), rounds * 10))
+        yield f'mlp.numpy_engine[{MLP_BATCH}]', summarize(measure(
+            lambda: engine.predict(build_feature_matrix(batch, app_module.FLUID_PROPERTIES)), rounds), MLP_BATCH)
+
+
+def http_load(flask_app, path, payloads, concurrency):
+    """Envoie les requêtes depuis concurrency threads ; durée totale (secondes)."""
+    def send(payload):
+        response = flask_app.test_client().post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} : HTTP {response.status_code} {response.get_data(as_text=True)[:200]}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, payloads))
+    return time.perf_counter() - start
+
+
+def bench_http(rounds, concurrency):
+    import app as app_module
+
+    flask_app = app_module.app
+    base = {'L': L, 'm': M, 'shape': 'sphère', 'fluid': 'eau', 'dims': [0.1]}
+    counter = iter(range(10 ** 9))
+
+    def unique_payloads():
+        # theta0 différent à chaque requête : aucune réponse servie par le cache
+        return [dict(base, theta0_deg=20 + (next(counter) % 100000) * 1e-4) for _ in range(HTTP_REQUESTS)]
+
+    def throughput(path, make_payloads):
+        samples = []
+        for _ in range(max(1, rounds // 3)):
+            payloads = make_payloads()
+            samples.append(http_load(flask_app, path, payloads, concurrency) / len(payloads))
+        return summarize(samples)
+
+    http_load(flask_app, '/api/simulate', unique_payloads()[:2], 1)  # préchauffage
+    yield f'http.simulate[c={concurrency}]', throughput('/api/simulate', unique_payloads)
+    if app_module.result_cache is not None:
+        yield f'http.simulate_cached[c={concurrency}]', throughput(
+            '/api/simulate', lambda: [dict(base, theta0_deg=THETA0_DEG)] * HTTP_REQUESTS)
+    if app_module.mlp_available():
+        yield f'http.predict[c={concurrency}]', throughput('/api/predict', unique_payloads)
+    else:
+        print("   http.predict ignoré : modèle non chargé")
+
+
+def run_benchmarks(args, only_groups=None):
+    """Exécute les groupes sélectionnés par --only (et only_groups s'il est donné)."""
+    groups = [
+        ('ode', lambda: bench_ode(args.rounds)),
+        ('simulation', lambda: bench_simulation(args.rounds)),
+        ('stop', lambda: bench_stop(args.rounds)),
+        ('mlp', lambda: bench_mlp(args.rounds)),
+        ('http', lambda: bench_http(args.rounds, args.concurrency)),
+    ]
+    patterns = args.only or ['*']
+    results = {}
+    for group, run in groups:
+        if only_groups is not None and group not in only_groups:
+            continue
+        if not any(fnmatch.fnmatch(group, pattern.split('.', 1)[0]) for pattern in patterns):
+            continue
+        for name, stats in run():
+            if not any(pattern == group or fnmatch.fnmatch(name, pattern) for pattern in patterns):
+                continue
+            results[name] = stats
+            print(f"   {name:<42} médiane {format_duration(stats['median']):>10}  "
+                  f"min {format_duration(stats['min']):>10}  {stats['ops_per_second']:>12.1f} op/s")
+    return results
+
+
+# --- RÉFÉRENCE ---
+def machine_info():
+    import scipy
+    import sklearn
+
+    return {
+        'platform': platform.platform(), 'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(), 'python': platform.python_version(),
+        'numpy': np.__version__, 'scipy': scipy.__version__, 'sklearn': sklearn.__version__
+    }
+
+
+def machine_baseline(machine):
+    """Chemin de la référence propre à cette machine (architecture, cœurs, empreinte des versions)."""
+    digest = hashlib.sha256(json.dumps(machine, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(BASELINE_DIR, f"{platform.machine()}-{machine['cpu_count']}cpu-{digest}.json")
+
+
+def write_report(path, report):
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def format_duration(seconds):
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds * 1e9:.0f} ns'
+
+
+def find_regressions(results, baseline, tolerance):
+    """Noms des benchmarks dont le minimum dépasse la référence de plus de tolerance."""
+    return [name for name, stats in results.items()
+            if name in baseline['results'] and stats['min'] > baseline['results'][name]['min'] * (1 + tolerance)]
+
+
+def merge_best(results, retry):
+    """Garde, pour chaque benchmark, la série de meilleur minimum."""
+    for name, stats in retry.items():
+        if name not in results or stats['min'] < results[name]['min']:
+            results[name] = stats
+
+
+def print_comparison(results, baseline, regressions):
+    header = f"{'benchmark':<44} {'référence':>11} {'mesure':>11} {'rapport':>8}"
+    print(header)
+    print('-' * len(header))
+    for name, stats in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            print(f"{name:<44} {'--':>11} {format_duration(stats['min']):>11} {'nouveau':>8}")
+            continue
+        flag = '  RÉGRESSION' if name in regressions else ''
+        print(f"{name:<44} {format_duration(reference['min']):>11} {format_duration(stats['min']):>11} "
+              f"{stats['min'] / reference['min']:>7.2f}x{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--baseline', help="fichier JSON de référence (défaut : celui de la machine courante)")
+    parser.add_argument('--save', action='store_true', help="enregistrer les mesures comme nouvelle référence")
+    parser.add_argument('--output', help="écrire aussi les mesures dans ce fichier JSON")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="ralentissement relatif toléré avant échec (0.25 = +25 %%)")
+    parser.add_argument('--retries', type=int, default=2,
+                        help="nouvelles mesures des groupes en régression avant d'échouer")
+    parser.add_argument('--rounds', type=int, default=9)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--only', nargs='*', help="groupes ou motifs de noms (ex. http, 'simulation.*eau*')")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.chdir(ROOT)  # chemins relatifs des modèles
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    print("Mesures :")
+    results = run_benchmarks(args)
+    report = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'machine': machine_info(),
+              'settings': {'rounds': args.rounds, 'concurrency': args.concurrency}, 'results': results}
+    if args.baseline is None:
+        args.baseline = machine_baseline(report['machine'])
+
+    if args.save:
+        write_report(args.output, report)
+        if os.path.exists(args.baseline):
+            # Une sélection partielle (--only) met à jour la référence sans effacer le reste
+            with open(args.baseline, encoding='utf-8') as f:
+                previous = json.load(f)
+            report['results'] = dict(previous.get('results', {}), **results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nRéférence enregistrée dans {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        write_report(args.output, report)
+        print(f"\nAucune référence ({args.baseline}) : relancer avec --save pour l'enregistrer.")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != report['machine']:
+        write_report(args.output, report)
+        print(f"\nRéférence {args.baseline} mesurée sur une autre machine ou avec d'autres versions : "
+              "comparaison impossible, enregistrer une référence locale avec --save.")
+        return 2
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    for attempt in range(args.retries):
+        if not regressions:
+            break
+        groups = sorted({name.split('.', 1)[0] for name in regressions})
+        print(f"\nNouvelle mesure ({attempt + 1}/{args.retries}) des groupes en régression : {', '.join(groups)}")
+        merge_best(results, run_benchmarks(args, groups))
+        regressions = find_regressions(results, baseline, args.tolerance)
+    write_report(args.output, report)
+
+    print(f"\nComparaison avec {args.baseline} ({baseline.get('created')}) :")
+    print_comparison(results, baseline, regressions)
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de +{args.tolerance:.0%} :")
+        for name in regressions:
+            reference, current = baseline['results'][name]['min'], results[name]['min']
+            print(f"   {name} : {format_duration(reference)} -> {format_duration(current)} "
+                  f"({current / reference:.2f}x)")
+        return 1
+    print("\nAucune régression.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
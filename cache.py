@@ -0,0 +1,158 @@
+"""Cache de résultats adressé par contenu pour /api/simulate et /api/predict.
+
+La clé est le SHA-256 d'une représentation JSON canonique des paramètres de la requête et
+d'une empreinte de l'environnement de calcul (constantes physiques de Config, réglages du
+solveur, hash du fichier de modèle). Deux niveaux :
+
+- un LRU en mémoire, borné en nombre d'entrées et en durée de vie (TTL) ;
+- un niveau disque SQLite optionnel, partagé entre les workers gunicorn.
+
+Quand l'empreinte change (constantes modifiées, nouveau modèle), les clés changent et les
+anciennes entrées du niveau disque sont purgées à l'ouverture.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PHYSICS_KEYS = ('G', 'B_PIVOT', 'EPSILON', 'TC_DRY_FRICTION', 'ALPHA_TANH', 'T_MAX_SIMULATION',
+                'FLUID_PROPERTIES')
+
+
+def canonical_hash(payload):
+    """SHA-256 d'une sérialisation JSON canonique (clés triées, flottants en repr exacte)."""
+    text = json.dumps(payload, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=repr)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def file_hash(*paths):
+    """Hash combiné du contenu des fichiers existants (modèle, scaler, poids exportés)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def physics_fingerprint(config_obj):
+    """Empreinte des constantes physiques de Config."""
+    return canonical_hash({key: getattr(config_obj, key) for key in PHYSICS_KEYS})
+
+
+class ResultCache:
+    """Cache à deux niveaux (LRU mémoire + SQLite optionnel) avec compteurs de hits/misses."""
+
+    def __init__(self, fingerprint, max_entries=1024, ttl=3600.0, db_path=None):
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+        if db_path:
+            self._purge_stale()
+
+    # --- niveau disque ---
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache ('
+                         'key TEXT PRIMARY KEY, fingerprint TEXT, value TEXT, created REAL)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _purge_stale(self):
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM cache WHERE fingerprint != ? OR created < ?',
+                         (self.fingerprint, time.time() - self.ttl))
+
+    def _disk_get(self, key):
+        row = self._connection().execute(
+            'SELECT value, created FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0], row[1]
+
+    def _disk_set(self, key, value, created):
+        conn = self._connection()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO cache (key, fingerprint, value, created) VALUES (?, ?, ?, ?)',
+                         (key, self.fingerprint, value, created))
+
+    # --- API publique ---
+    def key(self, kind, params, settings=None):
+        """Clé canonique d'une requête de type kind ('simulate', 'predict', ...)."""
+        return canonical_hash({'kind': kind, 'params': params, 'settings': settings or {},
+                               'fingerprint': self.fingerprint})
+
+    def get(self, key):
+        """Retourne la valeur en cache (texte) ou None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    return value
+                del self._memory[key]
+        if self.db_path:
+            try:
+                found = self._disk_get(key)
+            except sqlite3.Error:
+                found = None
+            if found is not None:
+                self._remember(key, *found)
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                return found[0]
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key, value):
+        created = time.time()
+        self._remember(key, value, created)
+        if self.db_path:
+            try:
+                self._disk_set(key, value, created)
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key, value, created):
+        with self._lock:
+            self._memory[key] = (value, created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.db_path:
+            conn = self._connection()
+            with conn:
+                conn.execute('DELETE FROM cache')
+
+    def info(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['disk'] = bool(self.db_path)
+        stats['fingerprint'] = self.fingerprint[:12]
+        return stats
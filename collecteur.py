@@ -1,71 +1,49 @@
 import numpy as np
-from scipy.integrate import solve_ivp
-from scipy.signal import find_peaks
 from scipy.stats import qmc
 import pandas as pd
 import multiprocessing
 from tqdm import tqdm
 import time
 import os
+import argparse
+import importlib.util
+import json
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from config import Config
+from integrateur import solve_until_settled
+from acceleration import integrate_batch_auto, make_pendulum_system
+from analytique import estimate_stop_times
+from physique import (ALPHA_TANH, B_PIVOT, EPSILON, G, SHAPE_REGISTRY, SHAPES as SHAPE_CODES, T_MAX_SIMULATION,
+                      calculate_properties, calculate_properties_batch, equilibrium_angle, pendulum_ode,
+                      stop_grid, stop_grid_step)
+from echantillonnage import (SAMPLERS, AdaptiveSampler, load_mlp_predictor, prediction_errors,
+                             scale, unit_chunk, unscale)
 
 # --- 1. PARAMÈTRES FIXES ET CONSTANTES DE LA SIMULATION ---
+# Les constantes physiques (G, B_PIVOT, ALPHA_TANH, EPSILON, T_MAX_SIMULATION) et les fluides
+# viennent de config.py via physique.py : les mêmes que celles du serveur.
 N_SAMPLES = 10000        # Nombre d'observations à générer
-G = 9.81                  # Accélération de la pesanteur (m/s^2)
-B_PIVOT = 0.002           # Coefficient de frottement visqueux du pivot (N*m*s/rad)
-ALPHA_TANH = 1000.0       # Coefficient de "raideur" pour la régularisation de tanh
-
-EPSILON = 0.02            # Seuil d'arrêt en radians (~1.15 degrés)
-T_MAX_SIMULATION = 3600   # Temps maximal pour une simulation (secondes)
+ODE_BACKEND = 'auto'      # Second membre : 'numpy', 'python', 'numba' (repli Python) ou 'auto'
+ODE_METHOD = 'RK45'       # Solveur scipy, ou 'auto' pour LSODA dans le régime raide
+BATCH_SIZE = 500          # Nombre de configurations intégrées ensemble par l'intégrateur vectorisé (= taille d'un morceau)
+SEED = 42                 # Graine du plan d'expériences (reproductible, nécessaire à la reprise)
+OUTPUT_DIR = 'dataset'    # Dossier des morceaux (shards) et du manifeste
+MANIFEST_NAME = 'manifest.json'
+SAMPLER = 'sobol'         # Plan d'expériences : 'uniform', 'sobol', 'lhs' ou 'adaptive'
+ADAPTIVE_INITIAL_FRACTION = 0.2  # Part du plan tirée en Sobol avant de passer à l'apprentissage actif
+MODEL_PATH = 'mlp_model_4_1.pkl'            # MLP courant, utilisé par le plan 'adaptive'
+SCALER_PATH = 'scaler_4_1.pkl'
+MLP_WEIGHTS_PATH = 'mlp_weights_4_1.npz'
 
-FLUID_PROPERTIES = {
-    'air':   {'rho': 1.225},
-    'eau':   {'rho': 1000.0},
-    'huile': {'rho': 900.0}
-}
+# Ordre: [L, m, theta0_deg, Tc, dim1, dim2, dim3]
+L_BOUNDS = [0.2, 0.1, 10.0, 0.0,    0.02, 0.02, 0.02]
+U_BOUNDS = [2.0, 5.0, 90.0, 0.01,   0.50, 0.50, 0.50]
+SHAPES = ['sphère', 'cylindre', 'pavé']  # Ordre d'alternance des tâches (reproductibilité des plans)
 
-# --- 2. FONCTIONS UTILITAIRES ---
+FLUID_PROPERTIES = Config.FLUID_PROPERTIES
 
-def calculate_properties(shape, dims, m, L):
-    """Calcule I, S, Cd, et V (Volume)"""
-    if shape == 'sphère':
-        R = dims[0]
-        S, V, I, Cd = np.pi * R**2, (4/3) * np.pi * R**3, (2/5) * m * R**2 + m * (L+R)**2, 0.47
-    elif shape == 'cylindre':
-        R, H = dims[0], dims[1]
-        S, V, I, Cd = np.pi * R**2, np.pi * R**2 * H, m * (R**2/4 + H**2/12) + m * (L+R)**2, 0.82
-    elif shape == 'pavé':
-        d1, d2, d3 = dims[0], dims[1], dims[2]
-        S, V, I, Cd = d3 * d2, d1 * d2 * d3, m * (d1**2 + d2**2) / 12 + m * (L+d3/2)**2, 1.05
-    else:
-        raise ValueError(f"Forme '{shape}' non reconnue.")
-    return I, S, Cd, V
-
-def pendulum_ode(t, y, I, m, L, S, Cd, rho_fluid, V_object, Tc, alpha_tanh):
-    """Équation différentielle complète avec poussée d'Archimède, traînée et frottement sec."""
-    theta, omega = y
-    
-    buoyancy_force = rho_fluid * V_object * G
-    torque_gravity = -(m * G - buoyancy_force) * L * np.sin(theta)
-    torque_pivot_friction = -B_PIVOT * omega
-    torque_dry_friction = -Tc * np.tanh(alpha_tanh * omega)
-    speed = L * omega
-    torque_fluid_drag = -0.5 * rho_fluid * S * Cd * abs(speed) * speed * L
-    
-    domega_dt = (torque_gravity + torque_pivot_friction + torque_dry_friction + torque_fluid_drag) / I
-    dtheta_dt = omega
-    return [dtheta_dt, domega_dt]
-
-def find_stop_time(t_array, theta_array, epsilon, theta_eq):
-    """Trouve le temps où l'amplitude des oscillations passe sous epsilon, autour de la position d'équilibre theta_eq."""
-    deviation = np.abs(theta_array - theta_eq)
-    peaks_indices, _ = find_peaks(deviation)
-    if len(peaks_indices) == 0: return None
-    peak_times = t_array[peaks_indices]
-    peak_amplitudes = deviation[peaks_indices]
-    sub_threshold_peaks = np.where(peak_amplitudes < epsilon)[0]
-    if len(sub_threshold_peaks) > 0:
-        return peak_times[sub_threshold_peaks[0]]
-    return None
+# --- 2. PHYSIQUE : calculate_properties, pendulum_ode, find_stop_time -> physique.py ---
 
 # --- 3. FONCTION "WORKER" POUR LA PARALLÉLISATION ---
 def run_simulation(params):
@@ -85,22 +63,28 @@ def run_simulation(params):
         # Calculer les propriétés physiques de l'objet
         I, S, Cd, V_object = calculate_properties(shape, dims, m, L)
         
-        effective_weight = m * G - rho_fluid * V_object * G
-        theta_eq = np.pi if effective_weight < 0 else 0.0
+        theta_eq = equilibrium_angle(m, rho_fluid, V_object)
         
-        # Lancer la simulation avec les arguments complets
+        # Lancer la simulation, arrêtée dès que le critère de find_stop_time est atteint
         y0 = [theta0_rad, 0.0]
-        solution = solve_ivp(
-            fun=pendulum_ode,
-            t_span=[0, T_MAX_SIMULATION],
-            y0=y0,
-            method='RK45',
-            args=(I, m, L, S, Cd, rho_fluid, V_object, Tc, ALPHA_TANH),
-            t_eval=np.linspace(0, T_MAX_SIMULATION, int(T_MAX_SIMULATION * 10))
+        fun, args, method, options = make_pendulum_system(
+            I, m, L, S, Cd, rho_fluid, V_object, Tc,
+            g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH,
+            backend=ODE_BACKEND, method=ODE_METHOD, reference_ode=pendulum_ode
         )
-        
-        # Analyser le résultat en passant la position d'équilibre
-        t_stop = find_stop_time(solution.t, solution.y[0], EPSILON, theta_eq)
+        solution = solve_until_settled(
+            fun, y0, args=args,
+            theta_eq=theta_eq, epsilon=EPSILON, t_max=T_MAX_SIMULATION,
+            method=method,
+            t_eval=stop_grid(T_MAX_SIMULATION),
+            **options
+        )
+        t_stop = solution.t_stop
+        # Estimation par bilan d'énergie, conservée comme feature candidate pour le réentraînement
+        t_analytic = estimate_stop_times(
+            I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0_rad,
+            g=G, b_pivot=B_PIVOT, epsilon=EPSILON, t_max=T_MAX_SIMULATION
+        )[0][0]
         
         # Préparer le dictionnaire de sortie
         result_dict = params.copy()
@@ -108,79 +92,312 @@ def run_simulation(params):
             result_dict[f'dim{i+1}'] = d
         del result_dict['dims']
         result_dict['t_epsilon'] = t_stop if t_stop is not None else -1.0
+        result_dict['t_analytic'] = float(t_analytic) if not np.isnan(t_analytic) else -1.0
 
         return result_dict
 
     except Exception as e:
         return None
 
-# --- 4. SCRIPT PRINCIPAL ---
-if __name__ == "__main__":
-    # a) Plan d'expériences (LHS)
-    print("1/4 - Génération du plan d'expériences (LHS)...")
-    
-    # Ordre: [L, m, theta0_deg, Tc, dim1, dim2, dim3]
-    l_bounds = [0.2, 0.1, 10.0, 0.0,    0.02, 0.02, 0.02]
-    u_bounds = [2.0, 5.0, 90.0, 0.01,   0.50, 0.50, 0.50]
-    
-    scaled_sample = np.random.uniform(low=l_bounds, high= u_bounds, size=(N_SAMPLES, len(l_bounds)))
-    
-    # b) Créer la liste des tâches à exécuter
-    print("2/4 - Préparation de la liste des tâches de simulation...")
-    tasks = []
-    shapes = ['sphère', 'cylindre', 'pavé']
+def run_simulation_batch(tasks):
+    """Exécute un lot de simulations avec l'intégrateur vectorisé (une seule boucle pour tout le lot).
+
+    Lignes raides en LSODA, une à une (integrate_batch_auto) ; les pics sont cherchés sur la même
+    grille que run_simulation (stop_grid), les étiquettes ne dépendent donc pas du chemin.
+    """
+    n = len(tasks)
+    shape_codes = np.array([SHAPE_CODES.index(params['shape']) for params in tasks], dtype=np.intp)
+    dims = np.zeros((n, 3))
+    for i, params in enumerate(tasks):
+        dims[i, :len(params['dims'])] = params['dims']
+    m = np.array([params['m'] for params in tasks], dtype=np.float64)
+    L = np.array([params['L'] for params in tasks], dtype=np.float64)
+    I, S, Cd, V_object = calculate_properties_batch(shape_codes, dims, m, L)
+    Tc = np.array([params['Tc'] for params in tasks])
+    theta0_rad = np.array([params['theta0_rad'] for params in tasks])
+    rho_fluid = np.array([FLUID_PROPERTIES[params['fluid']]['rho'] for params in tasks])
+
+    t_stop, _ = integrate_batch_auto(
+        I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0_rad,
+        g=G, b_pivot=B_PIVOT, alpha_tanh=ALPHA_TANH, epsilon=EPSILON, t_max=T_MAX_SIMULATION,
+        sample_dt=stop_grid_step(T_MAX_SIMULATION)
+    )
+    t_analytic, _ = estimate_stop_times(
+        I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0_rad,
+        g=G, b_pivot=B_PIVOT, epsilon=EPSILON, t_max=T_MAX_SIMULATION
+    )
+
+    results = []
+    for params, t_eps, t_est in zip(tasks, t_stop, t_analytic):
+        result_dict = params.copy()
+        for i, d in enumerate(params['dims']):
+            result_dict[f'dim{i+1}'] = d
+        del result_dict['dims']
+        result_dict['t_epsilon'] = float(t_eps) if not np.isnan(t_eps) else -1.0
+        result_dict['t_analytic'] = float(t_est) if not np.isnan(t_est) else -1.0
+        results.append(result_dict)
+    return results
+
+# --- 4. PIPELINE DE GÉNÉRATION PAR MORCEAUX ---
+
+def task_group(task_id):
+    """Forme et fluide de la tâche n° task_id (alternance fixe sur tout le plan)."""
     fluids = list(FLUID_PROPERTIES.keys())
-    num_shapes = len(shapes)
-    num_fluids = len(fluids)
-    
-    for i in range(N_SAMPLES):
-        shape = shapes[i % num_shapes]
-        fluid = fluids[(i // num_shapes) % num_fluids]
-        params_row = scaled_sample[i]
-        
-        # Gérer les dimensions selon la forme
-        if shape == 'sphère':
-            dims = [params_row[4]] # dim1
-        elif shape == 'cylindre':
-            dims = [params_row[4], params_row[5]] # dim1, dim2
-        else: # pavé
-            dims = [params_row[4], params_row[5], params_row[6]] # dim1, dim2, dim3
-
-        task = {
-            'L': params_row[0],
-            'm': params_row[1],
-            'theta0_rad': np.deg2rad(params_row[2]),
-            'Tc': params_row[3], # NOUVEAU: Ajout de Tc à la tâche
-            'shape': shape,
-            'fluid': fluid,
-            'dims': dims
-        }
-        tasks.append(task)
-
-    # c) Exécution en parallèle
-    num_cores = max(1, multiprocessing.cpu_count() - 1)
-    print(f"3/4 - Démarrage des simulations en parallèle sur {num_cores} cœurs...")
+    return SHAPES[task_id % len(SHAPES)], fluids[(task_id // len(SHAPES)) % len(fluids)]
+
+def make_task(task_id, params_row):
+    """Construit la tâche de simulation n° task_id à partir d'une ligne du plan d'expériences."""
+    shape, fluid = task_group(task_id)
+
+    # Gérer les dimensions selon la forme
+    if shape == 'sphère':
+        dims = [params_row[4]] # dim1
+    elif shape == 'cylindre':
+        dims = [params_row[4], params_row[5]] # dim1, dim2
+    else: # pavé
+        dims = [params_row[4], params_row[5], params_row[6]] # dim1, dim2, dim3
+
+    return {
+        'task_id': task_id,
+        'L': params_row[0],
+        'm': params_row[1],
+        'theta0_rad': np.deg2rad(params_row[2]),
+        'Tc': params_row[3],
+        'shape': shape,
+        'fluid': fluid,
+        'dims': dims
+    }
+
+def sample_chunk(chunk_id, chunk_size, n_samples, seed, sampler=SAMPLER):
+    """Tire les lignes du plan d'expériences d'un morceau.
+
+    Chaque morceau est déterminé par (sampler, seed, chunk_id) : le plan est reproductible
+    et un morceau peut être régénéré sans tirer les précédents. Le plan 'adaptive' commence
+    par les points Sobol ; ses morceaux suivants sont choisis par adaptive_chunk.
+    """
+    unit = unit_chunk(sampler, chunk_id, chunk_size, n_samples, len(L_BOUNDS), seed)
+    return scale(unit, L_BOUNDS, U_BOUNDS)
+
+def chunk_tasks(chunk_id, chunk_size, rows):
+    start = chunk_id * chunk_size
+    return chunk_id, [make_task(start + i, row) for i, row in enumerate(rows)]
+
+def iter_chunks(n_samples, chunk_size, seed, sampler=SAMPLER, skip=(), chunk_ids=None):
+    """Générateur paresseux des morceaux de tâches (chunk_id, tasks), sans ceux de skip."""
+    if chunk_ids is None:
+        chunk_ids = range((n_samples + chunk_size - 1) // chunk_size)
+    for chunk_id in chunk_ids:
+        if chunk_id in skip:
+            continue
+        yield chunk_tasks(chunk_id, chunk_size, sample_chunk(chunk_id, chunk_size, n_samples, seed, sampler))
+
+def run_chunk(chunk):
+    """Worker : simule un morceau complet avec l'intégrateur vectorisé."""
+    chunk_id, tasks = chunk
+    return chunk_id, run_simulation_batch(tasks)
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+def write_shard(output_dir, chunk_id, results, fmt):
+    """Écrit un morceau dans son propre fichier (écriture atomique via un fichier temporaire)."""
+    df = pd.DataFrame(results)
+    filename = f"part-{chunk_id:06d}.{fmt}"
+    path = os.path.join(output_dir, filename)
+    tmp_path = path + '.tmp'
+    if fmt == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return filename, len(df), int((df['t_epsilon'] >= 0).sum())
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(path, manifest):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def read_shards(output_dir, manifest):
+    """Lit tous les morceaux terminés (simulations stabilisées ou non), triés par task_id."""
+    frames = []
+    for chunk in sorted(manifest['chunks'].values(), key=lambda c: c['file']):
+        path = os.path.join(output_dir, chunk['file'])
+        frames.append(pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path))
+    return pd.concat(frames, ignore_index=True).sort_values('task_id')
+
+def merge_shards(output_dir, manifest):
+    """Assemble les morceaux terminés dans le CSV d'entraînement (simulations stabilisées uniquement)."""
+    df = read_shards(output_dir, manifest)
+    df['t_epsilon'] = df['t_epsilon'].replace(-1.0, np.nan)
+    if 't_analytic' in df:  # Morceaux écrits avant l'estimateur analytique : colonne absente
+        df['t_analytic'] = df['t_analytic'].replace(-1.0, np.nan)
+    df = df.dropna(subset=['t_epsilon']).drop(columns=['task_id'])
+    output_filename = os.path.join(output_dir, f"pendulum_data_full_physics_{len(df)}_samples.csv")
+    df.to_csv(output_filename, index=False)
+    return output_filename, len(df)
+
+def record_chunk(future, output_dir, fmt, manifest, manifest_path, progress):
+    """Écrit le morceau terminé puis l'enregistre dans le manifeste."""
+    chunk_id, results = future.result()
+    results = [r for r in results if r is not None]
+    filename, n_rows, n_valid = write_shard(output_dir, chunk_id, results, fmt)
+    manifest['chunks'][str(chunk_id)] = {'file': filename, 'rows': n_rows, 'valid': n_valid}
+    save_manifest(manifest_path, manifest)
+    progress.update(n_rows)
+
+def run_chunks(executor, chunks, max_in_flight, output_dir, fmt, manifest, manifest_path, progress):
+    """Soumet les morceaux au pool avec au plus max_in_flight en vol et enregistre les résultats."""
+    in_flight = set()
+    for chunk in chunks:
+        in_flight.add(executor.submit(run_chunk, chunk))
+        if len(in_flight) >= max_in_flight:
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                record_chunk(future, output_dir, fmt, manifest, manifest_path, progress)
+    for future in in_flight:
+        record_chunk(future, output_dir, fmt, manifest, manifest_path, progress)
+
+# --- 5. APPRENTISSAGE ACTIF (plan 'adaptive') ---
+
+DESIGN_COLUMNS = ['L', 'm', 'theta0_deg', 'Tc', 'dim1', 'dim2', 'dim3']
+
+def history_unit_points(df):
+    """Coordonnées des simulations déjà faites dans le cube unité du plan d'expériences."""
+    design = df.assign(theta0_deg=np.rad2deg(df['theta0_rad'])).reindex(columns=DESIGN_COLUMNS)
+    unit = unscale(design.to_numpy(dtype=np.float64), L_BOUNDS, U_BOUNDS)
+    # Dimensions inutilisées par la forme (NaN) : exclues du voisinage par active_columns
+    return np.nan_to_num(unit, nan=0.5)
+
+def active_columns(groups):
+    """Colonnes de DESIGN_COLUMNS utilisées par chaque groupe (forme, fluide) : L, m, theta0_deg, Tc
+    et les dimensions de la forme."""
+    n_scalar = DESIGN_COLUMNS.index('dim1')
+    return {group: list(range(n_scalar + SHAPE_REGISTRY[group[0]].n_dims)) for group in set(groups)}
+
+def history_configurations(df):
+    """Configurations au format de predicteur.build_feature_matrix."""
+    dims = df.reindex(columns=['dim1', 'dim2', 'dim3']).to_numpy(dtype=np.float64)
+    return [{'shape': row.shape, 'fluid': row.fluid, 'L': row.L, 'm': row.m,
+             'theta0_deg': np.rad2deg(row.theta0_rad), 'Tc': row.Tc,
+             'dims': [d for d in row_dims if not np.isnan(d)]}
+            for row, row_dims in zip(df.itertuples(index=False), dims)]
+
+def fit_sampler(sampler, df):
+    """Mesure l'erreur du MLP sur les simulations stabilisées puis indexe tout l'historique."""
+    settled = (df['t_epsilon'] >= 0).to_numpy()
+    errors = np.zeros(len(df))
+    if sampler.predict is not None and settled.any():
+        predicted = sampler.predict(history_configurations(df[settled]))
+        errors[settled] = prediction_errors(predicted, df['t_epsilon'][settled])
+    groups = list(zip(df['shape'], df['fluid']))
+    sampler.fit(history_unit_points(df), groups, errors, settled, active_columns(groups))
+    return float(errors[settled].mean()) if settled.any() else float('nan')
+
+def adaptive_chunk(sampler, chunk_id, chunk_size, n_samples, seed):
+    """Lignes du morceau chunk_id choisies par l'échantillonneur parmi des candidats Sobol."""
+    start = chunk_id * chunk_size
+    groups = [task_group(start + i) for i in range(min(chunk_size, n_samples - start))]
+    engine = qmc.Sobol(d=len(L_BOUNDS), scramble=True, seed=np.random.default_rng([seed, chunk_id]))
+    return scale(sampler.propose(groups, engine), L_BOUNDS, U_BOUNDS)
+
+def run_adaptive(executor, args, n_chunks, done, fmt, manifest, manifest_path, progress):
+    """Plan 'adaptive' : amorce Sobol, puis vagues de args.cores morceaux choisis par l'échantillonneur.
+
+    Avant chaque vague, l'échantillonneur est réajusté sur toutes les simulations terminées.
+    """
+    n_initial = min(n_chunks, max(1, int(np.ceil(n_chunks * ADAPTIVE_INITIAL_FRACTION))))
+    chunks = iter_chunks(args.n_samples, args.chunk_size, args.seed, 'adaptive', skip=done,
+                         chunk_ids=range(n_initial))
+    run_chunks(executor, chunks, 2 * args.cores, args.output_dir, fmt, manifest, manifest_path, progress)
+
+    predictor = load_mlp_predictor(MODEL_PATH, SCALER_PATH, MLP_WEIGHTS_PATH, FLUID_PROPERTIES)
+    if predictor is None:
+        print(f"   AVERTISSEMENT : {MODEL_PATH} introuvable, apprentissage actif en exploration seule.")
+    sampler = AdaptiveSampler(predictor)
+    pending = [chunk_id for chunk_id in range(n_initial, n_chunks) if chunk_id not in done]
+    for wave_start in range(0, len(pending), args.cores):
+        error = fit_sampler(sampler, read_shards(args.output_dir, manifest))
+        progress.set_postfix(mlp_log_error=f"{error:.3f}")
+        wave = pending[wave_start:wave_start + args.cores]
+        chunks = (chunk_tasks(chunk_id, args.chunk_size,
+                              adaptive_chunk(sampler, chunk_id, args.chunk_size, args.n_samples, args.seed))
+                  for chunk_id in wave)
+        run_chunks(executor, chunks, len(wave), args.output_dir, fmt, manifest, manifest_path, progress)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Génération du jeu de données de simulation du pendule")
+    parser.add_argument('--n-samples', type=int, default=N_SAMPLES, help="nombre de simulations")
+    parser.add_argument('--cores', type=int, default=max(1, multiprocessing.cpu_count() - 1),
+                        help="nombre de processus de simulation")
+    parser.add_argument('--chunk-size', type=int, default=BATCH_SIZE, help="simulations par morceau")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="dossier des morceaux et du manifeste")
+    parser.add_argument('--seed', type=int, default=SEED, help="graine du plan d'expériences")
+    parser.add_argument('--sampler', choices=SAMPLERS, default=SAMPLER,
+                        help="plan d'expériences (adaptive : apprentissage actif guidé par le MLP)")
+    parser.add_argument('--format', choices=['auto', 'parquet', 'csv'], default='auto',
+                        help="format des morceaux (auto : Parquet si pyarrow est installé)")
+    parser.add_argument('--no-merge', action='store_true', help="ne pas assembler le CSV final")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    fmt = args.format
+    if fmt == 'auto':
+        fmt = 'parquet' if parquet_available() else 'csv'
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+
+    # a) Manifeste : reprise d'une exécution interrompue
+    settings = {'n_samples': args.n_samples, 'chunk_size': args.chunk_size, 'seed': args.seed,
+                'sampler': args.sampler,
+                'l_bounds': L_BOUNDS, 'u_bounds': U_BOUNDS, 't_max': T_MAX_SIMULATION, 'epsilon': EPSILON}
+    manifest = load_manifest(manifest_path)
+    if manifest is None:
+        manifest = {'settings': settings, 'format': fmt, 'chunks': {}}
+        save_manifest(manifest_path, manifest)
+    elif manifest['settings'] != settings:
+        raise SystemExit(f"ERREUR : {manifest_path} a été créé avec d'autres réglages "
+                         f"({manifest['settings']}) ; changez --output-dir ou reprenez avec les mêmes options.")
+    else:
+        fmt = manifest['format']
+    done = {int(chunk_id) for chunk_id in manifest['chunks']}
+    n_chunks = (args.n_samples + args.chunk_size - 1) // args.chunk_size
+    print(f"1/3 - Plan d'expériences : {args.n_samples} simulations en {n_chunks} morceaux "
+          f"({len(done)} déjà terminés), plan {args.sampler}, graine {args.seed}, format {fmt}")
+
+    # b) Exécution en parallèle : morceaux générés paresseusement, nombre borné en vol
+    print(f"2/3 - Démarrage des simulations en parallèle sur {args.cores} cœurs...")
     start_time = time.time()
-    
-    with multiprocessing.Pool(processes=num_cores) as pool:
-        results = list(tqdm(pool.imap_unordered(run_simulation, tasks), total=len(tasks)))
-    
+    remaining = sum(min(args.chunk_size, args.n_samples - c * args.chunk_size)
+                    for c in range(n_chunks) if c not in done)
+    with ProcessPoolExecutor(max_workers=args.cores) as executor, tqdm(total=remaining) as progress:
+        if args.sampler == 'adaptive':
+            run_adaptive(executor, args, n_chunks, done, fmt, manifest, manifest_path, progress)
+        else:
+            chunks = iter_chunks(args.n_samples, args.chunk_size, args.seed, args.sampler, skip=done)
+            run_chunks(executor, chunks, 2 * args.cores, args.output_dir, fmt, manifest, manifest_path,
+                       progress)
+
     end_time = time.time()
     print(f"--- Simulations terminées en {end_time - start_time:.2f} secondes ---")
 
-    # d) Collecte et sauvegarde des résultats
-    print("4/4 - Traitement des résultats et sauvegarde dans un fichier CSV...")
-    
-    valid_results = [r for r in results if r is not None]
-    
-    if not valid_results:
+    # c) Assemblage du CSV d'entraînement
+    if args.no_merge:
+        print(f"3/3 - Morceaux disponibles dans '{args.output_dir}' (assemblage ignoré).")
+        return
+    print("3/3 - Assemblage des morceaux dans un fichier CSV...")
+    if not manifest['chunks']:
         print("ERREUR : Aucune simulation n'a réussi. Le DataFrame est vide.")
-    else:
-        df = pd.DataFrame(valid_results)
-        df['t_epsilon'].replace(-1.0, np.nan, inplace=True)
-        df.dropna(subset=['t_epsilon'], inplace=True)
-        
-        output_filename = f"pendulum_data_full_physics_{len(df)}_samples.csv"
-        df.to_csv(output_filename, index=False)
-        
-        print(f"Terminé ! {len(df)} observations valides ont été sauvegardées dans '{output_filename}'.")
\ No newline at end of file
+        return
+    output_filename, n_valid = merge_shards(args.output_dir, manifest)
+    print(f"Terminé ! {n_valid} observations valides ont été sauvegardées dans '{output_filename}'.")
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,37 @@ class Config:
     TC_DRY_FRICTION = 0.005  # Couple de frottement sec constant (N*m)
     ALPHA_TANH = 1000.0   # Coefficient de "raideur" pour la régularisation de tanh
     T_MAX_SIMULATION = 3600 # Temps maximal pour une simulation (secondes)
+    ODE_BACKEND = os.environ.get('ODE_BACKEND', 'auto')  # 'numpy', 'python', 'numba' ou 'auto'
+    ODE_METHOD = os.environ.get('ODE_METHOD', 'RK45')    # 'RK45', 'Radau', 'BDF', 'LSODA' ou 'auto'
+    EARLY_STOP = True       # Arrêter l'intégration dès que la stabilisation est détectée
+    ANIMATION_WINDOW = 100  # Durée minimale simulée pour l'animation (secondes)
+    STREAM_SAMPLE_DT = 0.1   # Pas d'échantillonnage de la trajectoire diffusée (secondes)
+    STREAM_CHUNK_SIZE = 50   # Nombre d'échantillons par morceau diffusé
+    STREAM_MAX_SAMPLES = 20000  # Échantillons au plus par trajectoire diffusée (window / sample_dt)
+    STREAM_MAX_CHUNK_SIZE = 1000  # Échantillons au plus par morceau
+    RUN_MAX_WORKERS = int(os.environ.get('RUN_MAX_WORKERS', 4))  # Threads d'intégration de /api/run
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'True').lower() == 'true'
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))  # Entrées du LRU en mémoire
+    CACHE_TTL = float(os.environ.get('CACHE_TTL', 24 * 3600))          # Durée de vie (secondes)
+    CACHE_DB_PATH = os.environ.get('CACHE_DB_PATH')                     # SQLite partagé entre workers (optionnel)
+    JOB_MAX_WORKERS = int(os.environ.get('JOB_MAX_WORKERS', 2))   # Processus dédiés aux simulations asynchrones
+    JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 16))  # Travaux en file + en cours avant refus (429)
+    JOB_TIMEOUT = float(os.environ.get('JOB_TIMEOUT', 300))       # Durée maximale d'un travail (secondes)
+    JOB_RESULT_TTL = float(os.environ.get('JOB_RESULT_TTL', 600))  # Conservation des résultats terminés (secondes)
+    BATCH_MAX_SIZE = 10000  # Nombre maximal de configurations par requête /api/simulate_batch
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()  # DEBUG pour les traces détaillées des simulations
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'  # Endpoint /metrics
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'  # Autorise ?profile=1
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')  # Rapports cProfile / pyinstrument
+    HYBRID_MARGIN_SIGMAS = 2.0  # Marge du mode hybride autour de la prédiction, en multiples de l'erreur du backend
+    HYBRID_ANALYTIC_ERROR = 0.07  # Écart type relatif de l'estimation analytique (RMSE log1p contre les points de rebroussement, bench_analytic.py)
+    HYBRID_MAX_EXTENSIONS = 5   # Prolongations de l'horizon (marge doublée à chaque fois) avant d'abandonner
+    SWEEP_DEFAULT_POINTS = (50, 25)  # Points par axe d'un balayage à un / deux paramètres
+    SWEEP_MAX_POINTS = 2500          # Taille maximale de la grille évaluée par le MLP
+    SWEEP_REFINE_POINTS = 12         # Points simulés par défaut pour corriger la prédiction
+    SWEEP_MAX_REFINE = 64            # Points simulés au plus par balayage
+    SWEEP_SOBOL_SAMPLES = 1024       # Taille des matrices A et B de Saltelli (puissance de 2)
+    SWEEP_MAX_WORKERS = int(os.environ.get('SWEEP_MAX_WORKERS', 2))  # Processus des simulations de balayage
     
     # Propriétés des fluides
     FLUID_PROPERTIES = {
@@ -32,6 +63,15 @@ class Config:
     
     # Configuration du modèle ML
     MODEL_PATH = 'mlp_model_4_1.pkl'
+    SCALER_PATH = 'scaler_4_1.pkl'
+    MLP_WEIGHTS_PATH = 'mlp_weights_4_1.npz'  # Poids exportés par export_mlp.py (prioritaires s'ils existent)
+    MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'models')  # Versions publiées par registre.py
+    MODEL_WATCH_INTERVAL = float(os.environ.get('MODEL_WATCH_INTERVAL', 5))  # Surveillance d'ACTIVE / CANDIDATE (s)
+    SHADOW_MAX_PENDING = 64  # Évaluations shadow en attente au-delà desquelles les suivantes sont abandonnées
+    WARM_START = os.environ.get('WARM_START', 'True').lower() == 'true'  # Charger les modèles dès create_app()
+    LOOKUP_TABLE_DIR = os.environ.get('LOOKUP_TABLE_DIR', 'lookup_table')  # Tables construites par tabulation.py
+    LOOKUP_TOLERANCE = 0.1  # Écart maximal des coins (échelle log1p) avant repli sur la simulation
+    ANALYTIC_FALLBACK = os.environ.get('ANALYTIC_FALLBACK', 'True').lower() == 'true'  # Bilan d'énergie si le MLP manque
     MODEL_INFO = {
         'name': 'MLP Neural Network',
         'architecture': '200-150-100',
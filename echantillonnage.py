@@ -0,0 +1,145 @@
+"""Plans d'expériences pour la génération du jeu de données (collecteur.py).
+
+- 'uniform' : tirage uniforme indépendant (comportement historique) ;
+- 'sobol'   : suite de Sobol brouillée (scipy.stats.qmc), reproductible morceau par morceau ;
+- 'lhs'     : hypercube latin sur l'ensemble du plan ;
+- 'adaptive': apprentissage actif. Les premiers morceaux suivent Sobol, puis chaque nouvelle
+  tâche est choisie parmi des candidats Sobol là où le MLP actuel (mlp_model_4_1.pkl) se
+  trompe le plus par rapport aux simulations déjà faites, en évitant la région où le pendule
+  ne se stabilise jamais (t_epsilon == -1).
+
+Toutes les coordonnées sont manipulées dans le cube unité puis mises à l'échelle.
+"""
+import functools
+import os
+import warnings
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.stats import qmc
+
+SAMPLERS = ('uniform', 'sobol', 'lhs', 'adaptive')
+
+
+def _sobol_engine(dim, seed):
+    return qmc.Sobol(d=dim, scramble=True, seed=seed)
+
+
+@functools.lru_cache(maxsize=4)
+def _lhs_design(n_samples, dim, seed):
+    return qmc.LatinHypercube(d=dim, seed=seed).random(n_samples)
+
+
+def unit_chunk(sampler, chunk_id, chunk_size, n_samples, dim, seed):
+    """Points du cube unité pour le morceau chunk_id (reproductibles, indépendants de l'ordre)."""
+    start = chunk_id * chunk_size
+    size = min(chunk_size, n_samples - start)
+    if sampler == 'uniform':
+        return np.random.default_rng([seed, chunk_id]).uniform(size=(size, dim))
+    if sampler in ('sobol', 'adaptive'):
+        engine = _sobol_engine(dim, seed)
+        if start:
+            engine.fast_forward(start)
+        with warnings.catch_warnings():
+            # Les morceaux ne sont pas des puissances de 2 : l'équilibre global reste assuré
+            warnings.simplefilter('ignore', UserWarning)
+            return engine.random(size)
+    if sampler == 'lhs':
+        return _lhs_design(n_samples, dim, seed)[start:start + size]
+    raise ValueError(f"Plan d'expériences '{sampler}' non reconnu.")
+
+
+def scale(unit_points, l_bounds, u_bounds):
+    return qmc.scale(unit_points, l_bounds, u_bounds)
+
+
+def unscale(points, l_bounds, u_bounds):
+    l_bounds, u_bounds = np.asarray(l_bounds), np.asarray(u_bounds)
+    return (np.asarray(points) - l_bounds) / (u_bounds - l_bounds)
+
+
+def load_mlp_predictor(model_path, scaler_path, weights_path, fluid_properties):
+    """Retourne une fonction configurations -> temps prédits, ou None si aucun modèle n'est disponible."""
+    from predicteur import MLPNumpy, build_feature_matrix, predict_stop_times
+
+    if weights_path and os.path.exists(weights_path):
+        engine = MLPNumpy.load(weights_path)
+        return lambda configurations: predict_stop_times(
+            engine, build_feature_matrix(configurations, fluid_properties))
+    try:
+        import joblib
+        model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path)
+    except Exception:
+        return None
+    return lambda configurations: predict_stop_times(
+        model, build_feature_matrix(configurations, fluid_properties, scaler))
+
+
+class AdaptiveSampler:
+    """Propose de nouveaux points là où l'erreur du MLP est la plus forte.
+
+    Pour chaque groupe (forme, fluide), l'historique des simulations est indexé dans un
+    k-d tree du cube unité. Le score d'un candidat combine :
+      - l'erreur relative moyenne du MLP (|log(1+prédit) - log(1+simulé)|) chez ses k voisins ;
+      - un terme d'exploration proportionnel à la distance au point simulé le plus proche ;
+    et il est pondéré par la probabilité de stabilisation estimée chez ces mêmes voisins, de
+    sorte que la région qui ne se stabilise jamais est apprise puis évitée.
+
+    Seules les coordonnées actives d'un groupe (active) entrent dans le k-d tree et dans les
+    distances : les dimensions qu'une forme n'utilise pas ne sont que du bruit pour ses candidats.
+    """
+
+    def __init__(self, predict, k=8, n_candidates=64, exploration=0.5, min_settle_probability=0.2):
+        self.predict = predict
+        self.k = k
+        self.n_candidates = n_candidates
+        self.exploration = exploration
+        self.min_settle_probability = min_settle_probability
+        self.groups = {}
+
+    def fit(self, unit_points, groups, errors, settled, active=None):
+        """Indexe l'historique : unit_points (N, d), groups (N,) hashables, errors (N,), settled (N,) bool.
+
+        active : {groupe: indices des colonnes utilisées} (toutes par défaut).
+        """
+        self.groups = {}
+        groups = list(groups)
+        for group in set(groups):
+            mask = np.fromiter((g == group for g in groups), dtype=bool, count=len(groups))
+            columns = np.arange(unit_points.shape[1]) if active is None else np.asarray(active[group])
+            self.groups[group] = (cKDTree(unit_points[np.ix_(mask, columns)]), errors[mask], settled[mask], columns)
+
+    def score(self, group, candidates):
+        """(score, probabilité de stabilisation) de chaque candidat ; score -inf sous min_settle_probability."""
+        if group not in self.groups:
+            return np.ones(len(candidates)), np.ones(len(candidates))
+        tree, errors, settled, columns = self.groups[group]
+        k = min(self.k, tree.n)
+        distances, indices = tree.query(candidates[:, columns], k=k)
+        distances = distances.reshape(len(candidates), k)
+        indices = indices.reshape(len(candidates), k)
+        settle_probability = settled[indices].mean(axis=1)
+        neighbour_errors = np.where(settled[indices], errors[indices], 0.0)
+        expected_error = neighbour_errors.sum(axis=1) / np.maximum(settled[indices].sum(axis=1), 1)
+        score = (expected_error + self.exploration * distances[:, 0]) * settle_probability
+        score[settle_probability < self.min_settle_probability] = -np.inf
+        return score, settle_probability
+
+    def propose(self, groups, candidate_engine):
+        """Choisit un point par groupe demandé parmi n_candidates candidats tirés de candidate_engine."""
+        chosen = np.empty((len(groups), candidate_engine.d))
+        for i, group in enumerate(groups):
+            candidates = candidate_engine.random(self.n_candidates)
+            scores, settle_probability = self.score(group, candidates)
+            # Aucun candidat assez sûr : le moins risqué plutôt qu'un candidat arbitraire
+            best = int(np.argmax(scores)) if np.isfinite(scores).any() else int(np.argmax(settle_probability))
+            chosen[i] = candidates[best]
+        return chosen
+
+
+def prediction_errors(predicted, simulated):
+    """Erreur relative (échelle log) entre prédictions MLP et temps simulés."""
+    predicted = np.asarray(predicted, dtype=np.float64)
+    simulated = np.asarray(simulated, dtype=np.float64)
+    return np.abs(np.log1p(np.maximum(predicted, 0)) - np.log1p(np.maximum(simulated, 0)))
@@ -0,0 +1,82 @@
+"""Exporte mlp_model_4_1.pkl et scaler_4_1.pkl vers un fichier de poids NumPy compact.
+
+Le StandardScaler est replié dans la première couche :
+    W0' = W0 / scale[:, None]      b0' = b0 - (mean / scale) @ W0
+de sorte que le moteur MLPNumpy de predicteur.py travaille directement sur les features brutes.
+
+Usage : python export_mlp.py [--model mlp_model_4_1.pkl] [--scaler scaler_4_1.pkl]
+                             [--output mlp_weights_4_1.npz] [--dtype float64|float32]
+"""
+import argparse
+import hashlib
+
+import joblib
+import numpy as np
+
+from config import Config
+from predicteur import MLPNumpy, build_feature_matrix
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def export(model_path, scaler_path, output_path, dtype='float64'):
+    """Écrit le fichier de poids et retourne le nombre de couches exportées."""
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    if model.activation != 'relu' or model.out_activation_ != 'identity':
+        raise ValueError(f"Activation non supportée : {model.activation}/{model.out_activation_}")
+
+    weights = [W.astype(np.float64) for W in model.coefs_]
+    biases = [b.astype(np.float64) for b in model.intercepts_]
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(weights[0].shape[0])
+    scale = scaler.scale_ if scaler.with_std else np.ones(weights[0].shape[0])
+    biases[0] = biases[0] - (mean / scale) @ weights[0]
+    weights[0] = weights[0] / scale[:, None]
+
+    arrays = {'n_layers': np.array(len(weights))}
+    for i, (W, b) in enumerate(zip(weights, biases)):
+        arrays[f'W{i}'] = W.astype(dtype)
+        arrays[f'b{i}'] = b.astype(dtype)
+    arrays['meta_model_sha256'] = np.array(file_sha256(model_path))
+    arrays['meta_scaler_sha256'] = np.array(file_sha256(scaler_path))
+    arrays['meta_architecture'] = np.array('-'.join(str(W.shape[1]) for W in weights[:-1]))
+    np.savez(output_path, **arrays)
+    return model, scaler
+
+
+def check_parity(model, scaler, output_path, n_samples=1000, seed=0):
+    """Compare le moteur NumPy à model.predict sur des configurations aléatoires."""
+    rng = np.random.default_rng(seed)
+    limits = Config.PARAM_LIMITS
+    shapes = ['sphère', 'cylindre', 'pavé']
+    fluids = list(Config.FLUID_PROPERTIES)
+    configurations = [{
+        'shape': shapes[i % 3],
+        'fluid': fluids[(i // 3) % 3],
+        'L': rng.uniform(limits['L']['min'], limits['L']['max']),
+        'm': rng.uniform(limits['m']['min'], limits['m']['max']),
+        'theta0_deg': rng.uniform(limits['theta0_deg']['min'], limits['theta0_deg']['max']),
+        'Tc': rng.uniform(0.0, 0.01),
+        'dims': list(rng.uniform(limits['dimensions']['min'], limits['dimensions']['max'], 3)),
+    } for i in range(n_samples)]
+    reference = model.predict(build_feature_matrix(configurations, Config.FLUID_PROPERTIES, scaler))
+    engine = MLPNumpy.load(output_path)
+    predicted = engine.predict(build_feature_matrix(configurations, Config.FLUID_PROPERTIES))
+    return np.max(np.abs(predicted - reference)), np.max(np.abs(reference))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export du MLP vers un fichier de poids NumPy")
+    parser.add_argument('--model', default=Config.MODEL_PATH)
+    parser.add_argument('--scaler', default=Config.SCALER_PATH)
+    parser.add_argument('--output', default=Config.MLP_WEIGHTS_PATH)
+    parser.add_argument('--dtype', choices=['float64', 'float32'], default='float64')
+    args = parser.parse_args()
+
+    model, scaler = export(args.model, args.scaler, args.output, args.dtype)
+    max_error, max_value = check_parity(model, scaler, args.output)
+    print(f"✅ Poids exportés dans {args.output} ({args.dtype})")
+    print(f"🔍 Parité avec model.predict : écart max = {max_error:.3e} s (prédictions jusqu'à {max_value:.1f} s)")
@@ -0,0 +1,18 @@
+"""Configuration gunicorn, lue automatiquement par : gunicorn app:app
+
+preload_app importe app.py (et charge les modèles) une seule fois dans le processus maître ;
+les workers forkés partagent ensuite ces pages mémoire en copy-on-write au lieu de refaire
+chacun les imports et le dépickling.
+"""
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Les objets déjà chargés ne seront plus parcourus par le ramasse-miettes : ses passages
+    # n'écrivent plus dans leurs en-têtes, ce qui préserve le partage copy-on-write
+    gc.freeze()
@@ -0,0 +1,434 @@
+"""Intégrateur vectorisé du pendule : fait avancer une population de configurations en même temps.
+
+Chaque ligne (I, m, L, S, Cd, rho, V, Tc) possède son propre pas adaptatif (Dormand-Prince 5(4),
+le même schéma que le RK45 de scipy) et quitte l'ensemble actif dès que le critère epsilon de
+find_stop_time est atteint.
+"""
+import numpy as np
+
+# --- TABLEAU DE BUTCHER DORMAND-PRINCE 5(4) (identique à scipy.integrate.RK45) ---
+RK45_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+RK45_A = [
+    [],
+    [1/5],
+    [3/40, 9/40],
+    [44/45, -56/15, 32/9],
+    [19372/6561, -25360/2187, 64448/6561, -212/729],
+    [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+]
+RK45_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+RK45_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+# Sortie dense : y(t + x h) = y + h * (K^T P) [x, x^2, x^3, x^4]
+RK45_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+SAFETY = 0.9
+MIN_FACTOR = 0.2
+MAX_FACTOR = 10.0
+ERROR_EXPONENT = -1 / 5
+PUSH_MANY_MIN = 32  # En dessous, StopDetector.push_many boucle : moins cher que les opérations NumPy
+
+
+def batch_coefficients(I, m, L, S, Cd, rho_fluid, V_object, Tc, g, b_pivot):
+    """Réduit les paramètres physiques en coefficients par ligne de l'équation
+
+        domega/dt = -a sin(theta) - b omega - c tanh(alpha omega) - d |omega| omega
+    """
+    I, m, L, S, Cd, rho_fluid, V_object, Tc = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (I, m, L, S, Cd, rho_fluid, V_object, Tc))
+    )
+    effective_weight = m * g - rho_fluid * V_object * g
+    coeffs = np.empty((I.shape[0], 4))
+    coeffs[:, 0] = effective_weight * L / I
+    coeffs[:, 1] = b_pivot / I
+    coeffs[:, 2] = Tc / I
+    coeffs[:, 3] = 0.5 * rho_fluid * S * Cd * L**3 / I
+    theta_eq = np.where(effective_weight < 0, np.pi, 0.0)
+    return coeffs, theta_eq
+
+
+def pendulum_ode_batch(y, coeffs, alpha_tanh):
+    """Second membre vectorisé : y de forme (N, 2), coeffs de forme (N, 4)."""
+    theta, omega = y[:, 0], y[:, 1]
+    dy = np.empty_like(y)
+    dy[:, 0] = omega
+    dy[:, 1] = (-coeffs[:, 0] * np.sin(theta)
+                - coeffs[:, 1] * omega
+                - coeffs[:, 2] * np.tanh(alpha_tanh * omega)
+                - coeffs[:, 3] * np.abs(omega) * omega)
+    return dy
+
+
+def _initial_step(y0, f0, coeffs, alpha_tanh, rtol, atol):
+    """Version vectorisée de scipy.integrate._ivp.common.select_initial_step (ordre 4)."""
+    scale = atol + np.abs(y0) * rtol
+    d0 = np.sqrt(np.mean((y0 / scale)**2, axis=1))
+    d1 = np.sqrt(np.mean((f0 / scale)**2, axis=1))
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.where(d1 == 0, 1, d1))
+    y1 = y0 + h0[:, None] * f0
+    f1 = pendulum_ode_batch(y1, coeffs, alpha_tanh)
+    d2 = np.sqrt(np.mean(((f1 - f0) / scale)**2, axis=1)) / h0
+    d12 = np.maximum(d1, d2)
+    h1 = np.where(d12 <= 1e-15,
+                  np.maximum(1e-6, h0 * 1e-3),
+                  (0.01 / np.where(d12 == 0, 1, d12))**(1 / 5))
+    return np.minimum(100 * h0, h1)
+
+
+def integrate_batch(I, m, L, S, Cd, rho_fluid, V_object, Tc, theta0, *, g, b_pivot, alpha_tanh,
+                    epsilon, t_max, rtol=1e-3, atol=1e-6, sample_dt=None):
+    """Intègre N pendules simultanément et renvoie le temps d'arrêt de chacun.
+
+    Les paramètres physiques sont des tableaux de longueur N (ou des scalaires diffusés).
+    Le temps d'arrêt est le premier pic de |theta - theta_eq| inférieur à epsilon, comme dans
+    find_stop_time. Sans sample_dt, les pics sont les points de rebroussement (omega = 0),
+    interpolés sur le pas. Avec sample_dt, ils sont cherchés en ligne sur la grille
+    k * sample_dt (sortie dense du RK45, comme t_eval) : même définition que find_stop_time
+    appliqué à cette grille, celle des étiquettes d'entraînement (physique.stop_grid).
+
+    Retourne (t_stop, theta_eq) ; t_stop vaut NaN pour les lignes qui ne se stabilisent pas
+    avant t_max.
+    """
+    theta0 = np.atleast_1d(np.asarray(theta0, dtype=np.float64))
+    coeffs, theta_eq = batch_coefficients(I, m, L, S, Cd, rho_fluid, V_object, Tc, g, b_pivot)
+    n = max(theta0.shape[0], coeffs.shape[0])
+    coeffs = np.broadcast_to(coeffs, (n, 4)).copy()
+    theta_eq = np.broadcast_to(theta_eq, (n,)).copy()
+
+    t_stop = np.full(n, np.nan)
+
+    # Ensemble actif compacté : les lignes terminées sont retirées des tableaux de travail
+    rows = np.arange(n)
+    y = np.zeros((n, 2))
+    y[:, 0] = np.broadcast_to(theta0, (n,))
+    t = np.zeros(n)
+    eq = theta_eq.copy()
+    f = pendulum_ode_batch(y, coeffs, alpha_tanh)
+    h = np.minimum(_initial_step(y, f, coeffs, alpha_tanh, rtol, atol), t_max)
+    rejected = np.zeros(n, dtype=bool)
+    K = np.empty((7, n, 2))
+    if sample_dt is not None:
+        # État de StopDetector par ligne : dernier écart, montée en cours, début du plateau
+        k_next = np.ones(n, dtype=np.int64)
+        prev = np.abs(y[:, 0] - eq)
+        rising = np.zeros(n, dtype=bool)
+        plateau = np.zeros(n, dtype=np.int64)
+
+    while rows.size:
+        h = np.minimum(h, t_max - t)
+
+        # Étages de Runge-Kutta
+        K = K[:, :rows.size]
+        K[0] = f
+        for s in range(1, 6):
+            dy = np.tensordot(RK45_A[s], K[:s], axes=(0, 0)) * h[:, None]
+            K[s] = pendulum_ode_batch(y + dy, coeffs, alpha_tanh)
+        y_new = y + h[:, None] * np.tensordot(RK45_B, K[:6], axes=(0, 0))
+        f_new = pendulum_ode_batch(y_new, coeffs, alpha_tanh)
+        K[6] = f_new
+
+        # Contrôle d'erreur par ligne
+        scale = atol + np.maximum(np.abs(y), np.abs(y_new)) * rtol
+        err = h[:, None] * np.tensordot(RK45_E, K, axes=(0, 0)) / scale
+        err_norm = np.sqrt(np.mean(err**2, axis=1))
+        accepted = err_norm < 1
+
+        with np.errstate(divide='ignore'):
+            factor = SAFETY * err_norm**ERROR_EXPONENT
+        factor_ok = np.where(err_norm == 0, MAX_FACTOR, np.minimum(MAX_FACTOR, factor))
+        factor_ok = np.where(rejected, np.minimum(1, factor_ok), factor_ok)
+        factor_ko = np.maximum(MIN_FACTOR, factor)
+
+        settled = np.zeros(rows.size, dtype=bool)
+        if sample_dt is None:
+            # Points de rebroussement sur les pas acceptés : omega change de signe alors que le
+            # pendule s'éloignait de l'équilibre, ce qui correspond à un pic de |theta - theta_eq|
+            omega0, omega1 = y[:, 1], y_new[:, 1]
+            turning = accepted & (omega0 * omega1 <= 0) & (omega0 != 0) & ((y[:, 0] - eq) * omega0 > 0)
+            if turning.any():
+                k = np.flatnonzero(turning)
+                s = omega0[k] / (omega0[k] - omega1[k])
+                # Interpolation d'Hermite cubique de theta sur le pas (dérivées = omega)
+                hk = h[k]
+                h00 = 2 * s**3 - 3 * s**2 + 1
+                h10 = s**3 - 2 * s**2 + s
+                h01 = -2 * s**3 + 3 * s**2
+                h11 = s**3 - s**2
+                theta_peak = (h00 * y[k, 0] + h10 * hk * omega0[k]
+                              + h01 * y_new[k, 0] + h11 * hk * omega1[k])
+                below = np.abs(theta_peak - eq[k]) < epsilon
+                settled[k[below]] = True
+                t_stop[rows[k[below]]] = t[k[below]] + s[below] * hk[below]
+        else:
+            # Échantillons de la grille couverts par le pas, un par ligne et par passage
+            sampling = accepted & (k_next * sample_dt <= t + h)
+            if sampling.any():
+                Q = np.tensordot(K[:, :, 0], RK45_P, axes=(0, 0))  # sortie dense de theta
+            while sampling.any():
+                k = np.flatnonzero(sampling)
+                x = (k_next[k] * sample_dt - t[k]) / h[k]
+                theta = y[k, 0] + h[k] * (Q[k] * (x[:, None] ** np.arange(1, 5))).sum(axis=1)
+                deviation = np.abs(theta - eq[k])
+                up, down = deviation > prev[k], deviation < prev[k]
+                peak = down & rising[k] & (prev[k] < epsilon)
+                if peak.any():
+                    last = k_next[k[peak]] - 1
+                    settled[k[peak]] = True
+                    t_stop[rows[k[peak]]] = (plateau[k[peak]] + (last - plateau[k[peak]]) // 2) * sample_dt
+                rising[k] = np.where(up, True, np.where(down, False, rising[k]))
+                plateau[k] = np.where(deviation == prev[k], plateau[k], k_next[k])
+                prev[k] = deviation
+                k_next[k] += 1
+                sampling = accepted & ~settled & (k_next * sample_dt <= t + h)
+
+        t = np.where(accepted, t + h, t)
+        y = np.where(accepted[:, None], y_new, y)
+        f = np.where(accepted[:, None], f_new, f)
+        h = h * np.where(accepted, factor_ok, factor_ko)
+        rejected = ~accepted
+
+        done = settled | (t >= t_max)
+        if done.any():
+            keep = ~done
+            rows, y, t, f, h = rows[keep], y[keep], t[keep], f[keep], h[keep]
+            coeffs, eq, rejected = coeffs[keep], eq[keep], rejected[keep]
+            if sample_dt is not None:
+                k_next, prev, rising, plateau = k_next[keep], prev[keep], rising[keep], plateau[keep]
+
+    return t_stop, theta_eq
+
+
+# --- ARRÊT ANTICIPÉ POUR LE CHEMIN SCALAIRE (solve_ivp) ---
+class StopDetector:
+    """Version en ligne de find_stop_time.
+
+    Reçoit les échantillons (t, theta) dans l'ordre et reproduit la détection de pics de
+    scipy.signal.find_peaks sur |theta - theta_eq| (plateaux compris) : le premier pic
+    inférieur à epsilon donne le même t_epsilon que find_stop_time sur la trajectoire complète.
+    """
+
+    def __init__(self, theta_eq, epsilon):
+        self.theta_eq = theta_eq
+        self.epsilon = epsilon
+        self.t_stop = None
+        self._prev = None
+        self._rising = False
+        self._plateau = []
+
+    def push(self, t, theta):
+        """Ajoute un échantillon ; renvoie t_epsilon dès qu'il est connu, sinon None."""
+        deviation = abs(theta - self.theta_eq)
+        if self._prev is None:
+            self._plateau = [t]
+        elif deviation > self._prev:
+            self._rising = True
+            self._plateau = [t]
+        elif deviation == self._prev:
+            self._plateau.append(t)
+        else:
+            if self._rising and self._prev < self.epsilon and self.t_stop is None:
+                self.t_stop = self._plateau[(len(self._plateau) - 1) // 2]
+            self._rising = False
+            self._plateau = [t]
+        self._prev = deviation
+        return self.t_stop
+
+    def push_many(self, ts, thetas):
+        """Ajoute une suite d'échantillons (grille t_eval d'un pas) ; même résultat que push un à un.
+
+        Un pic n'est confirmé que par l'échantillon suivant et doit être sous epsilon : tant
+        qu'aucun échantillon confirmable n'est sous epsilon, seul l'état est mis à jour, sans
+        boucle Python (pas longs du régime lent ou de LSODA, nombreux échantillons par pas).
+        """
+        if len(ts) < PUSH_MANY_MIN:
+            for t, theta in zip(ts, thetas):
+                self.push(t, theta)
+            return self.t_stop
+        deviation = np.abs(np.asarray(thetas) - self.theta_eq)
+        if (self.t_stop is not None or self._prev is None or self._prev < self.epsilon
+                or deviation[:-1].min(initial=np.inf) < self.epsilon):
+            for t, theta in zip(ts, thetas):
+                self.push(t, theta)
+            return self.t_stop
+        changed = np.flatnonzero(np.diff(np.concatenate(([self._prev], deviation))))
+        if changed.size:
+            k = changed[-1]
+            self._rising = bool(deviation[k] > (deviation[k - 1] if k > 0 else self._prev))
+            self._plateau = list(ts[k:])
+        else:
+            self._plateau.extend(ts)
+        self._prev = deviation[-1]
+        return self.t_stop
+
+
+def make_solver(fun, y0, args, t_max, method='RK45', **options):
+    """Instancie la classe de solveur scipy correspondant à method (comme solve_ivp)."""
+    from scipy.integrate import RK23, RK45, DOP853, Radau, BDF, LSODA
+
+    methods = {'RK23': RK23, 'RK45': RK45, 'DOP853': DOP853, 'Radau': Radau, 'BDF': BDF, 'LSODA': LSODA}
+    return methods[method](lambda t, y: fun(t, y, *args), 0.0, np.asarray(y0, dtype=float),
+                           t_max, **options)
+
+
+def solve_until_settled(fun, y0, args, theta_eq, epsilon, t_max, t_min=0.0, t_eval=None,
+                        dense_output=False, method='RK45', step_callback=None, **options):
+    """Intègre pas à pas (mêmes pas que solve_ivp) et s'arrête dès que le pendule est stabilisé.
+
+    Les pics sont cherchés sur les points de pas, ou sur la grille t_eval si elle est fournie,
+    exactement comme find_stop_time le ferait après coup. L'intégration continue au moins
+    jusqu'à t_min (fenêtre d'animation par exemple) puis s'arrête au premier t_epsilon.
+    step_callback(t), s'il est fourni, est appelé après chaque pas (suivi de progression) ;
+    une exception levée par le callback interrompt l'intégration.
+
+    Retourne un OptimizeResult avec t, y, sol (si dense_output), t_stop, nfev, njev, nlu,
+    nsteps, status et message.
+    """
+    from scipy.integrate import OdeSolution
+    from scipy.optimize import OptimizeResult
+
+    solver = make_solver(fun, y0, args, t_max, method, **options)
+    detector = StopDetector(theta_eq, epsilon)
+
+    if t_eval is None:
+        ts, ys = [solver.t], [solver.y.copy()]
+        detector.push(solver.t, solver.y[0])
+    else:
+        t_eval = np.asarray(t_eval)
+        t_eval_i = 0
+        ts, ys = [], []
+
+    interpolants = []
+    step_ts = [solver.t]
+    nsteps = 0
+    status = None
+    while status is None:
+        message = solver.step()
+        nsteps += 1
+        if solver.status == 'finished':
+            status = 0
+        elif solver.status == 'failed':
+            status = -1
+            break
+
+        t = solver.t
+        sol = solver.dense_output() if (dense_output or t_eval is not None) else None
+        if dense_output:
+            interpolants.append(sol)
+            step_ts.append(t)
+
+        if t_eval is None:
+            ts.append(t)
+            ys.append(solver.y.copy())
+            detector.push(t, solver.y[0])
+        else:
+            t_eval_i_new = np.searchsorted(t_eval, t, side='right')
+            t_eval_step = t_eval[t_eval_i:t_eval_i_new]
+            if t_eval_step.size > 0:
+                y_step = sol(t_eval_step)
+                ts.append(t_eval_step)
+                ys.append(y_step)
+                if detector.t_stop is None:
+                    detector.push_many(t_eval_step, y_step[0])
+                t_eval_i = t_eval_i_new
+
+        if step_callback is not None:
+            step_callback(t)
+
+        if detector.t_stop is not None and t >= t_min and status is None:
+            status = 1
+            message = 'Stabilisation détectée.'
+
+    if t_eval is None:
+        t_arr = np.array(ts)
+        y_arr = np.array(ys).T
+    elif ts:
+        t_arr = np.hstack(ts)
+        y_arr = np.hstack(ys)
+    else:
+        t_arr = np.array([])
+        y_arr = np.empty((len(y0), 0))
+
+    result = OptimizeResult(
+        t=t_arr, y=y_arr, t_stop=detector.t_stop,
+        sol=None, nfev=solver.nfev, njev=solver.njev, nlu=solver.nlu, nsteps=nsteps,
+        status=status, message=message or 'The solver successfully reached the end of the integration interval.',
+        success=status >= 0
+    )
+    if dense_output:
+        result.sol = OdeSolution(np.array(step_ts), interpolants)
+    return result
+
+
+def iter_trajectory(fun, y0, args, theta_eq, epsilon, t_max, sample_dt=0.1, window=100.0,
+                    chunk_size=50, early_stop=True, method='RK45', step_callback=None, t_eval=None,
+                    **options):
+    """Générateur : intègre pas à pas et produit la trajectoire par morceaux au fil du calcul.
+
+    Chaque morceau est un couple (t, theta) de tableaux échantillonnés tous les sample_dt sur
+    [0, window) ; le premier est produit dès le premier pas, les suivants tous les chunk_size
+    échantillons. Seul le morceau courant est gardé en mémoire. Une fois la fenêtre couverte,
+    l'intégration continue sans échantillonnage jusqu'à la stabilisation (même critère que
+    solve_until_settled) puis le générateur retourne (StopIteration.value) un dictionnaire
+    {'t_stop', 'simulation_time', 'nfev', 'status'}. step_callback(t) est appelé après chaque
+    pas, comme pour solve_until_settled : une exception levée par le callback interrompt
+    l'intégration, y compris après la fenêtre, quand plus aucun morceau n'est produit. Comme
+    pour solve_until_settled, les pics sont cherchés sur la grille t_eval si elle est fournie.
+    """
+    solver = make_solver(fun, y0, args, t_max, method, **options)
+    detector = StopDetector(theta_eq, epsilon)
+    if t_eval is None:
+        detector.push(solver.t, solver.y[0])
+    else:
+        t_eval = np.asarray(t_eval)
+        t_eval_i = 0
+
+    n_samples = int(np.ceil(min(window, t_max) / sample_dt))
+    next_sample = 0
+    pending_t, pending_theta = [], []
+    first = True
+    status = 0
+    while solver.status == 'running':
+        solver.step()
+        if solver.status == 'failed':
+            status = -1
+            break
+        t = solver.t
+        if t_eval is None:
+            detector.push(t, solver.y[0])
+        else:
+            t_eval_i_new = np.searchsorted(t_eval, t, side='right')
+            if t_eval_i_new > t_eval_i and detector.t_stop is None:
+                t_eval_step = t_eval[t_eval_i:t_eval_i_new]
+                detector.push_many(t_eval_step, solver.dense_output()(t_eval_step)[0])
+                t_eval_i = t_eval_i_new
+        if step_callback is not None:
+            step_callback(t)
+
+        if next_sample < n_samples:
+            last = min(n_samples, int(np.floor(t / sample_dt)) + 1)
+            if last > next_sample:
+                t_samples = np.arange(next_sample, last) * sample_dt
+                pending_t.append(t_samples)
+                pending_theta.append(solver.dense_output()(t_samples)[0])
+                next_sample = last
+            if pending_t and (first or next_sample >= n_samples
+                              or sum(len(c) for c in pending_t) >= chunk_size):
+                yield np.concatenate(pending_t), np.concatenate(pending_theta)
+                pending_t, pending_theta = [], []
+                first = False
+
+        if detector.t_stop is not None and next_sample >= n_samples and early_stop:
+            status = 1
+            break
+
+    if pending_t:
+        yield np.concatenate(pending_t), np.concatenate(pending_theta)
+    return {'t_stop': detector.t_stop, 'simulation_time': solver.t, 'nfev': solver.nfev,
+            'status': status}
@@ -0,0 +1,160 @@
+"""File de travaux asynchrones pour les simulations longues.
+
+Les simulations sont exécutées dans un pool de processus borné ; le thread de requête Flask
+ne fait que soumettre le travail et consulter son état. Chaque travail publie sa progression
+et vérifie son drapeau d'annulation et son échéance via un dictionnaire partagé
+(multiprocessing.Manager), ce qui permet l'annulation et le timeout coopératifs. La progression
+(clé job_id) n'est écrite que par le processus de calcul, le drapeau d'annulation (clé
+(job_id, 'cancel')) que par cancel() : aucune écriture ne peut effacer une annulation.
+
+États : queued -> running -> done | failed | cancelled | timeout
+"""
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+PROGRESS_EVERY = 200  # Nombre de pas d'intégration entre deux publications de progression
+
+
+class JobCancelled(Exception):
+    """Levée dans le processus de calcul quand le travail a été annulé."""
+
+
+class JobTimeout(Exception):
+    """Levée dans le processus de calcul quand l'échéance du travail est dépassée."""
+
+
+class QueueFull(Exception):
+    """La file a atteint sa capacité : le client doit réessayer plus tard."""
+
+
+def _run_job(job_id, func, kwargs, shared, deadline, t_max):
+    """Exécuté dans un processus du pool : lance func avec un callback de progression."""
+    # Annulé entre sa mise en file et son démarrage (future.cancel() échoue dès que le pool
+    # l'a transmis à un processus)
+    if shared.get((job_id, 'cancel')):
+        raise JobCancelled()
+    shared[job_id] = 0.0
+    steps = [0]
+
+    def step_callback(t):
+        steps[0] += 1
+        if steps[0] % PROGRESS_EVERY:
+            return
+        if shared.get((job_id, 'cancel')):
+            raise JobCancelled()
+        if time.time() > deadline:
+            raise JobTimeout()
+        shared[job_id] = min(1.0, t / t_max)
+
+    return func(step_callback=step_callback, **kwargs)
+
+
+class JobManager:
+    """Soumet les travaux au pool, applique la contre-pression et conserve leurs résultats."""
+
+    def __init__(self, func, t_max, max_workers=2, max_pending=16, timeout=300.0, result_ttl=600.0):
+        self.func = func
+        self.t_max = t_max
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._manager = multiprocessing.Manager()
+        self._shared = self._manager.dict()
+        self._executor = ProcessPoolExecutor(max_workers=max_workers)
+
+    def _active_count(self):
+        return sum(1 for job in self._jobs.values() if job['status'] in ('queued', 'running'))
+
+    def _prune(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished'] is not None and now - job['finished'] > self.result_ttl]
+        for job_id in expired:
+            del self._jobs[job_id]
+            self._shared.pop(job_id, None)
+            self._shared.pop((job_id, 'cancel'), None)
+
+    def submit(self, kwargs, timeout=None):
+        """Crée un travail et retourne son identifiant ; lève QueueFull si la file est pleine."""
+        timeout = self.timeout if timeout is None else min(timeout, self.timeout)
+        with self._lock:
+            self._prune()
+            if self._active_count() >= self.max_pending:
+                raise QueueFull()
+            job_id = uuid.uuid4().hex
+            deadline = time.time() + timeout
+            job = {
+                'id': job_id, 'status': 'queued', 'progress': 0.0, 'created': time.time(),
+                'finished': None, 'deadline': deadline, 'result': None, 'error': None
+            }
+            self._jobs[job_id] = job
+            future = self._executor.submit(_run_job, job_id, self.func, kwargs, self._shared,
+                                           deadline, self.t_max)
+            job['future'] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['finished'] is not None:
+                return
+            job['finished'] = time.time()
+            if future.cancelled():
+                job['status'] = 'cancelled'
+                return
+            error = future.exception()
+            if error is None:
+                job['status'] = 'done'
+                job['progress'] = 1.0
+                job['result'] = future.result()
+            elif isinstance(error, JobCancelled):
+                job['status'] = 'cancelled'
+            elif isinstance(error, JobTimeout):
+                job['status'] = 'timeout'
+                job['error'] = 'Délai maximal dépassé'
+            else:
+                job['status'] = 'failed'
+                job['error'] = str(error)
+
+    def status(self, job_id):
+        """État public d'un travail (sans le résultat), ou None s'il est inconnu."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] in ('queued', 'running'):
+                progress = self._shared.get(job_id)
+                if progress is not None:
+                    job['status'] = 'running'
+                    job['progress'] = progress
+            return {key: job[key] for key in ('id', 'status', 'progress', 'error', 'result')}
+
+    def cancel(self, job_id):
+        """Annule un travail en file, ou demande l'arrêt d'un travail en cours."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if job['status'] not in ('queued', 'running'):
+                return True
+            if not job['future'].cancel():
+                self._shared[(job_id, 'cancel')] = True
+        return True
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'max_workers': self.max_workers, 'max_pending': self.max_pending, 'jobs': counts}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()
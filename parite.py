@@ -0,0 +1,173 @@
+"""Contrôle de parité entre le collecteur (entraînement) et le serveur (service).
+
+Tire des configurations avec le plan d'expériences de collecteur.py, puis vérifie au bit près :
+1. calculate_properties (chemin scalaire) contre calculate_properties_batch (vectorisé) ;
+2. les features construites à partir des lignes du jeu de données (dataset_features) contre
+   celles que le serveur construit pour /api/predict (build_feature_matrix) ;
+3. build_feature_matrix contre configuration_features, qui réutilise les propriétés déjà
+   calculées pour la simulation (/api/run) ;
+4. le moteur NumPy exporté (MLP_WEIGHTS_PATH) contre le MLP scikit-learn et son scaler
+   (MODEL_PATH, SCALER_PATH), aux arrondis près ; ignoré si l'un des fichiers manque ;
+5. la détection d'arrêt en ligne (solve_until_settled) contre find_stop_time appliqué à la
+   trajectoire complète, sur une grille fixe : avec et sans arrêt avant t_max, équilibres
+   θ_eq = 0 et π, méthode explicite et LSODA, sur les points de pas et sur une grille t_eval.
+
+Usage : python parite.py [--samples 3000] [--seed 42]
+Code de sortie 1 au premier écart.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from acceleration import make_pendulum_system
+from collecteur import L_BOUNDS, SAMPLER, make_task, sample_chunk
+from config import Config
+from integrateur import solve_until_settled
+from physique import (SHAPES, calculate_properties, calculate_properties_batch, equilibrium_angle,
+                      find_stop_time, pendulum_ode)
+from predicteur import FEATURE_ORDER, MLPNumpy, build_feature_matrix, configuration_features, dataset_features
+
+
+def collector_tasks(n_samples, seed):
+    """Tâches telles que les produit collecteur.py (morceau 0 du plan)."""
+    return [make_task(i, row) for i, row in enumerate(sample_chunk(0, n_samples, n_samples, seed, SAMPLER))]
+
+
+def dataset_rows(tasks):
+    """Colonnes écrites par le collecteur (dim1..dim3, NaN pour les dimensions inutilisées)."""
+    rows = {key: [task[key] for task in tasks] for key in ('L', 'm', 'theta0_rad', 'Tc', 'shape', 'fluid')}
+    for k in range(3):
+        rows[f'dim{k + 1}'] = [task['dims'][k] if k < len(task['dims']) else np.nan for task in tasks]
+    return rows
+
+
+def serving_configurations(tasks):
+    """Même configurations au format de /api/predict (theta0 en degrés)."""
+    return [{
+        'shape': task['shape'], 'fluid': task['fluid'], 'dims': list(task['dims']),
+        'm': task['m'], 'L': task['L'], 'theta0_deg': float(np.rad2deg(task['theta0_rad'])), 'Tc': task['Tc']
+    } for task in tasks]
+
+
+def check_properties(tasks):
+    shape_codes = np.array([SHAPES.index(task['shape']) for task in tasks], dtype=np.intp)
+    dims = np.zeros((len(tasks), 3))
+    for i, task in enumerate(tasks):
+        dims[i, :len(task['dims'])] = task['dims']
+    m = np.array([task['m'] for task in tasks])
+    L = np.array([task['L'] for task in tasks])
+    batch = np.column_stack(calculate_properties_batch(shape_codes, dims, m, L))
+    scalar = np.array([calculate_properties(task['shape'], task['dims'], task['m'], task['L']) for task in tasks])
+    return [(tasks[i]['shape'], name) for i, j in zip(*np.nonzero(batch != scalar))
+            for name in [('I', 'S', 'Cd', 'V')[j]]]
+
+
+def check_features(tasks):
+    training = dataset_features(dataset_rows(tasks), Config.FLUID_PROPERTIES)
+    serving = build_feature_matrix(serving_configurations(tasks), Config.FLUID_PROPERTIES)
+    # theta0 passe par les degrés côté service : seul écart admis, d'un ulp au plus
+    theta = FEATURE_ORDER.index('theta0_rad')
+    mismatch = training != serving
+    mismatch[:, theta] = ~np.isclose(training[:, theta], serving[:, theta], rtol=4 * np.finfo(float).eps, atol=0)
+    return [(tasks[i]['shape'], FEATURE_ORDER[j]) for i, j in zip(*np.nonzero(mismatch))]
+
+
+def check_run_features(tasks):
+    configurations = serving_configurations(tasks)
+    serving = build_feature_matrix(configurations, Config.FLUID_PROPERTIES)
+    rows = []
+    for params in configurations:
+        I, _, _, V = calculate_properties(params['shape'], params['dims'], params['m'], params['L'])
+        rows.append(configuration_features(params, Config.FLUID_PROPERTIES, I, V))
+    run = np.vstack(rows)
+    return [(tasks[i]['shape'], FEATURE_ORDER[j]) for i, j in zip(*np.nonzero(serving != run))]
+
+
+def check_mlp_engine(tasks):
+    """None si le moteur exporté ou le modèle scikit-learn est absent."""
+    if not all(os.path.exists(path) for path in (Config.MLP_WEIGHTS_PATH, Config.MODEL_PATH, Config.SCALER_PATH)):
+        return None
+    import joblib
+
+    configurations = serving_configurations(tasks)
+    model, scaler = joblib.load(Config.MODEL_PATH), joblib.load(Config.SCALER_PATH)
+    reference = model.predict(build_feature_matrix(configurations, Config.FLUID_PROPERTIES, scaler))
+    engine = MLPNumpy.load(Config.MLP_WEIGHTS_PATH)
+    predicted = engine.predict(build_feature_matrix(configurations, Config.FLUID_PROPERTIES))
+    # Scaler replié dans la première couche : seul l'ordre des opérations change
+    tolerance = 1e-9 if engine.dtype == np.float64 else 1e-3
+    mismatch = ~np.isclose(predicted, reference, rtol=tolerance, atol=tolerance)
+    return [(tasks[i]['shape'], 'prédiction') for i in np.flatnonzero(mismatch)]
+
+
+STOP_DIMS = {'sphère': [0.1], 'cylindre': [0.05, 0.2], 'pavé': [0.1, 0.1, 0.1]}
+# (t_max, méthode) : 30 s laisse des cas sans arrêt, LSODA couvre le chemin raide
+STOP_RUNS = ((30.0, 'auto'), (300.0, 'auto'), (300.0, 'LSODA'))
+
+
+def check_stop_detection(tasks):
+    """Grille fixe, indépendante des tâches ; échoue aussi si la grille ne couvre pas tous les cas."""
+    mismatches = []
+    covered = set()
+    for shape, dims in STOP_DIMS.items():
+        for props in Config.FLUID_PROPERTIES.values():
+            for m in (0.5, 5.0):
+                I, S, Cd, V = calculate_properties(shape, dims, m, 1.0)
+                theta_eq = equilibrium_angle(m, props['rho'], V, Config.G)
+                for t_max, method in STOP_RUNS:
+                    fun, args, method, options = make_pendulum_system(
+                        I, m, 1.0, S, Cd, props['rho'], V, Config.TC_DRY_FRICTION, g=Config.G,
+                        b_pivot=Config.B_PIVOT, alpha_tanh=Config.ALPHA_TANH, method=method,
+                        reference_ode=pendulum_ode)
+                    y0 = [np.deg2rad(45.0), 0.0]
+                    for t_eval in (None, np.linspace(0.0, t_max, int(t_max * 20) + 1)):
+                        common = dict(t_eval=t_eval, method=method, **options)
+                        online = solve_until_settled(fun, y0, args, theta_eq, Config.EPSILON, t_max, **common)
+                        # t_min = t_max : aucun arrêt anticipé, trajectoire complète
+                        full = solve_until_settled(fun, y0, args, theta_eq, Config.EPSILON, t_max, t_min=t_max,
+                                                   **common)
+                        reference = find_stop_time(full.t, full.y[0], Config.EPSILON, theta_eq)
+                        settled = reference is not None
+                        covered.add((method == 'LSODA', theta_eq > 0, settled))
+                        if online.t_stop != reference:
+                            mismatches.append((shape, f"{method}/θeq={np.rad2deg(theta_eq):.0f}°/"
+                                                      f"{'arrêt' if settled else 'sans arrêt'}"))
+    # Cas attendus : chaque méthode avec et sans arrêt, chaque équilibre avec arrêt
+    expected = {(stiff, False, settled) for stiff in (False, True) for settled in (False, True)}
+    expected |= {(stiff, True, True) for stiff in (False, True)}
+    mismatches.extend(('grille', f'cas non couvert {case}') for case in sorted(expected - covered))
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--samples', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    tasks = collector_tasks(args.samples, args.seed)
+    print(f"{len(tasks)} configurations ({len(L_BOUNDS)} paramètres, plan '{SAMPLER}', graine {args.seed})")
+    failed = False
+    for label, check in (('propriétés scalaire / vectorisé', check_properties),
+                         ('features entraînement / service', check_features),
+                         ('features service / /api/run', check_run_features),
+                         ('moteur NumPy / scikit-learn', check_mlp_engine),
+                         ('arrêt en ligne / find_stop_time', check_stop_detection)):
+        mismatches = check(tasks)
+        if mismatches is None:
+            print(f"IGNORÉ {label} : fichiers absents")
+        elif mismatches:
+            failed = True
+            summary = {}
+            for key in mismatches:
+                summary[key] = summary.get(key, 0) + 1
+            print(f"ÉCART  {label} : " + ', '.join(f'{shape}/{name} x{n}' for (shape, name), n in summary.items()))
+        else:
+            print(f"OK     {label}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""Noyau physique partagé par le collecteur (données d'entraînement) et le serveur.
+
+Un seul endroit pour les constantes physiques (lues dans Config), les propriétés des formes,
+l'équation du mouvement et le critère d'arrêt : collecteur.py, app.py, predicteur.py,
+tabulation.py et balayage.py l'importent tous, ce qui évite l'écart entraînement / service.
+
+Registre des formes (SHAPE_REGISTRY) : chaque forme fournit
+  - properties(m, L, d) : version vectorisée, tableaux (N,) de m et L, d de forme (N, 3)
+    complété par des zéros ; retourne des tableaux (I, S, Cd, V) ;
+  - properties_scalar(m, L, dims) : chemin rapide en flottants Python (pas de scalaires
+    NumPy), pour une seule configuration ;
+  - surface (vectorisée) et surface_scalar : la feature 'surface' vue par le MLP à
+    l'entraînement. Elle diffère de l'aire de traînée S pour la sphère (4 pi R^2, aire totale,
+    contre pi R^2, maître-couple).
+Les deux versions effectuent les mêmes opérations dans le même ordre (x * x plutôt que x**2,
+qui passe par pow) : elles donnent les mêmes flottants au bit près (python parite.py).
+"""
+import math
+
+import numpy as np
+
+from config import Config
+
+# --- CONSTANTES ---
+G = Config.G
+B_PIVOT = Config.B_PIVOT
+EPSILON = Config.EPSILON
+ALPHA_TANH = Config.ALPHA_TANH
+T_MAX_SIMULATION = Config.T_MAX_SIMULATION
+TC_DRY_FRICTION = Config.TC_DRY_FRICTION
+FLUID_DENSITIES = {name: props['rho'] for name, props in Config.FLUID_PROPERTIES.items()}
+STOP_GRID_RATE = 10  # Échantillons par seconde de la grille du critère d'arrêt (celle des étiquettes d'entraînement)
+
+
+# --- FORMES ---
+class Shape:
+    """Entrée du registre des formes."""
+
+    def __init__(self, name, n_dims, drag_coefficient, properties, properties_scalar, surface, surface_scalar):
+        self.name = name
+        self.n_dims = n_dims
+        self.drag_coefficient = drag_coefficient
+        self.properties = properties
+        self.properties_scalar = properties_scalar
+        self.surface = surface
+        self.surface_scalar = surface_scalar
+
+
+def _sphere(m, L, d):
+    R = d[:, 0]
+    S = math.pi * (R * R)
+    V = (4 / 3) * math.pi * (R * R * R)
+    I = (2 / 5) * m * (R * R) + m * ((L + R) * (L + R))
+    return I, S, np.full_like(m, 0.47), V
+
+
+def _sphere_scalar(m, L, dims):
+    R = dims[0]
+    S = math.pi * (R * R)
+    V = (4 / 3) * math.pi * (R * R * R)
+    I = (2 / 5) * m * (R * R) + m * ((L + R) * (L + R))
+    return I, S, 0.47, V
+
+
+def _cylinder(m, L, d):
+    R, H = d[:, 0], d[:, 1]
+    S = math.pi * (R * R)
+    V = math.pi * (R * R) * H
+    I = m * ((R * R) / 4 + (H * H) / 12) + m * ((L + R) * (L + R))
+    return I, S, np.full_like(m, 0.82), V
+
+
+def _cylinder_scalar(m, L, dims):
+    R, H = dims[0], dims[1]
+    S = math.pi * (R * R)
+    V = math.pi * (R * R) * H
+    I = m * ((R * R) / 4 + (H * H) / 12) + m * ((L + R) * (L + R))
+    return I, S, 0.82, V
+
+
+def _box(m, L, d):
+    d1, d2, d3 = d[:, 0], d[:, 1], d[:, 2]
+    S = d3 * d2
+    V = d1 * d2 * d3
+    I = m * (d1 * d1 + d2 * d2) / 12 + m * ((L + d3 / 2) * (L + d3 / 2))
+    return I, S, np.full_like(m, 1.05), V
+
+
+def _box_scalar(m, L, dims):
+    d1, d2, d3 = dims[0], dims[1], dims[2]
+    S = d3 * d2
+    V = d1 * d2 * d3
+    I = m * (d1 * d1 + d2 * d2) / 12 + m * ((L + d3 / 2) * (L + d3 / 2))
+    return I, S, 1.05, V
+
+
+SHAPE_REGISTRY = {
+    'cylindre': Shape('cylindre', 2, 0.82, _cylinder, _cylinder_scalar,
+                      lambda d: math.pi * (d[:, 0] * d[:, 0]), lambda dims: math.pi * (dims[0] * dims[0])),
+    'pavé': Shape('pavé', 3, 1.05, _box, _box_scalar,
+                  lambda d: d[:, 2] * d[:, 1], lambda dims: dims[2] * dims[1]),
+    'sphère': Shape('sphère', 1, 0.47, _sphere, _sphere_scalar,
+                    lambda d: 4 * math.pi * (d[:, 0] * d[:, 0]), lambda dims: 4 * math.pi * (dims[0] * dims[0])),
+}
+# Ordre des codes de forme (= ordre des colonnes one-hot du MLP)
+SHAPES = tuple(SHAPE_REGISTRY)
+
+
+def get_shape(name):
+    try:
+        return SHAPE_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Forme '{name}' non reconnue.") from None
+
+
+def calculate_properties(shape, dims, m, L):
+    """Chemin rapide scalaire : (I, S, Cd, V) en flottants Python."""
+    return get_shape(shape).properties_scalar(float(m), float(L), [float(d) for d in dims])
+
+
+def calculate_properties_batch(shape_codes, dims, m, L):
+    """Version vectorisée de calculate_properties.
+
+    shape_codes : indices dans SHAPES, dims : tableau (N, 3) complété par des zéros.
+    Retourne (I, S, Cd, V), chacun de forme (N,).
+    """
+    m = np.asarray(m, dtype=np.float64)
+    L = np.asarray(L, dtype=np.float64)
+    I = np.empty_like(m)
+    S = np.empty_like(m)
+    Cd = np.empty_like(m)
+    V = np.empty_like(m)
+    for code, shape in enumerate(SHAPE_REGISTRY.values()):
+        rows = shape_codes == code
+        if rows.any():
+            I[rows], S[rows], Cd[rows], V[rows] = shape.properties(m[rows], L[rows], dims[rows])
+    return I, S, Cd, V
+
+
+def feature_surface_batch(shape_codes, dims):
+    """Feature 'surface' du MLP (définition de l'entraînement), vectorisée."""
+    surface = np.empty(len(shape_codes))
+    for code, shape in enumerate(SHAPE_REGISTRY.values()):
+        rows = shape_codes == code
+        if rows.any():
+            surface[rows] = shape.surface(dims[rows])
+    return surface
+
+
+def feature_surface(shape, dims):
+    """Feature 'surface' du MLP (définition de l'entraînement), pour une configuration."""
+    return get_shape(shape).surface_scalar([float(d) for d in dims])
+
+
+# --- DYNAMIQUE ---
+def equilibrium_angle(m, rho_fluid, V_object, g=G):
+    """Position d'équilibre : pi si la poussée d'Archimède dépasse le poids, 0 sinon."""
+    return math.pi if m * g - rho_fluid * V_object * g < 0 else 0.0
+
+
+def pendulum_ode(t, y, I, m, L, S, Cd, rho_fluid, V_object, Tc, alpha_tanh, g=G, b_pivot=B_PIVOT):
+    """Équation différentielle complète avec poussée d'Archimède, traînée et frottement sec."""
+    theta, omega = y
+
+    buoyancy_force = rho_fluid * V_object * g
+    torque_gravity = -(m * g - buoyancy_force) * L * np.sin(theta)
+    torque_pivot_friction = -b_pivot * omega
+    torque_dry_friction = -Tc * np.tanh(alpha_tanh * omega)
+    speed = L * omega
+    torque_fluid_drag = -0.5 * rho_fluid * S * Cd * abs(speed) * speed * L
+
+    domega_dt = (torque_gravity + torque_pivot_friction + torque_dry_friction + torque_fluid_drag) / I
+    dtheta_dt = omega
+    return [dtheta_dt, domega_dt]
+
+
+def find_stop_time(t_array, theta_array, epsilon, theta_eq):
+    """Trouve le temps où l'amplitude des oscillations passe sous epsilon, autour de la position d'équilibre theta_eq."""
+    from scipy.signal import find_peaks
+
+    deviation = np.abs(theta_array - theta_eq)
+    peaks_indices, _ = find_peaks(deviation)
+    if len(peaks_indices) == 0:
+        return None
+    peak_times = t_array[peaks_indices]
+    peak_amplitudes = deviation[peaks_indices]
+    sub_threshold_peaks = np.where(peak_amplitudes < epsilon)[0]
+    if len(sub_threshold_peaks) > 0:
+        return peak_times[sub_threshold_peaks[0]]
+    return None
+
+
+def stop_grid(t_max=T_MAX_SIMULATION):
+    """Grille sur laquelle find_stop_time cherche les pics : celle du collecteur pour les étiquettes
+    d'entraînement, réutilisée par le serveur pour que les temps servis aient la même définition."""
+    return np.linspace(0, t_max, int(t_max * STOP_GRID_RATE))
+
+
+def stop_grid_step(t_max=T_MAX_SIMULATION):
+    """Pas de stop_grid(t_max), pour l'intégrateur vectorisé (integrate_batch(sample_dt=...))."""
+    return t_max / (int(t_max * STOP_GRID_RATE) - 1)
@@ -0,0 +1,179 @@
+"""Préparation vectorisée des features du MLP et prédiction par lots.
+
+Les features sont écrites directement dans une matrice float64 préallouée, dans l'ordre
+attendu par le scaler d'entraînement, puis standardisées sur place : un seul appel à
+model.predict suffit pour tout le lot, sans DataFrame pandas.
+
+Les propriétés physiques viennent de physique.py, comme pour le collecteur : la feature
+'surface' suit la définition de l'entraînement (4 pi R^2 pour la sphère), distincte de
+l'aire de traînée S. dataset_features construit la même matrice à partir des lignes écrites
+par collecteur.py (python parite.py vérifie l'égalité au bit près).
+"""
+import threading
+
+import numpy as np
+
+from physique import SHAPES, TC_DRY_FRICTION, calculate_properties_batch, feature_surface, feature_surface_batch
+
+# Ordre des 14 colonnes attendu par le scaler et le modèle
+FEATURE_ORDER = [
+    'L', 'm', 'theta0_rad', 'Tc', 'fluid', 'dim1', 'dim2', 'dim3',
+    'surface', 'volume', 'inertie', 'shape_cylindre', 'shape_pavé', 'shape_sphère'
+]
+DEFAULT_TC = TC_DRY_FRICTION
+# Version du calcul des features, à incrémenter quand il change (clés de cache des prédictions)
+FEATURES_VERSION = 2
+
+
+def build_feature_matrix(configurations, fluid_properties, scaler=None, out=None):
+    """Construit la matrice (N, 14) des features, standardisée si un scaler est fourni.
+
+    Chaque configuration suit le format de /api/predict : shape, fluid, dims, m, L,
+    theta0_deg et Tc optionnel.
+    """
+    n = len(configurations)
+    X = out if out is not None else np.empty((n, len(FEATURE_ORDER)), dtype=np.float64)
+    dims = np.zeros((n, 3))
+    shape_codes = np.empty(n, dtype=np.intp)
+
+    for i, params in enumerate(configurations):
+        shape = params['shape']
+        if shape not in SHAPES:
+            raise ValueError(f"Forme '{shape}' non reconnue.")
+        shape_codes[i] = SHAPES.index(shape)
+        row_dims = params['dims'][:3]
+        dims[i, :len(row_dims)] = row_dims
+        X[i, 0] = params['L']
+        X[i, 1] = params['m']
+        X[i, 2] = params['theta0_deg']
+        X[i, 3] = params.get('Tc', DEFAULT_TC)
+        X[i, 4] = fluid_properties[params['fluid']]['rho']
+
+    X[:, 2] = np.deg2rad(X[:, 2])
+    X[:, 5:8] = dims
+    fill_derived_features(X, shape_codes, dims)
+
+    if scaler is not None:
+        apply_scaler(X, scaler)
+    return X
+
+
+def configuration_features(params, fluid_properties, I, V):
+    """Matrice (1, 14) d'une configuration dont l'inertie et le volume sont déjà calculés
+    (calculate_properties) ; identique à build_feature_matrix([params], fluid_properties)."""
+    shape = params['shape']
+    if shape not in SHAPES:
+        raise ValueError(f"Forme '{shape}' non reconnue.")
+    X = np.zeros((1, len(FEATURE_ORDER)), dtype=np.float64)
+    row_dims = params['dims'][:3]
+    X[0, :5] = (params['L'], params['m'], params['theta0_deg'], params.get('Tc', DEFAULT_TC),
+                fluid_properties[params['fluid']]['rho'])
+    X[:, 2] = np.deg2rad(X[:, 2])
+    X[0, 5:5 + len(row_dims)] = row_dims
+    X[0, 8] = feature_surface(shape, row_dims)
+    X[0, 9] = V
+    X[0, 10] = I
+    X[0, 11 + SHAPES.index(shape)] = 1.0
+    return X
+
+
+def fill_derived_features(X, shape_codes, dims):
+    """Colonnes calculées (surface, volume, inertie, one-hot de la forme) à partir de L, m et dims."""
+    I, _, _, V = calculate_properties_batch(shape_codes, dims, X[:, 1], X[:, 0])
+    X[:, 8] = feature_surface_batch(shape_codes, dims)
+    X[:, 9] = V
+    X[:, 10] = I
+    X[:, 11:14] = 0.0
+    X[np.arange(len(X)), 11 + shape_codes] = 1.0
+
+
+def dataset_features(rows, fluid_properties):
+    """Matrice des features d'entraînement à partir des colonnes écrites par collecteur.py.
+
+    rows : DataFrame (ou dictionnaire de colonnes) avec L, m, theta0_rad, Tc, shape, fluid,
+    dim1..dim3 (NaN ou absentes pour les dimensions inutilisées).
+    """
+    def column(name):
+        return np.asarray(rows[name], dtype=np.float64) if name in rows else None
+
+    L = column('L')
+    n = len(L)
+    X = np.empty((n, len(FEATURE_ORDER)), dtype=np.float64)
+    X[:, 0] = L
+    X[:, 1] = column('m')
+    X[:, 2] = column('theta0_rad')
+    X[:, 3] = column('Tc')
+    X[:, 4] = [fluid_properties[fluid]['rho'] for fluid in rows['fluid']]
+    dims = np.zeros((n, 3))
+    for k in range(3):
+        values = column(f'dim{k + 1}')
+        if values is not None:
+            dims[:, k] = np.nan_to_num(values)
+    X[:, 5:8] = dims
+    shape_codes = np.array([SHAPES.index(shape) for shape in rows['shape']], dtype=np.intp)
+    fill_derived_features(X, shape_codes, dims)
+    return X
+
+
+def apply_scaler(X, scaler):
+    """Même arithmétique que StandardScaler.transform, appliquée sur place."""
+    if scaler.with_mean:
+        X -= scaler.mean_
+    if scaler.with_std:
+        X /= scaler.scale_
+    return X
+
+
+def predict_stop_times(model, X):
+    """Un seul appel à model.predict pour tout le lot ; les prédictions négatives sont repliées."""
+    return np.abs(model.predict(X))
+
+
+class MLPNumpy:
+    """Moteur d'inférence NumPy pur pour le MLP exporté par export_mlp.py.
+
+    Le scaler est replié dans la première couche : predict prend les features brutes
+    (build_feature_matrix sans scaler). Les tampons intermédiaires sont préalloués et
+    réutilisés d'un appel à l'autre tant que le lot ne dépasse pas leur capacité ; chaque
+    thread a les siens (serveur multi-thread, /api/run, balayages).
+    """
+
+    def __init__(self, weights, biases, metadata=None):
+        self.weights = weights
+        self.biases = biases
+        self.metadata = metadata or {}
+        self.dtype = weights[0].dtype
+        self._local = threading.local()
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = int(data['n_layers'])
+            weights = [np.ascontiguousarray(data[f'W{i}']) for i in range(n_layers)]
+            biases = [np.ascontiguousarray(data[f'b{i}']) for i in range(n_layers)]
+            metadata = {key: data[key].item() for key in data.files if key.startswith('meta_')}
+        return cls(weights, biases, metadata)
+
+    def _ensure_buffers(self, n):
+        """Tampons du thread courant, agrandis si le lot dépasse leur capacité."""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None or n > buffers[0].shape[0]:
+            capacity = max(n, 2 * buffers[0].shape[0] if buffers is not None else 1)
+            buffers = self._local.buffers = [np.empty((capacity, W.shape[1]), dtype=self.dtype)
+                                             for W in self.weights]
+        return buffers
+
+    def predict(self, X):
+        """Passe avant ReLU / sortie identité ; retourne un tableau (N,) comme MLPRegressor.predict."""
+        n = X.shape[0]
+        buffers = self._ensure_buffers(n)
+        h = np.asarray(X, dtype=self.dtype)
+        last = len(self.weights) - 1
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            out = buffers[i][:n]
+            np.dot(h, W, out=out)
+            out += b
+            if i < last:
+                np.maximum(out, 0, out=out)
+            h = out
+        return h[:, 0].astype(np.float64)
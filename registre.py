@@ -0,0 +1,310 @@
+"""Registre de modèles versionnés : publication, sommes de contrôle, bascule à chaud.
+
+Arborescence de MODEL_REGISTRY_DIR :
+
+    models/
+      ACTIVE                 nom de la version servie
+      CANDIDATE              (optionnel) version évaluée en mode shadow à côté de la version servie
+      <version>/
+        manifest.json        {version, created, features_version, files: {nom: sha256}, info}
+        mlp_weights.npz      moteur NumPy exporté par export_mlp.py (prioritaire)
+        model.pkl            ... ou MLP scikit-learn
+        scaler.pkl           ... et son StandardScaler
+
+Une version publiée n'est jamais modifiée : elle est écrite dans un dossier temporaire puis
+renommée. Changer de version revient à réécrire ACTIVE (os.replace, atomique). Les workers
+surveillent ces pointeurs (RegistryWatcher), chargent et vérifient la nouvelle version en
+arrière-plan, puis remplacent leur référence : les requêtes en cours terminent avec le modèle
+qu'elles ont pris au départ.
+
+Usage :
+    python registre.py publish --weights mlp_weights_4_1.npz [--model mlp_model_4_1.pkl --scaler scaler_4_1.pkl]
+                               [--version v2] [--activate | --candidate]
+    python registre.py activate v2
+    python registre.py candidate v3 | python registre.py candidate --clear
+    python registre.py list
+    python registre.py verify v2
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from config import Config
+from predicteur import FEATURES_VERSION, MLPNumpy, apply_scaler, predict_stop_times
+
+logger = logging.getLogger('pendulum')
+
+MANIFEST_NAME = 'manifest.json'
+POINTERS = ('ACTIVE', 'CANDIDATE')
+BUNDLE_FILES = {'weights': 'mlp_weights.npz', 'model': 'model.pkl', 'scaler': 'scaler.pkl'}
+
+
+class RegistryError(ValueError):
+    """Version absente, incomplète ou dont les sommes de contrôle ne correspondent pas."""
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelBundle:
+    """Un modèle chargé : moteur NumPy, ou MLP scikit-learn et son scaler.
+
+    predict prend les features brutes de build_feature_matrix (modifiées sur place si un
+    scaler doit être appliqué). digest identifie le contenu des fichiers : il entre dans les
+    clés du cache des prédictions.
+    """
+
+    def __init__(self, version, engine, scaler, digest, info=None, source=None):
+        self.version = version
+        self.engine = engine
+        self.scaler = scaler
+        self.digest = digest
+        self.info = info or {}
+        self.source = source
+        self.loaded_at = time.time()
+
+    @classmethod
+    def from_files(cls, version, weights_path=None, model_path=None, scaler_path=None, info=None, digest=None,
+                   source=None):
+        """Charge le moteur NumPy s'il est fourni, sinon le modèle et le scaler (joblib importe sklearn)."""
+        if weights_path:
+            engine, scaler = MLPNumpy.load(weights_path), None
+            paths = (weights_path,)
+        elif model_path and scaler_path:
+            import joblib
+
+            engine, scaler = joblib.load(model_path), joblib.load(scaler_path)
+            paths = (model_path, scaler_path)
+        else:
+            raise RegistryError(f"Version {version} : ni poids exportés, ni modèle et scaler")
+        if digest is None:
+            digest = hashlib.sha256(''.join(file_sha256(path) for path in paths).encode()).hexdigest()
+        return cls(version, engine, scaler, digest, info, source)
+
+    @property
+    def engine_name(self):
+        return 'sklearn' if self.scaler is not None else 'numpy'
+
+    @property
+    def hash(self):
+        """Empreinte du modèle servi ; le calcul des features en fait partie."""
+        return f'{self.digest}-features{FEATURES_VERSION}'
+
+    def predict(self, features):
+        if self.scaler is not None:
+            apply_scaler(features, self.scaler)
+        return predict_stop_times(self.engine, features)
+
+    def describe(self):
+        return {'version': self.version, 'engine': self.engine_name, 'digest': self.digest[:12],
+                'loaded_at': self.loaded_at, 'source': self.source, 'info': self.info}
+
+
+class ModelRegistry:
+    """Accès au dossier du registre (publication, pointeurs ACTIVE / CANDIDATE, chargement vérifié)."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def exists(self):
+        return os.path.isdir(self.directory)
+
+    def versions(self):
+        if not self.exists():
+            return []
+        return sorted(name for name in os.listdir(self.directory)
+                      if os.path.isfile(os.path.join(self.directory, name, MANIFEST_NAME)))
+
+    def manifest(self, version):
+        path = os.path.join(self.directory, version, MANIFEST_NAME)
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise RegistryError(f"Version '{version}' absente du registre {self.directory}") from None
+
+    def pointer(self, name):
+        """Version désignée par ACTIVE ou CANDIDATE (None si le pointeur n'existe pas)."""
+        try:
+            with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def pointers(self):
+        return tuple(self.pointer(name) for name in POINTERS)
+
+    def set_pointer(self, name, version):
+        """Réécrit un pointeur de façon atomique ; version None le supprime."""
+        path = os.path.join(self.directory, name)
+        if version is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        self.manifest(version)  # la version doit exister
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f'.{name}-')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(version + '\n')
+        os.replace(tmp_path, path)
+
+    def verify(self, version):
+        """Vérifie les sommes de contrôle ; retourne le manifeste."""
+        manifest = self.manifest(version)
+        for name, expected in manifest['files'].items():
+            path = os.path.join(self.directory, version, name)
+            if not os.path.exists(path):
+                raise RegistryError(f"Version '{version}' : fichier {name} manquant")
+            if file_sha256(path) != expected:
+                raise RegistryError(f"Version '{version}' : somme de contrôle de {name} invalide")
+        if manifest.get('features_version') != FEATURES_VERSION:
+            raise RegistryError(f"Version '{version}' entraînée pour les features v{manifest.get('features_version')}"
+                                f", le serveur calcule les features v{FEATURES_VERSION}")
+        return manifest
+
+    def load(self, version):
+        manifest = self.verify(version)
+        files = manifest['files']
+
+        def path(key):
+            if BUNDLE_FILES[key] not in files:
+                return None
+            return os.path.join(self.directory, version, BUNDLE_FILES[key])
+
+        digest = hashlib.sha256(''.join(files[name] for name in sorted(files)).encode()).hexdigest()
+        return ModelBundle.from_files(version, path('weights'), path('model'), path('scaler'),
+                                      info=manifest.get('info'), digest=digest, source='registry')
+
+    def publish(self, version=None, weights=None, model=None, scaler=None, info=None):
+        """Copie les fichiers dans une nouvelle version ; retourne son nom."""
+        sources = {key: path for key, path in (('weights', weights), ('model', model), ('scaler', scaler)) if path}
+        if 'weights' not in sources and not ('model' in sources and 'scaler' in sources):
+            raise RegistryError('Il faut les poids exportés (--weights) ou le modèle et le scaler')
+        os.makedirs(self.directory, exist_ok=True)
+        version = version or time.strftime('v%Y%m%d-%H%M%S')
+        if os.path.exists(os.path.join(self.directory, version)):
+            raise RegistryError(f"Version '{version}' déjà publiée")
+        staging = tempfile.mkdtemp(dir=self.directory, prefix=f'.{version}-')
+        try:
+            files = {}
+            for key, source in sources.items():
+                shutil.copyfile(source, os.path.join(staging, BUNDLE_FILES[key]))
+                files[BUNDLE_FILES[key]] = file_sha256(os.path.join(staging, BUNDLE_FILES[key]))
+            manifest = {'version': version, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'features_version': FEATURES_VERSION, 'files': files, 'info': info or {},
+                        'sources': {key: os.path.basename(path) for key, path in sources.items()}}
+            with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.rename(staging, os.path.join(self.directory, version))
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return version
+
+
+class RegistryWatcher(threading.Thread):
+    """Surveille ACTIVE et CANDIDATE ; appelle on_change(active, candidate) à chaque changement.
+
+    Le rappel est exécuté dans ce thread : le chargement d'une nouvelle version ne bloque pas
+    les requêtes. Une version publiée n'étant jamais modifiée, un échec est journalisé une fois
+    et les mêmes pointeurs ne sont pas retentés avant leur prochain changement.
+    """
+
+    def __init__(self, registry, on_change, interval=5.0, current=(None, None)):
+        super().__init__(name='model-registry-watcher', daemon=True)
+        self.registry = registry
+        self.on_change = on_change
+        self.interval = interval
+        self.current = tuple(current)
+        self.failed = None
+        self._stop_event = threading.Event()
+
+    def poll(self):
+        pointers = self.registry.pointers()
+        if pointers in (self.current, self.failed):
+            return
+        try:
+            self.on_change(*pointers)
+            self.current, self.failed = pointers, None
+        except Exception as e:
+            self.failed = pointers
+            logger.error("Registre de modèles : bascule vers %s impossible : %s", pointers, e)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--registry', default=Config.MODEL_REGISTRY_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish = commands.add_parser('publish', help='publie une nouvelle version')
+    publish.add_argument('--version')
+    publish.add_argument('--weights', help='poids exportés par export_mlp.py')
+    publish.add_argument('--model')
+    publish.add_argument('--scaler')
+    publish.add_argument('--info', type=json.loads, default=None, help='métadonnées JSON (RMSE, jeu de données, ...)')
+    target = publish.add_mutually_exclusive_group()
+    target.add_argument('--activate', action='store_true', help='sert immédiatement la version')
+    target.add_argument('--candidate', action='store_true', help='évalue la version en mode shadow')
+    activate = commands.add_parser('activate', help='sert une version publiée')
+    activate.add_argument('version')
+    candidate = commands.add_parser('candidate', help='choisit la version évaluée en mode shadow')
+    candidate.add_argument('version', nargs='?')
+    candidate.add_argument('--clear', action='store_true')
+    commands.add_parser('list', help='liste les versions')
+    verify = commands.add_parser('verify', help='vérifie les sommes de contrôle')
+    verify.add_argument('version')
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.registry)
+    try:
+        if args.command == 'publish':
+            version = registry.publish(args.version, args.weights, args.model, args.scaler, args.info)
+            registry.load(version)  # la version doit pouvoir être servie
+            if args.activate:
+                registry.set_pointer('ACTIVE', version)
+            elif args.candidate:
+                registry.set_pointer('CANDIDATE', version)
+            print(version)
+        elif args.command == 'activate':
+            registry.load(args.version)
+            registry.set_pointer('ACTIVE', args.version)
+        elif args.command == 'candidate':
+            if args.clear or args.version is None:
+                registry.set_pointer('CANDIDATE', None)
+            else:
+                registry.load(args.version)
+                registry.set_pointer('CANDIDATE', args.version)
+        elif args.command == 'list':
+            active, candidate = registry.pointers()
+            for version in registry.versions():
+                manifest = registry.manifest(version)
+                flag = '*' if version == active else ('s' if version == candidate else ' ')
+                print(f"{flag} {version:<24} {manifest['created']}  {', '.join(sorted(manifest['files']))}")
+        elif args.command == 'verify':
+            registry.verify(args.version)
+            print(f"{args.version} : OK")
+    except RegistryError as e:
+        print(f"Erreur : {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
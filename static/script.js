@@ -314,20 +314,17 @@ async function launchSimulation() {
             throw new Error('Données du formulaire invalides');
         }
 
-        // Lancer la simulation
-        console.log('🔄 Lancement de la simulation...', params);
-        const simulationData = await runSimulation(params);
-        
-        // Lancer la prédiction
-        console.log('🤖 Lancement de la prédiction...');
-        const predictionData = await runPrediction(params);
+        // Prédiction et simulation dans une seule requête en flux : la prédiction arrive en
+        // premier, l'animation démarre dès le premier morceau de trajectoire
+        console.log('🔄 Lancement de la simulation et de la prédiction...', params);
+        const { simulationData, predictionData } = await runSimulationStream(params, (animationData) => {
+            hideLoading();
+            startAnimation(animationData);
+        }, showPrediction);
         
         // Afficher les résultats
         displayResults(simulationData, predictionData);
         
-        // Démarrer l'animation
-        startAnimation(simulationData.animation_data);
-        
         // Message de succès
         showSuccess('🎉 Simulation et prédiction terminées avec succès !');
         
@@ -397,11 +394,16 @@ async function runSimulation(params) {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
+            'Accept': 'application/octet-stream, application/json;q=0.9'
         },
         body: JSON.stringify(params)
     });
 
-    const data = await response.json();
+    // Réponse binaire compacte (les erreurs restent en JSON)
+    const contentType = response.headers.get('Content-Type') || '';
+    const data = contentType.startsWith('application/octet-stream')
+        ? decodeTrajectory(await response.arrayBuffer())
+        : await response.json();
     if (!data.success) {
         throw new Error(data.error);
     }
@@ -409,6 +411,148 @@ async function runSimulation(params) {
     return data;
 }
 
+// Décode le format binaire de trajectoire.py : en-tête, métadonnées JSON, puis tableaux typés
+function decodeTrajectory(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'PTRJ' || view.getUint8(4) !== 1) {
+        throw new Error('Format de trajectoire binaire non reconnu');
+    }
+    const encoding = view.getUint8(5);
+    const jsonLength = view.getUint32(8, true);
+    const n = view.getUint32(12, true);
+    const data = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 16, jsonLength)));
+
+    let offset = 16 + jsonLength;
+    offset += (4 - offset % 4) % 4;
+
+    const time = new Array(n);
+    const thetaRad = new Array(n);
+    if (encoding === 0) {
+        const timeArray = new Float32Array(buffer, offset, n);
+        const thetaArray = new Float32Array(buffer, offset + 4 * n, n);
+        for (let i = 0; i < n; i++) {
+            time[i] = timeArray[i];
+            thetaRad[i] = thetaArray[i];
+        }
+    } else {
+        const t0 = view.getFloat32(offset, true);
+        const dt = view.getFloat32(offset + 4, true);
+        const scale = view.getFloat32(offset + 8, true);
+        const thetaArray = new Int16Array(buffer, offset + 16, n);
+        for (let i = 0; i < n; i++) {
+            time[i] = t0 + i * dt;
+            thetaRad[i] = thetaArray[i] * scale;
+        }
+    }
+
+    // x_pos et y_pos sont recalculés à partir de theta et L
+    const L = data.parameters.L;
+    data.animation_data = {
+        time: time,
+        theta_deg: thetaRad.map(theta => theta * 180 / Math.PI),
+        x_pos: thetaRad.map(theta => L * Math.sin(theta)),
+        y_pos: thetaRad.map(theta => L * Math.cos(theta))
+    };
+    return data;
+}
+
+// Repli sur les deux requêtes classiques, en parallèle
+async function runSimulationSeparately(params, onFirstChunk, onPrediction) {
+    const [simulationData, predictionData] = await Promise.all([runSimulation(params), runPrediction(params)]);
+    onPrediction(predictionData);
+    onFirstChunk(simulationData.animation_data);
+    return { simulationData, predictionData };
+}
+
+async function runSimulationStream(params, onFirstChunk, onPrediction) {
+    let response;
+    try {
+        response = await fetch('/api/run', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'application/x-ndjson'
+            },
+            body: JSON.stringify(params)
+        });
+    } catch (error) {
+        console.warn('⚠️ /api/run indisponible, repli sur deux requêtes:', error);
+        return runSimulationSeparately(params, onFirstChunk, onPrediction);
+    }
+
+    if (!response.ok || !response.body) {
+        // Statut d'erreur ou pas de flux : les requêtes classiques rapportent l'erreur éventuelle
+        console.warn('⚠️ /api/run a répondu', response.status, ', repli sur deux requêtes');
+        return runSimulationSeparately(params, onFirstChunk, onPrediction);
+    }
+
+    // Données d'animation partagées avec la boucle d'animation, complétées au fil du flux
+    const animationData = { time: [], theta_deg: [], x_pos: [], y_pos: [], complete: false };
+    const simulationData = { success: true, animation_data: animationData };
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let started = false;
+    let finished = false;
+    let serverError = null;
+    let predictionData = null;
+
+    const handleMessage = (message) => {
+        if (message.type === 'prediction') {
+            predictionData = message;
+            onPrediction(message);
+        } else if (message.type === 'meta') {
+            simulationData.theta_eq_deg = message.theta_eq_deg;
+            simulationData.parameters = message.parameters;
+        } else if (message.type === 'chunk') {
+            animationData.time.push(...message.time);
+            animationData.theta_deg.push(...message.theta_deg);
+            animationData.x_pos.push(...message.x_pos);
+            animationData.y_pos.push(...message.y_pos);
+            if (!started) {
+                started = true;
+                onFirstChunk(animationData);
+            }
+        } else if (message.type === 'done') {
+            simulationData.stop_time = message.stop_time;
+            simulationData.simulation_time = message.simulation_time;
+            finished = true;
+        } else if (message.type === 'error') {
+            serverError = new Error(message.error);
+            throw serverError;
+        }
+    };
+
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => handleMessage(JSON.parse(line)));
+        }
+        if (buffer.trim()) {
+            handleMessage(JSON.parse(buffer));
+        }
+        if (!finished) {
+            throw new Error('flux interrompu avant la fin de la simulation');
+        }
+    } catch (error) {
+        // Erreur rapportée par le serveur : la refaire en deux requêtes n'y changerait rien
+        if (error === serverError) {
+            throw error;
+        }
+        console.warn('⚠️ Flux /api/run interrompu, repli sur deux requêtes:', error);
+        return runSimulationSeparately(params, onFirstChunk, onPrediction);
+    } finally {
+        animationData.complete = true;
+    }
+
+    return { simulationData, predictionData };
+}
+
 async function runPrediction(params) {
     const response = await fetch('/api/predict', {
         method: 'POST',
@@ -458,6 +602,20 @@ function updateSimulationResults(simulationData) {
         simulationData.theta_eq_deg.toFixed(1));
 }
 
+// Affiche la prédiction dès son arrivée, avant la fin de la simulation
+function showPrediction(predictionData) {
+    if (!predictionData.success) {
+        console.warn('⚠️ Prédiction indisponible:', predictionData.error);
+        return;
+    }
+    const predictionTimeElement = document.getElementById('predictionTime');
+    animateValue(predictionTimeElement, '--', formatTime(predictionData.predicted_time));
+}
+
+function formatTime(value) {
+    return value !== null && value !== undefined ? value.toFixed(2) : '--';
+}
+
 function updateComparisonResults(simulationData, predictionData) {
     const simulationTimeElement = document.getElementById('simulationTime');
     const predictionTimeElement = document.getElementById('predictionTime');
@@ -466,12 +624,12 @@ function updateComparisonResults(simulationData, predictionData) {
     // Animation des temps
     animateValue(simulationTimeElement, '--', 
         simulationData.stop_time ? simulationData.stop_time.toFixed(2) : '--');
-    animateValue(predictionTimeElement, '--', 
-        predictionData.predicted_time.toFixed(2));
+    const predictedTime = predictionData && predictionData.success ? predictionData.predicted_time : null;
+    animateValue(predictionTimeElement, '--', formatTime(predictedTime));
     
     // Calculer et afficher la différence
-    if (simulationData.stop_time) {
-        const diff = Math.abs(simulationData.stop_time - predictionData.predicted_time);
+    if (simulationData.stop_time && predictedTime !== null) {
+        const diff = Math.abs(simulationData.stop_time - predictedTime);
         const diffPercent = (diff / simulationData.stop_time * 100).toFixed(1);
         const diffText = `Différence: ${diff.toFixed(2)}s (${diffPercent}%)`;
         
@@ -538,6 +696,12 @@ function startAnimation(animationData) {
     let isAnimating = true;
     
     function animate() {
+        // Flux en cours : attendre les prochains morceaux plutôt que d'arrêter l'animation
+        if (isAnimating && currentFrame >= animationData.time.length && animationData.complete === false) {
+            animationId = requestAnimationFrame(() => setTimeout(animate, ANIMATION_SPEED));
+            return;
+        }
+
         if (!isAnimating || currentFrame >= animationData.time.length) {
             // Arrêter complètement l'animation
             isAnimating = false;
@@ -555,7 +719,7 @@ function startAnimation(animationData) {
 
         currentFrame++;
         
-        if (isAnimating && currentFrame < animationData.time.length) {
+        if (isAnimating && (currentFrame < animationData.time.length || animationData.complete === false)) {
             animationId = requestAnimationFrame(() => setTimeout(animate, ANIMATION_SPEED));
         } else {
             isAnimating = false;
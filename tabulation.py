@@ -0,0 +1,254 @@
+"""Table précalculée des temps de stabilisation, interpolée à l'exécution.
+
+Construction hors ligne (python tabulation.py) : pour chaque couple (forme, fluide), t_epsilon
+est simulé avec l'intégrateur vectorisé (integrate_batch_auto, constantes physiques de Config ; les
+points raides passent par solve_until_settled avec LSODA, comme method='auto') sur
+une grille régulière de (L, m, theta0_deg, dimensions de la forme), bornée par le domaine
+d'entraînement du MLP (L_BOUNDS / U_BOUNDS de collecteur.py). Aux extrêmes de
+Config.PARAM_LIMITS (m = 1 g), le frottement sec rend le système très raide. Les axes L, m et
+dimensions sont espacés géométriquement, car t_epsilon varie de façon multiplicative. Chaque
+table est un fichier .npy de log1p(t_epsilon) en float32 (NaN si le pendule ne se stabilise pas),
+ouvert en mémoire partagée (mmap) à l'exécution. index.json décrit les axes et l'empreinte
+physique.
+
+Requête : interpolation multilinéaire dans l'espace des axes (log pour les axes géométriques),
+en une seule lecture des 2^d coins de chaque cellule. La borne d'erreur retournée est l'écart
+entre le plus grand et le plus petit coin (échelle log1p) : elle est garantie tant que t_epsilon
+varie de façon monotone dans la cellule. Au-delà de la tolérance, hors de la grille, ou si un
+coin ne se stabilise pas, la requête est marquée non couverte et l'appelant se replie sur la
+simulation.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cache import canonical_hash, physics_fingerprint
+from acceleration import integrate_batch_auto
+from physique import SHAPE_REGISTRY, SHAPES, TC_DRY_FRICTION as DEFAULT_TC, calculate_properties_batch, stop_grid_step
+
+INDEX_NAME = 'index.json'
+VERSION = 2  # 2 : pics sur la grille stop_grid, comme les étiquettes d'entraînement
+SHAPE_DIMS = {name: shape.n_dims for name, shape in SHAPE_REGISTRY.items()}
+# Nombre de points par axe (grille par défaut : ~35 000 simulations pour les 9 couples)
+DEFAULT_POINTS = {'L': 5, 'm': 7, 'theta0_deg': 4, 'dim': 4}
+BUILD_CHUNK = 500
+
+
+def make_axes(bounds, points):
+    """Axes de la grille de chaque forme : {forme: [(nom, échelle, valeurs), ...]}.
+
+    bounds : {'L': (min, max), 'm': ..., 'theta0_deg': ..., 'dim': ...} ; au moins 2 points par axe.
+    """
+    assert all(n >= 2 for n in points.values()), f"Au moins 2 points par axe : {points}"
+    def axis(name, key, scale):
+        low, high = bounds[key]
+        values = np.geomspace(low, high, points[key]) if scale == 'log' else np.linspace(low, high, points[key])
+        return name, scale, values.tolist()
+
+    return {
+        shape: [axis('L', 'L', 'log'), axis('m', 'm', 'log'), axis('theta0_deg', 'theta0_deg', 'linear')]
+               + [axis(f'dim{k + 1}', 'dim', 'log') for k in range(n_dims)]
+        for shape, n_dims in SHAPE_DIMS.items()
+    }
+
+
+def training_bounds():
+    """Domaine d'entraînement du MLP, tel que défini dans collecteur.py."""
+    from collecteur import L_BOUNDS, U_BOUNDS
+
+    return {'L': (L_BOUNDS[0], U_BOUNDS[0]), 'm': (L_BOUNDS[1], U_BOUNDS[1]),
+            'theta0_deg': (L_BOUNDS[2], U_BOUNDS[2]), 'dim': (L_BOUNDS[4], U_BOUNDS[4])}
+
+
+def table_fingerprint(config_obj, tc):
+    return canonical_hash({'physics': physics_fingerprint(config_obj), 'Tc': tc, 'version': VERSION})
+
+
+# --- CONSTRUCTION ---
+def _simulate_block(args):
+    """Worker : simule un bloc de points de grille ; retourne (début, log1p(t_epsilon) ou NaN)."""
+    start, shape, rho, points, physics = args
+    n = len(points)
+    L, m, theta0_deg = points[:, 0], points[:, 1], points[:, 2]
+    dims = np.zeros((n, 3))
+    dims[:, :points.shape[1] - 3] = points[:, 3:]
+    shape_codes = np.full(n, SHAPES.index(shape), dtype=np.intp)
+    I, S, Cd, V = calculate_properties_batch(shape_codes, dims, m, L)
+    theta0 = np.deg2rad(theta0_deg)
+    # Lignes raides en LSODA ; pics sur la grille des étiquettes d'entraînement (stop_grid)
+    t_stop, _ = integrate_batch_auto(I, m, L, S, Cd, rho, V, physics['Tc'], theta0, g=physics['G'],
+                                     b_pivot=physics['B_PIVOT'], alpha_tanh=physics['ALPHA_TANH'],
+                                     epsilon=physics['EPSILON'], t_max=physics['T_MAX_SIMULATION'],
+                                     sample_dt=stop_grid_step(physics['T_MAX_SIMULATION']))
+    return start, np.log1p(t_stop).astype(np.float32)
+
+
+def build_tables(config_obj, output_dir, bounds, points=None, cores=1, tc=DEFAULT_TC):
+    """Simule toutes les grilles et écrit les tables .npy et l'index dans output_dir."""
+    points = dict(DEFAULT_POINTS, **(points or {}))
+    axes = make_axes(bounds, points)
+    physics = {key: getattr(config_obj, key) for key in ('G', 'B_PIVOT', 'ALPHA_TANH', 'EPSILON', 'T_MAX_SIMULATION')}
+    physics['Tc'] = tc
+    os.makedirs(output_dir, exist_ok=True)
+    index = {'version': VERSION, 'fingerprint': table_fingerprint(config_obj, tc), 'tc': tc, 'tables': {}}
+
+    with ProcessPoolExecutor(max_workers=cores) as executor:
+        for shape, shape_axes in axes.items():
+            grid_shape = tuple(len(values) for _, _, values in shape_axes)
+            mesh = np.stack(np.meshgrid(*[values for _, _, values in shape_axes], indexing='ij'), axis=-1)
+            mesh = mesh.reshape(-1, len(shape_axes))
+            for fluid, props in config_obj.FLUID_PROPERTIES.items():
+                start_time = time.time()
+                filename = f"{shape}-{fluid}.npy"
+                tmp_path = os.path.join(output_dir, filename + '.tmp')
+                table = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32, shape=grid_shape)
+                flat = table.reshape(-1)
+                blocks = ((start, shape, props['rho'], mesh[start:start + BUILD_CHUNK], physics)
+                          for start in range(0, len(mesh), BUILD_CHUNK))
+                for start, values in executor.map(_simulate_block, blocks):
+                    flat[start:start + len(values)] = values
+                table.flush()
+                del flat, table
+                os.replace(tmp_path, os.path.join(output_dir, filename))
+                index['tables'].setdefault(shape, {})[fluid] = {
+                    'file': filename,
+                    'axes': [{'name': name, 'scale': scale, 'values': values} for name, scale, values in shape_axes]
+                }
+                print(f"   {shape}/{fluid} : {len(mesh)} points en {time.time() - start_time:.1f} s")
+
+    tmp_index = os.path.join(output_dir, INDEX_NAME + '.tmp')
+    with open(tmp_index, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_index, os.path.join(output_dir, INDEX_NAME))
+    return index
+
+
+# --- INTERROGATION ---
+class _Table:
+    def __init__(self, values, axes):
+        self.values = values
+        self.flat = values.reshape(-1)
+        self.names = [axis['name'] for axis in axes]
+        self.log = np.array([axis['scale'] == 'log' for axis in axes])
+        self.grid = [np.log(axis['values']) if axis['scale'] == 'log' else np.asarray(axis['values'], dtype=np.float64)
+                     for axis in axes]
+        d = len(axes)
+        self.sizes = np.array(values.shape)
+        self.strides = np.array([int(np.prod(values.shape[k + 1:])) for k in range(d)], dtype=np.intp)
+        # Décalages et bits des 2^d coins d'une cellule
+        self.bits = ((np.arange(2 ** d)[:, None] >> np.arange(d)[None, :]) & 1).astype(bool)
+        self.offsets = self.bits.astype(np.intp) @ self.strides
+
+    def interpolate(self, points):
+        """points (n, d) dans les unités des axes ; retourne (log1p(t), écart des coins, dans la grille)."""
+        n, d = points.shape
+        x = np.where(self.log, np.log(np.maximum(points, 1e-300)), points)
+        position = np.empty((n, d))
+        inside = np.ones(n, dtype=bool)
+        for k, grid in enumerate(self.grid):
+            inside &= (x[:, k] >= grid[0] - 1e-12) & (x[:, k] <= grid[-1] + 1e-12)
+            position[:, k] = np.interp(x[:, k], grid, np.arange(len(grid)))
+        lower = np.minimum(np.floor(position).astype(np.intp), self.sizes - 2)
+        frac = position - lower
+        corners = self.flat[(lower @ self.strides)[:, None] + self.offsets[None, :]]  # (n, 2^d)
+        weights = np.where(self.bits[None, :, :], frac[:, None, :], 1.0 - frac[:, None, :]).prod(axis=2)
+        value = (weights * corners).sum(axis=1)
+        spread = corners.max(axis=1) - corners.min(axis=1)  # NaN si un coin ne se stabilise pas
+        return value, spread, inside
+
+
+class LookupTable:
+    """Moteur de prédiction par interpolation dans les tables construites par build_tables."""
+
+    def __init__(self, index, tables, tolerance):
+        self.index = index
+        self.tables = tables
+        self.tolerance = tolerance
+
+    @classmethod
+    def load(cls, directory, config_obj, tolerance=0.1):
+        """Ouvre les tables en mmap ; lève ValueError si elles ont été construites avec une autre physique."""
+        with open(os.path.join(directory, INDEX_NAME), encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != VERSION or index['fingerprint'] != table_fingerprint(config_obj, index['tc']):
+            raise ValueError(f"Table {directory} construite avec d'autres constantes physiques : reconstruisez-la.")
+        tables = {}
+        for shape, fluids in index['tables'].items():
+            for fluid, entry in fluids.items():
+                values = np.load(os.path.join(directory, entry['file']), mmap_mode='r')
+                tables[shape, fluid] = _Table(values, entry['axes'])
+        return cls(index, tables, tolerance)
+
+    def predict(self, configurations):
+        """Retourne (t_epsilon, borne d'erreur relative, couvert) pour un lot de configurations.
+
+        couvert est False hors de la grille, si un coin ne se stabilise pas ou si la borne
+        dépasse la tolérance (échelle log1p) ; t_epsilon vaut alors NaN.
+        """
+        n = len(configurations)
+        log_t = np.full(n, np.nan)
+        spread = np.full(n, np.nan)
+        groups = {}
+        for i, params in enumerate(configurations):
+            if params.get('Tc', self.index['tc']) != self.index['tc']:
+                continue  # Tc différent de celui de la table : non couvert
+            groups.setdefault((params['shape'], params['fluid']), []).append(i)
+        for key, rows in groups.items():
+            table = self.tables.get(key)
+            if table is None:
+                continue
+            n_dims = len(table.names) - 3
+            points = np.array([[configurations[i]['L'], configurations[i]['m'], configurations[i]['theta0_deg']]
+                               + list(configurations[i]['dims'][:n_dims]) for i in rows], dtype=np.float64)
+            value, group_spread, inside = table.interpolate(points)
+            rows = np.asarray(rows)
+            log_t[rows[inside]] = value[inside]
+            spread[rows[inside]] = group_spread[inside]
+        covered = spread <= self.tolerance  # faux pour NaN
+        t_epsilon = np.where(covered, np.expm1(log_t), np.nan)
+        return t_epsilon, np.expm1(spread), covered
+
+    def info(self):
+        return {
+            'tc': self.index['tc'],
+            'tolerance': self.tolerance,
+            'tables': {f'{shape}/{fluid}': list(table.values.shape) for (shape, fluid), table in self.tables.items()}
+        }
+
+
+def parse_points(text):
+    """'L=5,m=7' -> {'L': 5, 'm': 7}"""
+    points = {}
+    for item in filter(None, (text or '').split(',')):
+        name, _, value = item.partition('=')
+        if name not in DEFAULT_POINTS:
+            raise argparse.ArgumentTypeError(f"Axe '{name}' inconnu ({', '.join(DEFAULT_POINTS)})")
+        points[name] = int(value)
+        if points[name] < 2:
+            # Une cellule d'interpolation a besoin de deux points par axe
+            raise argparse.ArgumentTypeError(f"Axe '{name}' : au moins 2 points ({points[name]})")
+    return points
+
+
+def main(argv=None):
+    from config import Config
+
+    parser = argparse.ArgumentParser(description="Construction de la table des temps de stabilisation")
+    parser.add_argument('--output', default=Config.LOOKUP_TABLE_DIR, help="dossier des tables")
+    parser.add_argument('--points', type=parse_points, default={},
+                        help="points par axe, ex. L=5,m=7,theta0_deg=4,dim=4")
+    parser.add_argument('--cores', type=int, default=max(1, (os.cpu_count() or 2) - 1))
+    args = parser.parse_args(argv)
+
+    start = time.time()
+    print(f"Construction des tables dans '{args.output}' ({dict(DEFAULT_POINTS, **args.points)})...")
+    build_tables(Config, args.output, training_bounds(), args.points, args.cores, Config.TC_DRY_FRICTION)
+    print(f"Terminé en {time.time() - start:.1f} s.")
+
+
+if __name__ == '__main__':
+    main()
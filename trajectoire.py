@@ -0,0 +1,74 @@
+"""Format binaire compact pour les données d'animation de /api/simulate.
+
+Disposition (petit-boutiste) :
+
+    magic     4 octets  b'PTRJ'
+    version   uint8     1
+    encoding  uint8     0 = float32, 1 = quantifié
+    reserved  uint16
+    json_len  uint32    taille du bloc JSON de métadonnées
+    n         uint32    nombre d'échantillons
+    json      json_len octets (UTF-8) : tout le résumé sauf animation_data
+    padding   jusqu'à un multiple de 4 octets
+
+    encoding 0 : time float32[n], theta float32[n] (radians)
+    encoding 1 : t0 float32, dt float32, theta_scale float32, reserved float32,
+                 theta int16[n] (theta = q * theta_scale, temps uniforme t0 + i * dt)
+
+x_pos et y_pos ne sont pas transmis : le client les recalcule à partir de theta et L.
+"""
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'PTRJ'
+VERSION = 1
+ENCODINGS = {'float32': 0, 'quantized': 1}
+MIMETYPE = 'application/octet-stream'
+_HEADER = struct.Struct('<4sBBHII')
+
+
+def _padding(size):
+    return (-size) % 4
+
+
+def encode_trajectory(summary, t, theta, encoding='float32'):
+    """Encode le résumé JSON et la trajectoire (t en s, theta en rad) en octets."""
+    code = ENCODINGS[encoding]
+    t = np.asarray(t, dtype=np.float64)
+    theta = np.asarray(theta, dtype=np.float64)
+    meta = json.dumps(summary, separators=(',', ':')).encode('utf-8')
+    parts = [_HEADER.pack(MAGIC, VERSION, code, 0, len(meta), t.size), meta,
+             b'\0' * _padding(_HEADER.size + len(meta))]
+
+    if code == 0:
+        parts.append(t.astype('<f4').tobytes())
+        parts.append(theta.astype('<f4').tobytes())
+    else:
+        dt = float(t[1] - t[0]) if t.size > 1 else 0.0
+        t0 = float(t[0]) if t.size else 0.0
+        peak = float(np.max(np.abs(theta))) if theta.size else 0.0
+        scale = float(np.float32(peak / 32767)) if peak > 0 else 1.0
+        parts.append(struct.pack('<ffff', t0, dt, scale, 0.0))
+        parts.append(np.clip(np.round(theta / scale), -32767, 32767).astype('<i2').tobytes())
+    return b''.join(parts)
+
+
+def decode_trajectory(data):
+    """Décode les octets produits par encode_trajectory ; retourne (summary, t, theta)."""
+    magic, version, code, _, json_len, n = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Format de trajectoire binaire non reconnu.")
+    offset = _HEADER.size
+    summary = json.loads(data[offset:offset + json_len].decode('utf-8'))
+    offset += json_len + _padding(offset + json_len)
+
+    if code == 0:
+        t = np.frombuffer(data, dtype='<f4', count=n, offset=offset).astype(np.float64)
+        theta = np.frombuffer(data, dtype='<f4', count=n, offset=offset + 4 * n).astype(np.float64)
+    else:
+        t0, dt, scale, _ = struct.unpack_from('<ffff', data, offset)
+        t = t0 + dt * np.arange(n)
+        theta = np.frombuffer(data, dtype='<i2', count=n, offset=offset + 16) * scale
+    return summary, t, theta